@@ -0,0 +1,162 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, List
+
+# Import standard modules
+import hashlib
+import json
+import mmap
+import os
+
+# Import non-standard modules
+import pygame as pg
+
+# Import local classes and methods
+import helper_functions as hf
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    pass
+
+
+class AssetCache():
+    """A build-once cache of the game's preprocessed assets. Images are stored already scaled and sliced into frames
+    as raw RGBA pixels, and sounds as raw samples in the mixer's format, all in one data file that is memory-mapped
+    and loaded straight into Surfaces and Sounds. Entries are keyed by the source file's hash and the processing
+    applied, so changed assets or settings are rebuilt automatically."""
+
+    def __init__(self, cache_dir: str):
+        """Initialize the cache, memory-mapping the data file if one has been built"""
+
+        self.data_path = os.path.join(cache_dir, 'assets.bin')
+        self.index_path = os.path.join(cache_dir, 'assets.json')
+        self.hashes: Dict[str, str] = {}
+
+        # Entries used this session, as {key: (meta, data)}. Rewritten to disk by save() if any were rebuilt.
+        self.entries: Dict[str, tuple] = {}
+        self.dirty = False
+
+        self.index: Dict[str, dict] = {}
+        self.data = None
+        if os.path.exists(self.index_path) and os.path.exists(self.data_path):
+            with open(self.index_path) as file:
+                self.index = json.load(file)
+            with open(self.data_path, 'rb') as file:
+                if os.path.getsize(self.data_path):
+                    self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def get_hash(self, full_path: str) -> str:
+        """Returns the hash of a source file's contents"""
+
+        if full_path not in self.hashes:
+            with open(full_path, 'rb') as file:
+                self.hashes[full_path] = hashlib.sha1(file.read()).hexdigest()
+        return self.hashes[full_path]
+
+    def lookup(self, key: str, source_hash: str) -> List[tuple]:
+        """Returns the cached (meta, data) pairs for key if they were built from a source with source_hash"""
+
+        entry = self.index.get(key)
+        if not self.data or not entry or entry['hash'] != source_hash:
+            return None
+
+        view = memoryview(self.data)
+        items = [(meta, view[meta['offset']:meta['offset'] + meta['length']]) for meta in entry['items']]
+        self.entries[key] = (entry, items)
+        return items
+
+    def store(self, key: str, source_hash: str, items: List[tuple]):
+        """Adds freshly built (meta, data) pairs for key to the cache"""
+
+        self.entries[key] = ({'hash': source_hash}, items)
+        self.dirty = True
+
+    def load_image(self, file_name: str, scale: float, path: str, color_key: pg.Color = None) -> pg.Surface:
+        """Cached version of hf.load_image"""
+
+        return self.load_frames(file_name, scale, path, 1, color_key, color_key, False)[0]
+
+    def load_frames(self, file_name: str, scale: float, path: str, n_frames: int, color_key: pg.Color,
+                    sheet_color_key: pg.Color = None, sliced: bool = True) -> List[pg.Surface]:
+        """Cached version of hf.load_image followed by hf.load_frames. Returns the frames of the scaled sprite sheet
+        saved at path."""
+
+        full_path = os.path.abspath(os.path.join(path, file_name))
+        source_hash = self.get_hash(full_path)
+        key = f'image|{file_name}|{scale}|{n_frames}|{color_key}|{sheet_color_key}|{sliced}'
+
+        items = self.lookup(key, source_hash)
+        if items is None:
+            image = hf.load_image(file_name, scale, path, sheet_color_key)
+            images = hf.load_frames(image, n_frames, color_key) if sliced else [image]
+            items = [({'size': image.get_size(), 'alpha': bool(image.get_flags() & pg.SRCALPHA)},
+                      pg.image.tobytes(image, 'RGBA')) for image in images]
+            self.store(key, source_hash, items)
+            return images
+
+        images = []
+        for meta, data in items:
+            image = pg.image.frombuffer(data, meta['size'], 'RGBA')
+            image = image.convert_alpha() if meta['alpha'] else image.convert()
+            if color_key:
+                image.set_colorkey(color_key)
+            images.append(image)
+        return images
+
+    def load_sound(self, file_name: str, path: str, group: List[pg.mixer.Sound] = -1) -> pg.mixer.Sound:
+        """Cached version of hf.load_sound. Samples are stored already decoded and converted to the mixer's format."""
+
+        full_path = os.path.abspath(os.path.join(path, file_name))
+        source_hash = self.get_hash(full_path)
+        key = f'sound|{file_name}|{pg.mixer.get_init()}'
+
+        items = self.lookup(key, source_hash)
+        if items is None:
+            sound = hf.load_sound(file_name, path, group)
+            self.store(key, source_hash, [({}, sound.get_raw())])
+            return sound
+
+        sound = pg.mixer.Sound(buffer=items[0][1])
+        if group != -1:
+            group.append(sound)
+        return sound
+
+    def save(self):
+        """Writes the cache to disk if any entries were rebuilt this session. Only entries used this session are
+        kept, so stale ones are dropped."""
+
+        if not self.dirty:
+            return
+
+        os.makedirs(os.path.dirname(self.data_path), exist_ok=True)
+        index = {}
+        offset = 0
+        with open(self.data_path + '.tmp', 'wb') as file:
+            for key, (entry, items) in self.entries.items():
+                metas = []
+                for meta, data in items:
+                    meta = dict(meta, offset=offset, length=len(data))
+                    file.write(data)
+                    offset += len(data)
+                    metas.append(meta)
+                index[key] = {'hash': entry['hash'], 'items': metas}
+
+        # Release the old mapping before replacing the file underneath it. It can't be closed while any view into it
+        # is alive, and the loop above still holds the last item written, so every view is released explicitly.
+        for _, items in self.entries.values():
+            for _, data in items:
+                if isinstance(data, memoryview):
+                    data.release()
+        self.entries = {}
+        if self.data:
+            self.data.close()
+        os.replace(self.data_path + '.tmp', self.data_path)
+        with open(self.index_path, 'w') as file:
+            json.dump(index, file)
+
+        self.index = index
+        self.dirty = False
+        with open(self.data_path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if offset else None
+        for key, entry in index.items():
+            self.lookup(key, entry['hash'])
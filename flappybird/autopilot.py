@@ -0,0 +1,296 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+# Import standard modules
+import time
+
+# Import non-standard modules
+import numpy as np
+
+# Import local classes and methods
+from collision import CollisionModel
+import helper_functions as hf
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    from settings import WorldSettings
+    from simulation import Simulation
+
+# Time a search node is first assumed to take, in us
+NODE_TIME = 50
+
+
+class Autopilot():
+    """Plays the game by planning flaps ahead against the pipe pairs already on screen. A plan is a list of the
+    simulation steps to flap on. Between flaps the bird follows an arc that depends only on where it flapped from, so
+    the arcs are tabulated once and a plan's flight path is a handful of table lookups.
+
+    The search only branches where it has to: it follows the flight path without further flaps until the bird would
+    hit something. Hitting the floor, or the bottom pipe, branches on the earlier steps a flap could be made on. Hitting
+    the ceiling, or the top pipe, ends the branch, as not flapping is already the lowest the bird can be, and so does
+    a reachability bound on how high the bird can climb. Branches are tried closest to the gap ahead first, starting
+    from the last plan. Searching stops once another node wouldn't fit before a deadline, keeping the plan that survives
+    longest, so planning fits in budget microseconds, and what was ruled out carries over to the next search."""
+
+    def __init__(self, settings: WorldSettings, budget: int = None, horizon: int = 1500,
+                 decision_time: float = 1000 / 60, margin: float = 1):
+        """Initialize the autopilot. Plans fit in budget us (settings.autopilot_budget by default), look horizon ms
+        ahead, flap on a grid of decision_time ms and keep the bird margin pixels clear of anything it could hit. The
+        bird collides with its rotated sprite, so its size is looked up for the angle it has at each step of a flight
+        path."""
+
+        self.settings = settings
+        self.budget = budget if budget else settings.autopilot_budget  # us per plan
+        self.margin = margin
+        self.step_dt = 1000 / settings.physics_rate
+        self.horizon = round(horizon / self.step_dt)  # in simulation steps
+        self.decision_steps = max(1, round(decision_time / self.step_dt))  # flaps are on world steps divisible by it
+
+        # Physics constants, as used by BirdBody.update and Simulation
+        self.accel = settings.gravity
+        self.max_velocity = settings.max_velocity
+        self.jump_velocity = settings.jump_velocity
+        self.half_pipe_w = settings.pipe_width / 2
+
+        # Bird extents by angle, see CollisionModel.get_extents
+        self.extents, self.half_bird_w = CollisionModel(settings).get_extents()
+        self.angles = sorted(self.extents)
+        self.angle_step = self.angles[1] - self.angles[0] if len(self.angles) > 1 else 1
+
+        # Arcs flown after a flap and from rest at the start of the game, when the bird's angle is measured from the top
+        # of the screen. Once the bird falls at max velocity and has stopped rotating, the arcs are straight lines, so
+        # the flight path from any later step is the same as from the step it got there.
+        self.flap_arc, flap_saturation = self.get_arc(-self.jump_velocity, 0)
+        self.rest_arc, rest_saturation = self.get_arc(0, settings.screen_height // 2)
+        self.saturation = max(flap_saturation, rest_saturation)
+        self.floor = settings.ground_elev - margin
+
+        # Flaps are tried nearest first to the height that keeps the bird's arc centered on the gap it is heading for
+        self.rise = -self.flap_arc[0].min()
+        self.default_gap_y = (settings.gap_y_min + settings.gap_y_max) / 2
+
+        # Highest the bird's bottom can be on each step after a flap, by flapping again on every decision step. A
+        # branch that can't clear the bottom of a gap even then is dead, whatever flaps follow.
+        self.climb = np.empty(self.horizon + 1)
+        y, velocity = 0.0, -self.jump_velocity
+        for i in range(self.horizon + 1):
+            if i:
+                if i % self.decision_steps == 0:
+                    velocity = -self.jump_velocity
+                velocity = hf.clamp(velocity + self.accel * self.step_dt, -self.max_velocity, self.max_velocity)
+                y += velocity * self.step_dt
+            self.climb[i] = y
+        self.climb += min(extents[1] for extents in self.extents.values())
+
+        # Flap steps of the last plan, by world step. Pipe pairs only ever add to what the bird can hit, so search nodes
+        # found to have no way through are dead for the rest of the game and are skipped by later searches. Dead nodes
+        # are kept as the pixels flapped on, by world step, so those the bird has flown past are dropped a step at a
+        # time and there are never more than a horizon's worth.
+        self.plan: List[int] = []
+        self.dead: Dict[int, Set[int]] = {}
+        self.pruned_step = 0  # world steps before it have no dead nodes
+        self.last_step = 0
+        self.plan_time = 0  # us the last plan took
+        self.node_time = NODE_TIME  # running average of us per search node, reserved at the end of the budget
+
+    def get_arc(self, velocity: float, height: float) -> Tuple[np.ndarray, int]:
+        """Returns a (5, n) table of the bird's flight without flapping from the given velocity, and the step it
+        becomes a straight line on. Row 0 is the bird's height relative to where it starts, rows 1 and 2 are the top
+        and bottom of its mask and rows 3 and 4 the top and bottom of its rect. height is how far below the height its
+        angle is measured from the bird starts. Stepped exactly as BirdBody.update, for as long as it takes to saturate
+        plus the horizon."""
+
+        rows = []
+        y = 0.0
+        saturation = 0
+        prev_extents = None
+        while saturation + self.horizon >= len(rows):
+            if rows:
+                velocity = hf.clamp(velocity + self.accel * self.step_dt, -self.max_velocity, self.max_velocity)
+                y += velocity * self.step_dt
+            angle = hf.quantize(hf.translate(height + y, 0, 150, 20, -90), self.angle_step, self.angles[0],
+                                self.angles[-1])
+            extents = self.extents.get(angle, self.extents[self.angles[-1]])
+            if velocity < self.max_velocity or extents != prev_extents:
+                saturation = len(rows)
+            prev_extents = extents
+
+            pipe_up, pipe_down, rect_up, rect_down = extents
+            rows.append((y, y - pipe_up, y + pipe_down, y - rect_up, y + rect_down))
+
+        return np.array(rows).T, saturation
+
+    def get_bounds(self, world: Simulation) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the top and bottom edges of the gap the bird has to stay within on each of the next horizon steps
+        (index 0 is now), or -inf and inf where no pipe pair on screen is in the way, and the height to flap at on
+        each step to head for the next gap (the middle of the screen's range of gaps past the last pipe pair)"""
+
+        settings = self.settings
+        gap_top = np.full(self.horizon + 1, -np.inf)
+        gap_bottom = np.full(self.horizon + 1, np.inf)
+        target = np.full(self.horizon + 1, self.default_gap_y + self.rise / 2)
+
+        # Steps the pipes have moved by, after the wait at the start of the game
+        delay_steps = 0
+        if settings.start_delay < settings.max_start_delay:
+            delay_steps = int(np.ceil((settings.max_start_delay - settings.start_delay) / self.step_dt))
+        moved = np.maximum(np.arange(self.horizon + 1) - delay_steps, 0) * settings.world_velocity * self.step_dt
+
+        reach = self.half_pipe_w + self.half_bird_w + self.margin
+        for pipe in sorted(world.pipes, key=lambda pipe: -pipe.x):
+            offset = pipe.x - moved - world.bird.x
+            overlap = np.abs(offset) < reach
+            if overlap.any():
+                gap_top[overlap] = np.maximum(gap_top[overlap], pipe.gap_top + self.margin)
+                gap_bottom[overlap] = np.minimum(gap_bottom[overlap], pipe.gap_bottom - self.margin)
+            target[offset > -reach] = pipe.gap_y + self.rise / 2
+
+        return gap_top, gap_bottom, target
+
+    def get_path(self, y: float, arc: np.ndarray, arc_step: int, start: int) -> Tuple[np.ndarray, float]:
+        """Returns the flight path, without flapping, from height y at step start until the horizon. arc_step is how
+        far along arc the bird is. The path is a view of the arc table, returned with the offset to add to it."""
+
+        arc_step = min(arc_step, self.saturation)
+        return arc[:, arc_step:arc_step + self.horizon - start + 1], y - arc[0, arc_step]
+
+    def check_path(self, path: np.ndarray, offset: float, gap_top: np.ndarray, gap_bottom: np.ndarray,
+                   start: int) -> Tuple[int, bool]:
+        """Returns the first step after start at which a flight path hits something (or the horizon if it never
+        does) and whether it hits from below. The path may stop short of the horizon."""
+
+        end = start + path.shape[1]
+        hit_top = (path[1, 1:] < gap_top[start + 1:end] - offset) | (path[3, 1:] < self.margin - offset)
+        hit_bottom = (path[2, 1:] > gap_bottom[start + 1:end] - offset) | (path[4, 1:] > self.floor - offset)
+        hits = hit_top | hit_bottom
+        i = int(hits.argmax())
+        if not hits[i]:
+            return self.horizon, False
+        return start + 1 + i, bool(hit_bottom[i])
+
+    def get_start(self, world: Simulation) -> Tuple[np.ndarray, int]:
+        """Returns the arc the bird is on and how far along it the bird is"""
+
+        if world.flap_steps:
+            return self.flap_arc, world.steps - world.flap_steps[-1]
+        return self.rest_arc, world.steps
+
+    def search(self, world: Simulation, gap_top: np.ndarray, gap_bottom: np.ndarray, target: np.ndarray,
+               deadline: float, seed: List[int] = None) -> Tuple[List[int], bool]:
+        """Searches for flap steps, relative to now, that survive the horizon. The search starts down the seed plan,
+        so a plan that is still safe is returned straight away and one that isn't is repaired from where it fails.
+        Returns the plan that survives longest if none is found by the deadline or at all, and whether it is safe."""
+
+        arc, arc_step = self.get_start(world)
+        node = (0, world.bird.y, arc, arc_step, [], None)
+        seed = list(seed) if seed else []
+        best_plan, best_step = [], -1
+
+        # Nodes still to branch on, as (start, path, offset, flap steps left to try, plan, key). Branches are made one
+        # at a time, so a node that finds a plan early doesn't pay for the flaps it never tries. Search stops once
+        # less than two nodes' time is left before the deadline, as a node can't be cut short, but the root node is
+        # always expanded so the time per node keeps being measured.
+        stack = []
+        start_time = time.perf_counter()
+        nodes = 0
+        reserve = 2 * self.node_time / 1e6
+        while node and (not nodes or time.perf_counter() + reserve < deadline):
+            nodes += 1
+            start, y, arc, arc_step, plan, key = node
+            path, offset = self.get_path(y, arc, arc_step, start)
+            hit_step, from_below = self.check_path(path, offset, gap_top, gap_bottom, start)
+            if hit_step > best_step:
+                best_plan, best_step = plan, hit_step
+            if hit_step == self.horizon:
+                break
+            node = None
+
+            # Without a flap the bird is as low as it can be, so if that still hits from above every plan does. It is
+            # also pruned if flapping as much as possible from here still hits the bottom of a gap.
+            first = start + self.decision_steps if plan else -world.steps % self.decision_steps
+            if from_below and first < hit_step and not (self.climb[:self.horizon - start + 1] >
+                                                        gap_bottom[start:] - y).any():
+                # Flaps are tried nearest the target first (popped from the end), after the seed's next flap
+                flap_steps = np.arange(first, hit_step, self.decision_steps)
+                flap_ys = path[0, flap_steps - start] + offset
+                order = np.argsort(np.abs(flap_ys - target[flap_steps]))[::-1]
+                stack.append((start, path, offset, flap_steps[order].tolist(), plan, key))
+                if seed and first <= seed[0] < hit_step:
+                    flap_step = seed.pop(0)
+                    node = self.get_child(world, path, offset, start, flap_step, plan)
+            elif key:
+                self.kill(key)
+            seed = seed if node else []
+
+            while stack and not node:
+                start, path, offset, flap_steps, plan, key = stack[-1]
+                if flap_steps:
+                    node = self.get_child(world, path, offset, start, flap_steps.pop(), plan)
+                else:
+                    stack.pop()
+                    if key:
+                        self.kill(key)
+
+        # A slow search (e.g. the process was preempted) is only allowed to shrink the budget so far
+        node_time = (time.perf_counter() - start_time) * 1e6 / nodes
+        self.node_time = min(self.node_time + 0.1 * (node_time - self.node_time), self.budget / 4)
+        return best_plan, best_step == self.horizon
+
+    def kill(self, key: Tuple[int, int]):
+        """Marks the search node flapping on the given world step and pixel as dead"""
+
+        self.dead.setdefault(key[0], set()).add(key[1])
+
+    def get_child(self, world: Simulation, path: np.ndarray, offset: float, start: int, flap_step: int,
+                  plan: List[int]) -> Optional[tuple]:
+        """Returns the search node for flapping on flap_step along a path, or None if it is known to be dead. Nodes are
+        keyed by the world step and pixel they flap on, as nothing before the flap changes what follows it."""
+
+        flap_y = path[0, flap_step - start] + offset
+        key = (world.steps + flap_step, round(flap_y))
+        if key[1] in self.dead.get(key[0], ()):
+            return None
+        return flap_step, flap_y, self.flap_arc, 0, plan + [flap_step], key
+
+    def get_action(self, world: Simulation) -> bool:
+        """Plans ahead from the world's current state and returns True if the bird should flap now. The search is
+        seeded with what is left of the last plan, so it only does real work when that plan stops being safe."""
+
+        start_time = time.perf_counter()
+        if world.steps < self.last_step:
+            self.reset()
+        self.last_step = world.steps
+
+        # Nodes the bird has flown past can't come up again. They are dropped a step at a time, unless more steps have
+        # passed than there are steps with dead nodes (the autopilot was off), so this never costs more than a horizon.
+        if world.steps - self.pruned_step > len(self.dead):
+            self.dead = {step: ys for step, ys in self.dead.items() if step > world.steps}
+        else:
+            for step in range(self.pruned_step, world.steps + 1):
+                self.dead.pop(step, None)
+        self.pruned_step = world.steps + 1
+        gap_top, gap_bottom, target = self.get_bounds(world)
+
+        # Plans are stored by world step, so the last one carries over to this step
+        seed = [step - world.steps for step in self.plan if step >= world.steps]
+        plan, safe = self.search(world, gap_top, gap_bottom, target, start_time + self.budget / 1e6, seed)
+
+        # Without a safe plan, the bird tracks the gap ahead: it flaps whenever it is falling below the height it
+        # would flap at to head for it, and plans again next step
+        if safe:
+            flap = bool(plan) and plan[0] == 0
+            self.plan = [world.steps + step for step in plan[flap:]]
+        else:
+            flap = world.bird.velocity > 0 and world.bird.y > target[0]
+            self.plan = []
+        self.plan_time = (time.perf_counter() - start_time) * 1e6
+        return flap
+
+    def reset(self):
+        """Forgets the last plan and the dead search nodes, for a new game"""
+
+        self.plan = []
+        self.dead.clear()
+        self.pruned_step = 0
+        self.node_time = NODE_TIME
@@ -0,0 +1,231 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, List
+
+# Import standard modules
+import math
+
+# Import non-standard modules
+import numpy as np
+
+# Import local classes and methods
+from collision import CollisionModel
+from course import CourseGenerator
+from settings import WorldSettings
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    pass
+
+
+def make_courses(seeds: List[int], n_pipes: int, settings: WorldSettings = None) -> np.ndarray:
+    """Returns an (len(seeds), n_pipes) array of the gap y of each pipe pair in the course a Simulation plays when
+    started with each seed, drawn the same way as Simulation.create_new_pipes"""
+
+    return CourseGenerator(settings).generate_courses(seeds, n_pipes)
+
+
+class BatchSimulation():
+    """N independent games held as NumPy arrays and advanced together with one vectorized step. Follows the same
+    physics, pipe spawning, collision and scoring rules as Simulation, with every game starting in PLAY state like a
+    fresh launch (including the max_start_delay pause before pipes move). The bird's animation frame and angle are
+    tracked as BirdBody does, as they pick the shape the collision model tests."""
+
+    def __init__(self, n_games: int, settings: WorldSettings = None, seed: int = None, auto_reset: bool = True,
+                 courses: np.ndarray = None):
+        """Initialize the batch. If auto_reset is set, finished games restart at the end of the step they ended on.
+        Pipe gaps are drawn at random unless courses, an (n_games, n_pipes) array of gap ys such as make_courses
+        returns, is given. Each game then plays its own row, starting over from the first pipe after n_pipes. A single
+        (n_pipes,) course is shared by every game without being copied."""
+
+        self.settings = settings if settings else WorldSettings()
+        self.n_games = n_games
+        self.auto_reset = auto_reset
+        self.rng = np.random.default_rng(seed)
+        self.courses = courses
+        self.course = CourseGenerator(self.settings)
+        self.collision = CollisionModel(self.settings)
+
+        # Static world values, copied once so the step does no attribute lookups on settings
+        s = self.settings
+        self.gravity = s.gravity
+        self.max_velocity = s.max_velocity
+        self.jump_velocity = s.jump_velocity
+        self.world_velocity = s.world_velocity
+        self.ground_elev = s.ground_elev
+        self.max_start_delay = s.max_start_delay
+        self.pipe_spacing = s.pipe_spacing
+        self.half_pipe_width = s.pipe_width / 2
+        self.gap_y_min, self.gap_y_max = int(s.gap_y_min), int(s.gap_y_max)
+        self.bird_x = 150
+        self.y_0 = s.screen_height // 2
+        self.num_frames = s.bird_num_frames
+        self.animation_speed = 75
+        self.half_bird_w = s.bird_hitbox[0] / 2  # scoring and observations measure the bird by its hitbox
+        self.spawn_x = s.screen_width + self.half_pipe_width
+
+        # Pipe slots are reused round-robin. Enough slots to cover the screen plus one pair that is scrolling off.
+        self.n_slots = math.ceil((s.screen_width + s.pipe_width) / s.pipe_spacing) + 1
+
+        # Per game state
+        self.y = np.empty(n_games)
+        self.velocity = np.empty(n_games)
+        self.angle = np.empty(n_games)
+        self.prev_jump_elev = np.empty(n_games)
+        self.frame = np.empty(n_games, dtype=np.int64)
+        self.animation_time = np.empty(n_games)
+        self.score = np.zeros(n_games, dtype=np.int64)
+        self.final_score = np.zeros(n_games, dtype=np.int64)
+        self.alive = np.ones(n_games, dtype=bool)
+        self.start_delay = np.empty(n_games)
+        self.travel_distance = np.empty(n_games)
+        self.next_slot = np.zeros(n_games, dtype=np.int64)
+        self.pipe_count = np.zeros(n_games, dtype=np.int64)
+        self.steps = np.zeros(n_games, dtype=np.int64)
+
+        # Per pipe slot state, inactive slots sit at x = -inf and are marked cleared so they never collide or score
+        self.pipe_x = np.empty((n_games, self.n_slots))
+        self.gap_y = np.zeros((n_games, self.n_slots))
+        self.cleared = np.empty((n_games, self.n_slots), dtype=bool)
+
+        self.rows = np.arange(n_games)
+        self.reset()
+
+    def reset(self, mask: np.ndarray = None):
+        """Resets all games, or only those selected by a boolean mask, and spawns their first pipe pair"""
+
+        if mask is None:
+            mask = np.ones(self.n_games, dtype=bool)
+
+        self.y[mask] = self.y_0
+        self.velocity[mask] = 0
+        self.angle[mask] = 0
+        self.prev_jump_elev[mask] = 0
+        self.frame[mask] = 0
+        self.animation_time[mask] = 0
+        self.score[mask] = 0
+        self.alive[mask] = True
+        self.start_delay[mask] = 0
+        self.travel_distance[mask] = 0
+        self.steps[mask] = 0
+        self.pipe_x[mask] = -np.inf
+        self.cleared[mask] = True
+        self.next_slot[mask] = 0
+        self.pipe_count[mask] = 0
+        self.spawn_pipes(mask)
+
+    def spawn_pipes(self, mask: np.ndarray):
+        """Spawns a new pipe pair at the right edge of the screen for each selected game, with its gap taken from
+        the game's course or drawn at random"""
+
+        rows = self.rows[mask]
+        if len(rows) == 0:
+            return
+
+        slots = self.next_slot[rows]
+        self.pipe_x[rows, slots] = self.spawn_x
+        if self.courses is None:
+            low, high = self.gap_y_min, self.gap_y_max
+            if self.course.reachable:
+                # Draw from the gaps reachable from each game's previous pipe pair, if it has one
+                low, high = self.course.get_range(self.gap_y[rows, (slots - 1) % self.n_slots])
+                first = self.pipe_count[rows] == 0
+                low, high = np.where(first, self.gap_y_min, low), np.where(first, self.gap_y_max, high)
+            self.gap_y[rows, slots] = self.rng.integers(low, high + 1, size=len(rows))
+        elif self.courses.ndim == 1:
+            self.gap_y[rows, slots] = self.courses[self.pipe_count[rows] % len(self.courses)]
+        else:
+            self.gap_y[rows, slots] = self.courses[rows, self.pipe_count[rows] % self.courses.shape[1]]
+        self.cleared[rows, slots] = False
+        self.next_slot[rows] = (slots + 1) % self.n_slots
+        self.pipe_count[rows] += 1
+
+    def step(self, flap: np.ndarray, dt: float) -> np.ndarray:
+        """Advances every live game by dt milliseconds. flap is a boolean array selecting the birds that flap this
+        step. Returns a boolean array of the games that ended on this step."""
+
+        alive = self.alive
+
+        # Bird physics
+        flapped = flap & alive
+        self.velocity[:] = np.where(flapped, -self.jump_velocity, self.velocity)
+        self.prev_jump_elev[:] = np.where(flapped, self.y, self.prev_jump_elev)
+        airborne = alive & (self.y < self.ground_elev)
+        new_velocity = np.clip(self.velocity + self.gravity * dt, -self.max_velocity, self.max_velocity)
+        self.velocity[:] = np.where(airborne, new_velocity, self.velocity)
+        self.y += np.where(airborne, self.velocity * dt, 0)
+
+        # Bird animation, and rotation by how far it has fallen since its last flap, computed as hf.translate does
+        self.animation_time += np.where(alive, dt, 0)
+        next_frame = self.animation_time > self.animation_speed
+        self.animation_time[next_frame] = 0
+        self.frame[next_frame] = (self.frame[next_frame] + 1) % self.num_frames
+        low, high = self.prev_jump_elev, self.prev_jump_elev + 150
+        fallen = np.minimum(np.maximum(self.y, low), high) - low
+        self.angle[:] = np.where(airborne, fallen / (high - low) * -110 + 20, self.angle)
+
+        # Pipes only move once the start delay has elapsed
+        delayed = self.start_delay < self.max_start_delay
+        self.start_delay += np.where(alive & delayed, dt, 0)
+        moving = alive & ~delayed
+        self.pipe_x -= np.where(moving, self.world_velocity * dt, 0)[:, None]
+        self.travel_distance += np.where(moving, self.world_velocity * dt, 0)
+        spawn = self.travel_distance > self.pipe_spacing
+        if spawn.any():
+            self.spawn_pipes(spawn)
+            self.travel_distance[spawn] = 0
+
+        done = alive & self.check_collisions()
+
+        # Score pipe pairs the bird has passed
+        left = self.bird_x - self.half_bird_w
+        passed = alive[:, None] & ~self.cleared & (self.pipe_x + self.half_pipe_width < left)
+        self.cleared |= passed
+        self.score += passed.sum(axis=1) * ~done
+
+        self.steps += alive
+        self.alive &= ~done
+        if done.any():
+            self.final_score[done] = self.score[done]
+            if self.auto_reset:
+                self.reset(done)
+
+        return done
+
+    def check_collisions(self) -> np.ndarray:
+        """Returns a boolean array of the live games whose bird overlaps a pipe, the ground or the top of the screen,
+        as tested by the collision model. Only the pipe pairs in reach of a bird, and not around it entirely within
+        their gap, are row tested."""
+
+        collision = self.collision
+        angle_index = collision.get_angle_indices(self.angle)
+        left, top, width, height = collision.get_bird_rect(self.bird_x, self.y, self.frame, angle_index)
+        hit = self.alive & collision.hits_bounds(top, height)
+
+        # Pipe pairs in reach of the bird's rect, inactive slots sit at x = -inf and never are. Rounding moves a pipe
+        # pair's rect by at most half a pixel, and never past a whole pixel the bird's rect ends on, so the
+        # unrounded test finds every pair whose rect overlaps. Ended games are left out, their bird stays against
+        # the pipe pair it hit and would be row tested on every step until they're reset.
+        rows, slots = np.nonzero((self.pipe_x - self.half_pipe_width < (left + width)[:, None]) &
+                                 (self.pipe_x + self.half_pipe_width > left[:, None]) & self.alive[:, None])
+        if len(rows):
+            pipe_left, pipe_top = collision.get_pipe_rect(self.pipe_x[rows, slots], self.gap_y[rows, slots])
+            outside = ~collision.in_gap(top[rows], height[rows], pipe_top)
+            rows = rows[outside]
+            hits = collision.hits_pipes(self.frame[rows], angle_index[rows], left[rows], top[rows],
+                                        pipe_left[outside], pipe_top[outside])
+            hit[rows[hits]] = True
+
+        return hit
+
+    def observe(self) -> np.ndarray:
+        """Returns an (n_games, 4) array of bird y, bird velocity, horizontal distance to the next uncleared pipe pair
+        and that pair's gap y"""
+
+        left = self.bird_x - self.half_bird_w
+        ahead = np.where(self.pipe_x + self.half_pipe_width >= left, self.pipe_x, np.inf)
+        nearest = ahead.argmin(axis=1)
+        next_x = ahead[self.rows, nearest]
+        next_gap = np.where(np.isfinite(next_x), self.gap_y[self.rows, nearest], self.y_0)
+        next_dx = np.where(np.isfinite(next_x), next_x - self.bird_x, self.spawn_x - self.bird_x)
+        return np.stack([self.y, self.velocity, next_dx, next_gap], axis=1)
@@ -0,0 +1,302 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
+
+# Import standard modules
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+
+# Import non-standard modules
+import pygame as pg
+
+# Import local classes and methods
+from environment import FlappyEnv
+import game_functions as gf
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    pass
+
+# Seed of the pipe course the benchmarks are set up on
+SEED = 1
+
+# Operations each benchmark runs before it is timed, once it is set up
+WARMUP_OPS = 1000
+
+
+def flap_policy(observation) -> bool:
+    """Scripted flaps: flap whenever the bird drops below the middle of the next gap"""
+
+    return observation[0] > observation[3] + 15
+
+
+def start_game(env: FlappyEnv, min_pipes: int = 1) -> FlappyEnv:
+    """Resets the environment and plays until at least min_pipes pipe pairs are on screen"""
+
+    observation = env.reset(SEED)
+    while len(env.pipes) < min_pipes:
+        observation, _, done, _ = env.step(flap_policy(observation))
+        if done:
+            observation = env.reset(SEED)
+    return env
+
+
+def bench_bird_update(env: FlappyEnv) -> Tuple[Callable, int]:
+    """Bird.update in PLAY state, flapping before the bird reaches the ground"""
+
+    start_game(env)
+    bird, settings = env.bird, env.settings
+
+    def run():
+        if bird.body.y > settings.ground_elev - 100:
+            bird.body.flap()
+        bird.update(env.dt, settings)
+
+    return run, 1
+
+
+def bench_pipe_update(env: FlappyEnv) -> Tuple[Callable, int]:
+    """Pipe.update for every pipe pair on screen"""
+
+    start_game(env, min_pipes=2)
+    pipes = env.pipes.sprites()
+
+    def run():
+        for pipe in pipes:
+            pipe.update(env.dt)
+
+    return run, len(pipes)
+
+
+def bench_scroll_update(env: FlappyEnv) -> Tuple[Callable, int]:
+    """ScrollElem.update for the background and ground"""
+
+    def run():
+        env.background.update(env.dt)
+        env.ground.update(env.dt)
+
+    return run, 2
+
+
+def bench_scroll_blitme(env: FlappyEnv) -> Tuple[Callable, int]:
+    """ScrollElem.blitme for the background and ground"""
+
+    def run():
+        env.background.blitme()
+        env.ground.blitme()
+
+    return run, 2
+
+
+def bench_check_collisions(env: FlappyEnv) -> Tuple[Callable, int]:
+    """gf.check_collisions with the bird level in the middle of the gap of a pipe pair it overlaps, the common case
+    mid-game, so the pipe pair is tested without ending the game"""
+
+    start_game(env)
+    world, bird = env.world, env.bird
+    while not list(world.get_overlapping_pipes(bird.rect.left, bird.rect.right)):
+        gf.update_world(world, env.pipes, env.pipe_pool, env.dt, env.screen, env.settings)
+    pair = next(world.get_overlapping_pipes(bird.rect.left, bird.rect.right))
+    bird.body.angle, bird.body.y = 0, pair.gap_y
+
+    def run():
+        gf.check_collisions(world, bird, env.buttons, env.stats, env.settings)
+
+    run()
+    if env.settings.current_state != 'PLAY':
+        raise RuntimeError('check_collisions benchmark set up with the bird colliding')
+    return run, 1
+
+
+def bench_check_score(env: FlappyEnv) -> Tuple[Callable, int]:
+    """gf.check_score mid-game"""
+
+    start_game(env, min_pipes=2)
+
+    def run():
+        gf.check_score(env.world, env.stats)
+
+    return run, 1
+
+
+def bench_compose_digits(env: FlappyEnv) -> Tuple[Callable, int]:
+    """DigitRenderer.compose for a four digit score, as run on a cache miss"""
+
+    digits = env.stats.big_digits
+
+    def run():
+        digits.compose(1234)
+
+    return run, 1
+
+
+def bench_render_digits(env: FlappyEnv) -> Tuple[Callable, int]:
+    """DigitRenderer.render and a blit for 50 cached scores, as for a screen of scores"""
+
+    digits = env.stats.big_digits
+    surface = pg.Surface(env.screen.get_size())
+    for value in range(50):
+        digits.render(value)
+
+    def run():
+        for value in range(50):
+            digits.blit(surface, value, 0, 0)
+
+    return run, 50
+
+
+def bench_draw(env: FlappyEnv) -> Tuple[Callable, int]:
+    """A full gf.draw frame in PLAY state, without pushing it to the display"""
+
+    start_game(env, min_pipes=2)
+
+    def run():
+        gf.draw(env.dt, env.bird, env.pipes, env.background, env.ground, env.buttons, env.frozen_layer, env.screen,
+                env.stats, env.settings)
+
+    return run, 1
+
+
+def bench_game(env: FlappyEnv) -> Tuple[Callable, int]:
+    """End to end headless games with scripted flaps, stepped at the physics rate and rendered every other step"""
+
+    steps = 1000
+    state = {'observation': env.reset(SEED)}
+
+    def run():
+        observation = state['observation']
+        for step in range(steps):
+            observation, _, done, _ = env.step(flap_policy(observation))
+            if step % 2:
+                env.render()
+            if done:
+                observation = env.reset(SEED)
+        state['observation'] = observation
+
+    return run, steps
+
+
+BENCHMARKS: Dict[str, Callable[[FlappyEnv], Tuple[Callable, int]]] = {
+    'bird_update': bench_bird_update,
+    'pipe_update': bench_pipe_update,
+    'scroll_update': bench_scroll_update,
+    'scroll_blitme': bench_scroll_blitme,
+    'check_collisions': bench_check_collisions,
+    'check_score': bench_check_score,
+    'compose_digits': bench_compose_digits,
+    'render_digits': bench_render_digits,
+    'draw': bench_draw,
+    'game': bench_game,
+}
+
+
+def run_benchmark(name: str, repeat: int = 5) -> dict:
+    """Runs a benchmark on a fresh headless environment, reset to SEED, so its result doesn't depend on what ran
+    before it. It is warmed up with WARMUP_OPS operations, then timed for repeat rounds of at least 0.2 s and the
+    fastest round is kept. Returns the time per operation in microseconds and the operations per second."""
+
+    env = FlappyEnv(headless=True)
+    env.reset(SEED)
+    try:
+        run, ops = BENCHMARKS[name](env)
+        for _ in range(-(-WARMUP_OPS // ops)):
+            run()
+
+        timer = timeit.Timer(run)
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat, number)) / number
+    finally:
+        env.close()
+    return {'us_per_op': best / ops * 1e6, 'ops_per_sec': ops / best}
+
+
+def run_benchmarks(names: List[str], repeat: int = 5) -> dict:
+    """Runs the named benchmarks, each on its own environment. Returns the results with the time per operation in
+    microseconds."""
+
+    results = {name: run_benchmark(name, repeat) for name in names}
+
+    return {
+        'meta': {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'pygame': pg.version.ver,
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+        },
+        'results': results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> Tuple[List[str], List[str], List[str]]:
+    """Returns the names of the benchmarks that are slower than the baseline by more than threshold (a fraction), of
+    those that were run but aren't in the baseline, and of those in the baseline that no longer exist. A removed
+    benchmark means the baseline no longer guards what it timed, so it needs regenerating."""
+
+    regressions = []
+    added = []
+    for name, result in results['results'].items():
+        if name in baseline['results']:
+            ratio = result['us_per_op'] / baseline['results'][name]['us_per_op']
+            if ratio > 1 + threshold:
+                regressions.append(name)
+        else:
+            added.append(name)
+    removed = [name for name in baseline['results'] if name not in BENCHMARKS]
+    return regressions, added, removed
+
+
+def main():
+    """Runs the benchmark suite, optionally saving the results and comparing them against a baseline"""
+
+    parser = argparse.ArgumentParser(description='Benchmark the Flappy Bird simulation and rendering hot paths')
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument('--output', metavar='PATH', help='save the results as JSON, e.g. to use as a baseline')
+    parser.add_argument('--baseline', metavar='PATH', help='compare against results saved with --output')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='fraction slower than the baseline that counts as a regression (default: 0.15)')
+    parser.add_argument('--repeat', type=int, default=5, help='timing rounds per benchmark, the best is kept')
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark '{name}', choose from {', '.join(BENCHMARKS)}")
+
+    results = run_benchmarks(args.names or list(BENCHMARKS), args.repeat)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    print(f"{'benchmark':<22}{'us/op':>12}{'ops/s':>14}{'vs baseline':>14}")
+    for name, result in results['results'].items():
+        change = ''
+        if baseline and name in baseline['results']:
+            change = f"{result['us_per_op'] / baseline['results'][name]['us_per_op'] - 1:+.1%}"
+        print(f"{name:<22}{result['us_per_op']:>12.2f}{result['ops_per_sec']:>14.0f}{change:>14}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if baseline:
+        regressions, added, removed = compare(results, baseline, args.threshold)
+        if added:
+            print(f"Not in the baseline: {', '.join(added)}")
+        if removed:
+            print(f"Removed since the baseline: {', '.join(removed)}")
+        if regressions:
+            print(f"Regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+        if regressions or removed:
+            sys.exit(1)
+        print(f'No regressions over {args.threshold:.0%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -3,8 +3,6 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 # Import standard modules
-import math
-from math import pi as PI
 
 # Import non-standard modules
 import pygame as pg
@@ -16,34 +14,29 @@ import helper_functions as hf
 # Import local class and methods that are only used for type hinting
 if TYPE_CHECKING:
     from settings import Settings
+    from simulation import BirdBody
 
 
 class Bird(Sprite):
-    """A class for the bird"""
+    """A class for the bird. Draws a BirdBody from the simulation and plays its sound effects."""
 
-    def __init__(self, screen: pg.Surface, settings: Settings):
+    def __init__(self, screen: pg.Surface, settings: Settings, body: BirdBody):
         """Initialize the bird's settings"""
 
         super(Bird, self).__init__()
         self.screen = screen
         self.screen_rect = self.screen.get_rect()
+        self.body = body
 
-        # Physics parameters
-        self.accel = settings.gravity
-        self.max_velocity = settings.max_velocity
-        self.jump_velocity = settings.jump_velocity
-
-        # Image
+        # Image and rotated frames are looked up from the cache built by settings. Collisions are tested by the
+        # simulation, against the same rotated frames.
         self.color = 0  # 0 = Yellow, 1 = Red, 2 = Blue
         self.frames = settings.bird_frames
-        self.image_orig = self.frames[self.color][0]
-        self.image = self.image_orig.copy()
-        self.mask = pg.mask.from_surface(self.image)
+        self.rotations = settings.bird_rotations
+        self.min_angle, self.max_angle = settings.bird_min_angle, settings.bird_max_angle
+        self.angle_step = settings.bird_angle_step
+        self.image = self.rotations[(self.color, 0, 0)]
         self.rect = self.image.get_rect()
-        self.animation_speed = 75
-        self.idle_period = 3000
-        self.idle_amp = 50
-        self.y_0 = self.screen_rect.centery
 
         # Sound effects
         self.sfx_flap = settings.sfx_flap
@@ -56,24 +49,8 @@ class Bird(Sprite):
     def init_dynamic_variables(self):
         """Initializes the birds's dynamic variables"""
 
-        # Positioning
-        self.x = 150
-        self.y = self.y_0
-        self.rect.center = (self.x, self.y)
-        self.velocity = 0
-        self.angle = 0
-        self.prev_jump_elev = 0
-        self.current_frame = 0
-        self.animation_time = 0
-        self.idle_time = 0
-
-    def flap(self):
-        """Jump the bird"""
-
-        # Update the bird's velocity
-        self.velocity = -self.jump_velocity
-        self.prev_jump_elev = self.y
-        self.sfx_flap.play()
+        self.body.init_dynamic_variables()
+        self.rect.center = (self.body.x, self.body.y)
 
     def change_color(self):
         """Changes the color of the bird by updating the reference to a new spritesheet and plays the sound effect"""
@@ -85,38 +62,24 @@ class Bird(Sprite):
     def update(self, dt: int, settings: Settings):
         """Update the bird's animation and location"""
 
-        # Update the animation
-        if settings.current_state != 'GAMEOVER':
-            self.animation_time += dt
-            if self.animation_time > self.animation_speed:
-                self.animation_time = 0
-                self.current_frame = (self.current_frame + 1) % len(self.frames[0])
-                self.image_orig = self.frames[self.color][self.current_frame]
-
-        # At beginning of game, bird animates smoothly up and down
-        if settings.current_state in ['SPLASH', 'READY']:
-            self.idle_time = (self.idle_time + dt) % self.idle_period
-            theta = self.idle_time / self.idle_period * 2 * PI
-            self.y = self.y_0 + self.idle_amp * math.sin(theta)
-            self.angle = -45 * math.cos(theta)
-
-        # During PLAY state, bird is affected by gravity and rotates based on flaps
-        elif settings.current_state in ['PLAY', 'GAMEOVER']:
-
-            # Update the bird's velocity and position
-            if self.y < settings.ground_elev:
-                new_velocity = self.velocity + self.accel * dt
-                self.velocity = hf.clamp(new_velocity, -self.max_velocity, self.max_velocity)
-                self.y += self.velocity * dt
-
-                # Rotate the bird based on previous jump elevation
-                self.angle = hf.translate(self.y, self.prev_jump_elev, self.prev_jump_elev + 150, 20, -90)
-
-        # Update the rect
-        self.image = pg.transform.rotate(self.image_orig, self.angle)
+        # Step the bird's physics and animation
+        self.body.update(dt, settings.current_state)
+
+        # Look up the rotated image, then update the rect
+        angle = hf.quantize(self.body.angle, self.angle_step, self.min_angle, self.max_angle)
+        self.image = self.rotations[(self.color, self.body.current_frame, angle)]
+        self.rect = self.image.get_rect()
+        self.rect.center = self.body.x, self.body.y
+
+    def interpolate(self, alpha: float):
+        """Places the image between the bird's previous and current simulation steps for drawing"""
+
+        body = self.body
+        angle = hf.lerp(body.prev_angle, body.angle, alpha)
+        angle = hf.quantize(angle, self.angle_step, self.min_angle, self.max_angle)
+        self.image = self.rotations[(self.color, body.current_frame, angle)]
         self.rect = self.image.get_rect()
-        self.rect.center = self.x, self.y
-        self.mask = pg.mask.from_surface(self.image)
+        self.rect.center = hf.lerp(body.prev_x, body.x, alpha), hf.lerp(body.prev_y, body.y, alpha)
 
     def blitme(self):
         """Draw the bird at its current location"""
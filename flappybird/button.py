@@ -50,7 +50,12 @@ class Button(Sprite):
         """Initializes the button's dynamic variables"""
 
         self.active = False  # Controls if button is clickable (doesn't control visibility)
-        self.image.set_alpha(0)  # Button will be faded in later in draw function
+        self.image.set_alpha(0)  # Button will be faded in at game over, then activated
+
+    def activate(self):
+        """Makes the button clickable"""
+
+        self.active = True
 
     def draw(self, mouse_pos: tuple):
         """Draw the button to the screen. Mouse_pos will affect hover behavior"""
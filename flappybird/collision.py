@@ -0,0 +1,228 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, Tuple, Union
+
+# Import standard modules
+import functools
+import os
+
+# Import non-standard modules
+import numpy as np
+import pygame as pg
+
+# Import local classes and methods
+import helper_functions as hf
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    from settings import WorldSettings
+
+# Sprites the collision shapes are measured from. Every bird color shares one silhouette, as do both pipe colors.
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'assets', 'images')
+BIRD_SHEET = 'bird_sheet_yellow.png'
+PIPE_IMAGE = 'pipe_green.png'
+BLACK = (0, 0, 0)
+
+# Span of an empty row. Its left end is past its right, so it never overlaps anything.
+EMPTY_LEFT, EMPTY_RIGHT = 2**30, -2**30
+
+
+def to_pixel(value: float) -> int:
+    """Rounds a coordinate to a whole pixel the way pygame's Rect does, half away from zero"""
+
+    return int(value + 0.5) if value >= 0 else -int(0.5 - value)
+
+
+def to_pixels(values: np.ndarray) -> np.ndarray:
+    """Array version of to_pixel"""
+
+    return np.copysign(np.floor(np.abs(values) + 0.5), values).astype(np.int64)
+
+
+def get_row_spans(mask: pg.mask.Mask, height: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the leftmost and rightmost set pixel of each of a mask's rows, with empty rows (and rows added to pad
+    the mask to height) marked by EMPTY_LEFT and EMPTY_RIGHT"""
+
+    filled = pg.surfarray.array_red(mask.to_surface()).T > 0
+    rows = max(height, len(filled))
+    left = np.full(rows, EMPTY_LEFT, dtype=np.int64)
+    right = np.full(rows, EMPTY_RIGHT, dtype=np.int64)
+    any_set = filled.any(axis=1)
+    left[:len(filled)][any_set] = filled[any_set].argmax(axis=1)
+    right[:len(filled)][any_set] = filled.shape[1] - 1 - filled[any_set, ::-1].argmax(axis=1)
+    return left, right
+
+
+def load_sheet(file_name: str, scale: float) -> pg.Surface:
+    """Loads and scales an image from the game's images, without needing a display"""
+
+    image = pg.image.load(os.path.join(IMAGES_DIR, file_name))
+    width, height = image.get_size()
+    return pg.transform.scale(image, (width * scale, height * scale))
+
+
+@functools.lru_cache(maxsize=None)
+def load_bird_shapes(scale: float, n_frames: int, min_angle: int, max_angle: int,
+                     angle_step: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Measures the bird's sprite, sliced into frames and rotated as hf.load_frames and hf.load_rotations do for the
+    game. Returns the (width, height) of each rotated frame, indexed [frame, angle], and the left and right ends of
+    each of its rows, indexed [frame, angle, row] and padded to the tallest frame. Measured once per process."""
+
+    sheet = load_sheet(BIRD_SHEET, scale)
+    width, height = sheet.get_width() / n_frames, sheet.get_height()
+    angles = range(min_angle, max_angle + 1, angle_step)
+
+    masks = []
+    for i in range(n_frames):
+        image = pg.Surface((width, height), 0, 32)
+        image.blit(sheet, (0, 0), (i * width, 0, width, height))
+        image.set_colorkey(BLACK)
+        masks.append([pg.mask.from_surface(pg.transform.rotate(image, angle)) for angle in angles])
+
+    sizes = np.array([[mask.get_size() for mask in frame] for frame in masks], dtype=np.int64)
+    max_height = sizes[..., 1].max()
+    left = np.empty((n_frames, len(angles), max_height), dtype=np.int64)
+    right = np.empty_like(left)
+    for i, frame in enumerate(masks):
+        for j, mask in enumerate(frame):
+            left[i, j], right[i, j] = get_row_spans(mask, max_height)
+    return sizes, left, right
+
+
+@functools.lru_cache(maxsize=None)
+def load_pipe_spans(scale: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Measures the (bottom) pipe sprite. Returns the left and right ends of each of its rows, top to bottom. Measured
+    once per process."""
+
+    mask = pg.mask.from_surface(load_sheet(PIPE_IMAGE, scale))
+    left, right = get_row_spans(mask)
+    filled = left <= right
+    if mask.count() != (right[filled] - left[filled] + 1).sum():
+        raise ValueError('pipe rows must be solid between their ends to collide by row spans')
+    return left, right
+
+
+class CollisionModel():
+    """The bird and pipe pair shapes the world collides with, and the test between them. Used by Simulation,
+    BatchSimulation and through them the game, so every way of stepping the world ends runs on the same step.
+
+    Shapes are the pixel masks of the game's sprites, stored as the span each row covers, and placed on the screen
+    the same way as the sprites' rects: the bird's rotated frame centered on its position, the pipe pair's image on
+    its center and gap. A pipe row is solid between its ends and wider than any bird row, so two rows overlap exactly
+    when their spans do, and the test matches pygame's mask collision pixel for pixel. As in the game, the ground and
+    the top of the screen collide with the bird's rect rather than its mask."""
+
+    def __init__(self, settings: WorldSettings):
+        """Initialize the shapes for the bird and the pipe pairs' gap height"""
+
+        s = settings
+        self.ground_elev = s.ground_elev
+        self.min_angle, self.max_angle, self.angle_step = s.bird_min_angle, s.bird_max_angle, s.bird_angle_step
+        self.bird_sizes, self.bird_left, self.bird_right = load_bird_shapes(s.img_scale, s.bird_num_frames,
+                                                                            self.min_angle, self.max_angle,
+                                                                            self.angle_step)
+        self.bird_widths, self.bird_heights = self.bird_sizes[..., 0].copy(), self.bird_sizes[..., 1].copy()
+        self.bird_size_list = self.bird_sizes.tolist()  # for single birds, without NumPy's per call overhead
+
+        # Pipe pair as hf.stack_pipes draws it: the top pipe flipped, the gap, then the bottom pipe
+        pipe_left, pipe_right = load_pipe_spans(s.img_scale)
+        gap_height = int(s.gap_height)
+        self.pipe_left = np.concatenate([pipe_left[::-1], np.full(gap_height, EMPTY_LEFT), pipe_left])
+        self.pipe_right = np.concatenate([pipe_right[::-1], np.full(gap_height, EMPTY_RIGHT), pipe_right])
+        self.pipe_width = int(pipe_right.max()) + 1
+        self.pipe_height = len(self.pipe_left)
+        self.gap_top, self.gap_bottom = len(pipe_left), len(pipe_left) + gap_height  # gap rows of the pair
+        self.rows = np.arange(self.bird_left.shape[-1])
+
+        bird_rows = self.bird_right - self.bird_left
+        pipe_rows = pipe_right - pipe_left
+        if bird_rows.max() >= pipe_rows[pipe_rows >= 0].min():
+            raise ValueError('pipe rows must be wider than the bird to collide by row spans')
+
+    def get_angle_index(self, angle: float) -> int:
+        """Returns the index of the rotated frame the bird is drawn with at angle"""
+
+        return (hf.quantize(angle, self.angle_step, self.min_angle, self.max_angle) - self.min_angle) // self.angle_step
+
+    def get_angle_indices(self, angles: np.ndarray) -> np.ndarray:
+        """Array version of get_angle_index"""
+
+        angles = np.rint(angles / self.angle_step).astype(np.int64) * self.angle_step
+        return (np.clip(angles, self.min_angle, self.max_angle) - self.min_angle) // self.angle_step
+
+    def get_bird_rect(self, x: float, y: float, frame: int, angle_index: int) -> Tuple[int, int, int, int]:
+        """Returns the (left, top, width, height) of the bird's rect at (x, y). Works on single birds and on arrays of
+        them."""
+
+        if isinstance(x, np.ndarray) or isinstance(y, np.ndarray):
+            width, height = self.bird_widths[frame, angle_index], self.bird_heights[frame, angle_index]
+            return to_pixels(x) - width // 2, to_pixels(y) - height // 2, width, height
+
+        width, height = self.bird_size_list[frame][angle_index]
+        return to_pixel(x) - width // 2, to_pixel(y) - height // 2, width, height
+
+    def get_pipe_rect(self, x: float, gap_y: float) -> Tuple[int, int]:
+        """Returns the left and top of a pipe pair's rect, the top pipe's top left corner. Works on single pipe pairs
+        and on arrays of them."""
+
+        if isinstance(x, np.ndarray) or isinstance(gap_y, np.ndarray):
+            return to_pixels(x) - self.pipe_width // 2, to_pixels(gap_y) - self.pipe_height // 2
+
+        return to_pixel(x) - self.pipe_width // 2, to_pixel(gap_y) - self.pipe_height // 2
+
+    def hits_bounds(self, top: Union[int, np.ndarray], height: Union[int, np.ndarray]) -> Union[bool, np.ndarray]:
+        """Returns whether a bird rect reaches below the ground or above the top of the screen"""
+
+        return (top + height > self.ground_elev) | (top < 0)
+
+    def in_gap(self, top: Union[int, np.ndarray], height: Union[int, np.ndarray],
+               pipe_top: Union[int, np.ndarray]) -> Union[bool, np.ndarray]:
+        """Returns whether a bird rect lies entirely within the rows of a pipe pair's gap, so it can't hit it"""
+
+        return (top - pipe_top >= self.gap_top) & (top - pipe_top + height <= self.gap_bottom)
+
+    def hits_pipes(self, frame: np.ndarray, angle_index: np.ndarray, left: np.ndarray, top: np.ndarray,
+                   pipe_left: np.ndarray, pipe_top: np.ndarray) -> np.ndarray:
+        """Returns whether each bird, given by its frame, angle index and rect, overlaps the pipe pair at the
+        matching rect"""
+
+        pipe_rows = (top - pipe_top)[:, None] + self.rows
+        on_pipe = (pipe_rows >= 0) & (pipe_rows < self.pipe_height)
+        pipe_rows = np.clip(pipe_rows, 0, self.pipe_height - 1)
+
+        # Overlap of each bird row with the pipe row beside it, in the pipe pair's coordinates
+        offset = (left - pipe_left)[:, None]
+        start = np.maximum(self.bird_left[frame, angle_index] + offset, self.pipe_left[pipe_rows])
+        end = np.minimum(self.bird_right[frame, angle_index] + offset, self.pipe_right[pipe_rows])
+        return (on_pipe & (start <= end)).any(axis=1)
+
+    def hits_pipe(self, frame: int, angle_index: int, left: int, top: int, height: int, pipe_left: int,
+                  pipe_top: int) -> bool:
+        """Returns whether a bird overlaps a pipe pair. Birds within the gap's rows are ruled out without a row
+        test."""
+
+        if self.in_gap(top, height, pipe_top):
+            return False
+        return bool(self.hits_pipes(frame, angle_index, np.array([left]), np.array([top]), np.array([pipe_left]),
+                                    np.array([pipe_top]))[0])
+
+    def get_extents(self) -> Tuple[Dict[int, Tuple[int, int, int, int]], int]:
+        """Returns, keyed by angle, how far the bird reaches above and below its center when colliding with pipes (its
+        shape) and with the top of the screen and the ground (its rect), taking the largest over every animation
+        frame. Also returns the furthest its shape reaches to either side of its center at any angle."""
+
+        extents = {}
+        half_w = 0
+        filled = self.bird_left <= self.bird_right
+        for j, angle in enumerate(range(self.min_angle, self.max_angle + 1, self.angle_step)):
+            for i in range(len(self.bird_sizes)):
+                w, h = (int(size) for size in self.bird_sizes[i, j])
+                rows = np.flatnonzero(filled[i, j])
+
+                # Rects are placed by center, so the top-left pixel sits at center - size // 2
+                angle_extents = (h // 2 - int(rows[0]), int(rows[-1]) + 1 - h // 2, h // 2, h - h // 2)
+                extents[angle] = tuple(max(a, b) for a, b in zip(extents.get(angle, angle_extents), angle_extents))
+                half_w = max(half_w, w // 2 - int(self.bird_left[i, j, rows].min()),
+                             int(self.bird_right[i, j, rows].max()) + 1 - w // 2)
+
+        return extents, half_w
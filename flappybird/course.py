@@ -0,0 +1,131 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
+
+# Import standard modules
+import math
+import random
+
+# Import non-standard modules
+import numpy as np
+
+# Import local classes and methods
+from settings import WorldSettings
+from collision import CollisionModel
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    pass
+
+
+class CourseGenerator():
+    """Draws the gap heights of pipe courses. With reachable_gaps set, each gap is drawn uniformly from the heights the
+    bird can physically get to from the previous gap, instead of from the full range, so that no course asks for a
+    climb or drop the bird can't make. The reachable envelope is worked out once from the physics settings and the
+    collision shapes, by stepping the bird the same way BirdBody does."""
+
+    def __init__(self, settings: WorldSettings = None, margin: float = 0):
+        """Initialize the generator and work out the envelope. margin shrinks the envelope by that many pixels on
+        each side, for bots or players that can't fly a perfect line."""
+
+        self.settings = settings if settings else WorldSettings()
+        s = self.settings
+        self.gap_y_min, self.gap_y_max = int(s.gap_y_min), int(s.gap_y_max)
+        self.reachable = s.reachable_gaps
+        self.step_dt = 1000 / s.physics_rate
+        move = s.world_velocity * self.step_dt
+
+        # The bird collides with the same shapes as in the simulation: its sprite's mask against the pipes, and the
+        # furthest it reaches at any angle and animation frame is taken, so no course relies on a lucky pose
+        extents, half_w = CollisionModel(s).get_extents()
+
+        # Pipe pairs spawn on the first step their travel distance exceeds pipe_spacing. Between leaving one pipe
+        # pair and reaching the next, the bird's shape is clear of both for free_steps steps.
+        spacing = (math.floor(s.pipe_spacing / move) + 1) * move
+        self.free_steps = max(0, math.floor((spacing - s.pipe_width - 2 * half_w) / move))
+
+        # Room the bird's center has to move within a gap
+        self.band = max(0, s.gap_height - max(up + down for up, down, _, _ in extents.values()))
+
+        # Climbing, the bird leaves the top of one gap rising as fast as it can and flaps every step until it
+        # reaches the bottom of the next
+        self.max_climb = max(0, self.band - self.fly(-s.jump_velocity, self.free_steps, flap=True) - margin)
+
+        # Dropping, the bird leaves the bottom of one gap falling as fast as it could get to from the top of it and
+        # falls until it reaches the top of the next
+        exit_velocity = self.get_fall_velocity(self.band)
+        self.max_drop = max(0, self.band + self.fly(exit_velocity, self.free_steps, flap=False) - margin)
+
+    def fly(self, velocity: float, steps: int, flap: bool) -> float:
+        """Returns how far the bird moves down in the given number of steps, starting at velocity and flapping on
+        every step if flap is set"""
+
+        s = self.settings
+        y = 0
+        for _ in range(steps):
+            if flap:
+                velocity = -s.jump_velocity
+            velocity = min(max(velocity + s.gravity * self.step_dt, -s.max_velocity), s.max_velocity)
+            y += velocity * self.step_dt
+        return y
+
+    def get_fall_velocity(self, distance: float) -> float:
+        """Returns the bird's velocity after falling the given distance from rest"""
+
+        s = self.settings
+        y = velocity = 0
+        while y < distance and velocity < s.max_velocity:
+            velocity = min(velocity + s.gravity * self.step_dt, s.max_velocity)
+            y += velocity * self.step_dt
+        return velocity
+
+    def get_range(self, prev_gap_y: Union[float, np.ndarray]) -> Tuple[Union[int, np.ndarray],
+                                                                           Union[int, np.ndarray]]:
+        """Returns the lowest and highest gap y reachable from a gap at prev_gap_y. Works on single gaps and on
+        arrays of them."""
+
+        low = np.maximum(self.gap_y_min, np.ceil(prev_gap_y - self.max_climb)).astype(np.int64)
+        high = np.minimum(self.gap_y_max, np.floor(prev_gap_y + self.max_drop)).astype(np.int64)
+        return low, np.maximum(low, high)
+
+    def next_gap(self, rng: random.Random, prev_gap_y: Optional[int]) -> int:
+        """Draws the gap y of the next pipe pair after one at prev_gap_y, or of the first pipe pair of a course if it
+        is None. Draws once from rng either way, so courses stay the same length in draws."""
+
+        if prev_gap_y is None or not self.reachable:
+            return rng.randint(self.gap_y_min, self.gap_y_max)
+
+        low, high = self.get_range(prev_gap_y)
+        return rng.randint(int(low), int(high))
+
+    def generate(self, seed: int, n_pipes: int, dtype: type = np.int16) -> np.ndarray:
+        """Returns the gap ys of the first n_pipes pipe pairs a Simulation started with seed plays"""
+
+        rng = random.Random(seed)
+        course = np.empty(n_pipes, dtype=dtype)
+        gap_y = None
+        for i in range(n_pipes):
+            gap_y = self.next_gap(rng, gap_y)
+            course[i] = gap_y
+        return course
+
+    def generate_courses(self, seeds: List[int], n_pipes: int, dtype: type = np.int16) -> np.ndarray:
+        """Returns an (len(seeds), n_pipes) array of the courses played with each seed"""
+
+        courses = np.empty((len(seeds), n_pipes), dtype=dtype)
+        for i, seed in enumerate(seeds):
+            courses[i] = self.generate(seed, n_pipes, dtype)
+        return courses
+
+
+def save_courses(path: str, courses: np.ndarray):
+    """Saves pre-generated courses to path as a .npy file"""
+
+    np.save(path, courses)
+
+
+def load_courses(path: str) -> np.ndarray:
+    """Loads courses saved with save_courses. The file is memory mapped read only, so processes that load the same
+    courses share one copy."""
+
+    return np.load(path, mmap_mode='r')
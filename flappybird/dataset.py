@@ -0,0 +1,210 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, List, Union
+
+# Import standard modules
+import glob
+import os
+import threading
+import zipfile
+
+# Import non-standard modules
+import numpy as np
+
+# Import local classes and methods
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    from settings import WorldSettings
+    from simulation import Simulation
+
+# One record per simulation step: the world after the step and how many times the bird flapped on it. The run is
+# identified by its seed, as in replays, or -1 for steps outside a run (in the SPLASH and READY states). State indexes
+# WorldSettings.game_states. Pipe fields hold the next two uncleared pipe pairs, NaN where there isn't one.
+RECORD_DTYPE = np.dtype([('seed', np.int64), ('step', np.int32), ('state', np.uint8), ('flaps', np.uint8),
+                         ('score', np.int32), ('bird_y', np.float32), ('velocity', np.float32),
+                         ('angle', np.float32), ('pipe_x', np.float32, (2,)), ('gap_y', np.float32, (2,))])
+
+SHARD_PATTERN = 'shard_{:06d}'
+
+
+class FrameRecorder():
+    """Streams per step gameplay records to sharded files in a directory. Records go into a fixed size ring buffer on
+    the game thread and are written out by a worker thread, so recording never waits on the disk. If the writer
+    falls a whole buffer behind, new records are dropped and counted rather than growing memory. Shards are .npy
+    files that can be memory mapped, or compressed .npz files if compress is set."""
+
+    def __init__(self, path: str, capacity: int = 2**16, shard_size: int = 2**16, compress: bool = False,
+                 flush_interval: float = 0.5):
+        """Start recording to the directory at path. Shard numbering carries on from any shards already in it."""
+
+        self.path = path
+        self.capacity = capacity
+        self.shard_size = shard_size  # records per shard, the last shard of a session may be shorter
+        self.compress = compress
+        self.flush_interval = flush_interval  # seconds the writer sleeps between drains of the buffer
+        os.makedirs(path, exist_ok=True)
+        self.shard_index = len(get_shard_paths(path))
+
+        # Ring buffer. Only the game thread moves head and only the writer moves tail, records between them are
+        # waiting to be written.
+        self.buffer = np.zeros(capacity, dtype=RECORD_DTYPE)
+        self.head = 0
+        self.tail = 0
+        self.dropped = 0
+
+        # Flaps of the run being recorded, and how many of them have been recorded so far
+        self.flap_steps: List[int] = []
+        self.n_flaps = 0
+
+        # Shard being filled by the writer
+        self.shard = np.zeros(shard_size, dtype=RECORD_DTYPE)
+        self.shard_fill = 0
+
+        self.stop = threading.Event()
+        self.writer_error = None
+        self.writer = threading.Thread(target=self.write_records, name='frame_writer', daemon=True)
+        self.writer.start()
+
+    def record(self, world: Simulation, settings: WorldSettings):
+        """Records the world as it is after a simulation step. Returns immediately."""
+
+        # Flaps are recorded by the simulation, those added since the last record were made on this step. Each run
+        # starts a new list of them.
+        if world.flap_steps is not self.flap_steps:
+            self.flap_steps = world.flap_steps
+            self.n_flaps = 0
+        flaps = len(self.flap_steps) - self.n_flaps
+        self.n_flaps = len(self.flap_steps)
+
+        if self.head - self.tail >= self.capacity:
+            self.dropped += 1
+            return
+
+        pipes = world.pipes
+        ahead = [pipes[i] for i in range(world.next_pipe, min(world.next_pipe + 2, len(pipes)))]
+        pipe_x = [pipe.x for pipe in ahead] + [np.nan] * (2 - len(ahead))
+        gap_y = [pipe.gap_y for pipe in ahead] + [np.nan] * (2 - len(ahead))
+        bird = world.bird
+        # The world keeps the last run's seed until the next starts, so steps between runs are tagged by state
+        seed = world.seed if settings.current_state in ('PLAY', 'GAMEOVER') else -1
+        self.buffer[self.head % self.capacity] = (seed, world.steps,
+                                                  settings.game_states.index(settings.current_state), flaps,
+                                                  world.score, bird.y, bird.velocity, bird.angle, pipe_x, gap_y)
+        self.head += 1
+
+    def write_records(self):
+        """Writer thread. Moves waiting records from the ring buffer into shards every flush_interval seconds,
+        writing each shard out as it fills, until stopped. Whatever is left is written as a final, shorter shard."""
+
+        try:
+            while not self.stop.wait(self.flush_interval):
+                self.drain()
+            self.drain()
+            if self.shard_fill:
+                self.write_shard(self.shard[:self.shard_fill])
+                self.shard_fill = 0
+
+        # Raised on the game thread by close, rather than lost with the thread
+        except Exception as error:
+            self.writer_error = error
+
+    def drain(self):
+        """Copies the records waiting in the ring buffer into the current shard, writing shards out as they fill"""
+
+        head = self.head
+        while self.tail < head:
+            start = self.tail % self.capacity
+            n = min(head - self.tail, self.capacity - start, self.shard_size - self.shard_fill)
+            self.shard[self.shard_fill:self.shard_fill + n] = self.buffer[start:start + n]
+            self.shard_fill += n
+            self.tail += n
+
+            if self.shard_fill == self.shard_size:
+                self.write_shard(self.shard)
+                self.shard_fill = 0
+
+    def write_shard(self, records: np.ndarray):
+        """Writes a shard, to a temporary file first so a crash can't leave a partial shard behind"""
+
+        name = os.path.join(self.path, SHARD_PATTERN.format(self.shard_index))
+        extension = '.npz' if self.compress else '.npy'
+        temp_path = name + '.tmp' + extension
+        if self.compress:
+            np.savez_compressed(temp_path, records=records)
+        else:
+            np.save(temp_path, records)
+        os.replace(temp_path, name + extension)
+        self.shard_index += 1
+
+    def close(self):
+        """Writes every record still waiting, then stops the writer"""
+
+        if self.writer.is_alive():
+            self.stop.set()
+            self.writer.join()
+        if self.writer_error:
+            raise self.writer_error
+
+
+def get_shard_paths(path: str) -> List[str]:
+    """Returns the paths of the shards in a dataset directory, in order"""
+
+    paths = glob.glob(os.path.join(path, 'shard_*.np[yz]'))
+    return sorted(path for path in paths if '.tmp.' not in path)
+
+
+class FrameDataset():
+    """Random access to the records of a dataset directory as one sequence. .npy shards are memory mapped, so only
+    the records read are loaded. .npz shards are decompressed whole the first time they're read."""
+
+    def __init__(self, path: str):
+        """Open the shards in the directory at path"""
+
+        self.shards = [np.load(shard_path, mmap_mode='r') if shard_path.endswith('.npy') else shard_path
+                       for shard_path in get_shard_paths(path)]
+        self.lengths = np.array([self.get_length(shard) for shard in self.shards], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(self.lengths)])
+
+    def get_length(self, shard: Union[np.ndarray, str]) -> int:
+        """Returns a shard's number of records, reading only the header of a compressed shard"""
+
+        if isinstance(shard, str):
+            with zipfile.ZipFile(shard) as archive, archive.open('records.npy') as file:
+                version = np.lib.format.read_magic(file)
+                if version == (1, 0):
+                    shape, _, _ = np.lib.format.read_array_header_1_0(file)
+                else:
+                    shape, _, _ = np.lib.format.read_array_header_2_0(file)
+                return shape[0]
+        return len(shard)
+
+    def get_shard(self, index: int) -> np.ndarray:
+        """Returns a shard's records, loading a compressed shard once and keeping it"""
+
+        if isinstance(self.shards[index], str):
+            with np.load(self.shards[index]) as data:
+                self.shards[index] = data['records']
+        return self.shards[index]
+
+    def __len__(self) -> int:
+        """Returns the total number of records"""
+
+        return int(self.offsets[-1])
+
+    def __getitem__(self, indices: Union[int, np.ndarray]) -> np.ndarray:
+        """Returns the record at a global index, or the records at an array of them, in the order given"""
+
+        indices = np.asarray(indices)
+        if ((indices < 0) | (indices >= len(self))).any():
+            raise IndexError('record index out of range')
+
+        shard_indices = np.searchsorted(self.offsets, indices, side='right') - 1
+        if indices.ndim == 0:
+            return self.get_shard(int(shard_indices))[indices - self.offsets[shard_indices]]
+
+        records = np.empty(indices.shape, dtype=RECORD_DTYPE)
+        for shard_index in np.unique(shard_indices):
+            selected = shard_indices == shard_index
+            records[selected] = self.get_shard(shard_index)[indices[selected] - self.offsets[shard_index]]
+        return records
@@ -0,0 +1,65 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, List
+
+# Import standard modules
+import functools
+
+# Import non-standard modules
+import pygame as pg
+
+# Import local classes and methods
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    pass
+
+# Rect attribute that x, y sets for each justification
+JUSTIFY_ANCHORS = {'left': 'topleft', 'center': 'midtop', 'right': 'topright'}
+
+
+class DigitRenderer():
+    """Renders numbers with digit sprites. Each value is composed into a single surface once and kept in an LRU cache,
+    so drawing a number costs one blit however many digits it has, and a screen full of numbers (e.g. a leaderboard)
+    only composes the values it hasn't shown recently."""
+
+    def __init__(self, imgs: List[pg.Surface], cache_size: int = 256):
+        """Initialize the renderer with the sprites for digits 0-9"""
+
+        self.imgs = imgs
+        self.digit_width, self.digit_height = imgs[0].get_size()
+        self.color_key = imgs[0].get_colorkey()
+
+        # Cached per renderer, rather than on the class, so each set of digits gets its own cache_size values
+        self.render = functools.lru_cache(maxsize=cache_size)(self.compose)
+
+    def compose(self, value: int) -> pg.Surface:
+        """Composes the digits of value into a new surface, in the digit sprites' format. render returns the same
+        surfaces from the cache."""
+
+        digits = str(value)
+        image = pg.Surface((len(digits) * self.digit_width, self.digit_height), 0, self.imgs[0])
+        if self.color_key:
+            image.fill(self.color_key)
+            image.set_colorkey(self.color_key, pg.RLEACCEL)
+        image.blits([(self.imgs[int(digit)], (i * self.digit_width, 0)) for i, digit in enumerate(digits)], False)
+        return image
+
+    def get_rect(self, image: pg.Surface, x: int, y: int, justify: str = 'left') -> pg.Rect:
+        """Returns the rect of a rendered number placed at x, y. By default, x, y is the top-left of the number.
+        Justify may optionally be set to 'center' or 'right'."""
+
+        if justify not in JUSTIFY_ANCHORS:
+            print("Invalid justification input (left, center, or right).")
+            return None
+
+        return image.get_rect(**{JUSTIFY_ANCHORS[justify]: (x, y)})
+
+    def blit(self, surface: pg.Surface, value: int, x: int, y: int, justify: str = 'left') -> pg.Rect:
+        """Draws value onto surface, placed as in get_rect, and returns its rect"""
+
+        image = self.render(value)
+        rect = self.get_rect(image, x, y, justify)
+        if rect:
+            surface.blit(image, rect)
+        return rect
@@ -0,0 +1,152 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, Tuple
+
+# Import standard modules
+import os
+
+# Import non-standard modules
+import numpy as np
+import pygame as pg
+
+# Import local classes and methods
+from settings import Settings
+from bird import Bird
+from button import Button
+from stats import Stats
+from scroll_element import ScrollElem
+from simulation import Simulation
+from pipe import Pipe
+from pixels import PixelObserver
+from renderer import Renderer
+from static_layer import StaticLayer
+import game_functions as gf
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    pass
+
+
+class FlappyEnv():
+    """The full game wrapped as an environment with reset(seed) and step(action). Frames are stepped with a fixed dt
+    and nothing is drawn unless render() is called, so in headless mode (SDL dummy video and audio drivers) it runs
+    as fast as the simulation allows. In pixel mode each observation is instead the drawn frame, downsampled by a
+    PixelObserver."""
+
+    def __init__(self, frame_skip: int = 1, dt: float = None, headless: bool = True, physics: dict = None,
+                 pixels: bool = False, pixel_size: Tuple[int, int] = (80, 120), gray: bool = True, stack: int = 1):
+        """Initialize the environment. Each step repeats the action for frame_skip frames of dt milliseconds, which
+        defaults to the game's fixed physics step. Physics settings may be overridden as in WorldSettings. pixels
+        switches to pixel observations of pixel_size (width, height), grayscale or RGB, stacking the latest stack
+        frames."""
+
+        if headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+        self.frame_skip = frame_skip
+
+        # Rewards
+        self.pipe_reward = 1.0
+        self.frame_reward = 0.0
+        self.death_reward = -1.0
+
+        # Set up the game exactly as run_pygame does
+        pg.init()
+        self.screen = Renderer(pg.display.set_mode((480, 720)))
+        self.settings = Settings(self.screen, physics)
+        self.settings.finish_loading()
+        self.settings.replay_dir = None
+        self.settings.leaderboard_path = None
+        self.dt = dt if dt else 1000 / self.settings.physics_rate
+        self.stats = Stats(self.screen, self.settings)
+        self.world = Simulation(self.settings)
+        self.bird = Bird(self.screen, self.settings, self.world.bird)
+        self.pipes = pg.sprite.Group()
+        self.pipe_pool = [Pipe(pair, self.screen, self.settings) for pair in self.world.pool]
+        self.background = ScrollElem(self.settings.bg_imgs, 0, self.settings.bg_velocity, self.screen)
+        self.ground = ScrollElem([self.settings.ground_img], self.settings.ground_elev, self.settings.world_velocity,
+                                 self.screen)
+
+        self.buttons = pg.sprite.Group()
+        x = self.settings.screen_width // 2
+        y = self.stats.plaque_rect.bottom + 27 + self.settings.play_button_img.get_height() // 2
+        self.buttons.add(Button('new_game', self.screen, self.settings.play_button_img, (x, y), self.settings.sfx_pop))
+
+        self.frozen_layer = StaticLayer(self.screen)
+
+        # Pixel observations are read from the display surface the frame is drawn to
+        self.pixels = PixelObserver(self.screen.screen, pixel_size, gray, stack) if pixels else None
+
+        self.frames = 0
+        self.scenery_time = 0
+
+    def reset(self, seed: int = None) -> np.ndarray:
+        """Resets the game through READY into PLAY and returns the first observation. A seed makes the pipe course
+        reproducible."""
+
+        gf.reset_game(self.world, self.bird, self.pipes, self.buttons, self.stats, self.settings)
+
+        # Every episode starts like a fresh launch, including the pause before the pipes move
+        self.settings.start_delay = 0
+        self.frames = 0
+
+        gf.start_game(self.world, self.pipes, self.pipe_pool, self.screen, self.settings, seed)
+        if self.pixels:
+            self.pixels.reset()
+        return self.observe()
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool, dict]:
+        """Flaps the bird if action is truthy and advances frame_skip frames. Returns observation, reward, done and
+        info."""
+
+        reward = 0.0
+        for _ in range(self.frame_skip):
+            if action:
+                self.world.flap()
+
+            score = self.stats.score
+            gf.update_world(self.world, self.pipes, self.pipe_pool, self.dt, self.screen, self.settings)
+            self.bird.update(self.dt, self.settings)
+            self.frames += 1
+            self.scenery_time += self.dt
+
+            # Collisions and score only need to be checked in PLAY state
+            if self.settings.current_state != 'PLAY':
+                break
+            gf.check_collisions(self.world, self.bird, self.buttons, self.stats, self.settings)
+            gf.check_score(self.world, self.stats)
+
+            reward += self.frame_reward + self.pipe_reward * (self.stats.score - score)
+            if self.settings.current_state == 'GAMEOVER':
+                reward += self.death_reward
+                break
+
+        done = self.settings.current_state == 'GAMEOVER'
+        info = {'score': self.stats.score, 'state': self.settings.current_state, 'frames': self.frames}
+        return self.observe(), reward, done, info
+
+    def observe(self) -> np.ndarray:
+        """Returns the bird's y and velocity, and the distance to and gap y of the next pipe pair. In pixel mode, draws
+        the frame and returns the PixelObserver's output instead, which is reused from step to step."""
+
+        if self.pixels:
+            self.render()
+            return self.pixels.observe()
+
+        return np.array(self.world.observe(), dtype=np.float32)
+
+    def render(self):
+        """Draws the current frame to the window"""
+
+        pg.event.pump()
+        gf.update_scenery(self.background, self.ground, self.scenery_time, self.settings)
+        self.scenery_time = 0
+        gf.draw(self.dt, self.bird, self.pipes, self.background, self.ground, self.buttons, self.frozen_layer,
+                self.screen, self.stats, self.settings)
+        self.screen.flip()
+
+    def close(self):
+        """Shuts down PyGame"""
+
+        pg.quit()
@@ -8,13 +8,14 @@
 #
 # Future updates or improvements:
 #   - UI for SFX/music volume control
-#   - Leaderboard
+#   - Leaderboard screen (runs are already recorded, see leaderboard.py)
 #   - Window scaling
 
 # Allow for type hinting while preventing circular imports
 from __future__ import annotations
 
 # Import standard modules
+import argparse
 
 # Import non-standard modules
 import pygame as pg
@@ -26,10 +27,22 @@ from button import Button
 from stats import Stats
 from splash import Splash
 from scroll_element import ScrollElem
+from pipe import Pipe
+from simulation import Simulation
+from renderer import Renderer
+from static_layer import StaticLayer
+from profiler import Profiler
+from autopilot import Autopilot
+from dataset import FrameRecorder
 import game_functions as gf
 
 
-def run_pygame():
+def run_pygame(profile_path: str = None, show_hud: bool = False, player_name: str = None, autopilot: bool = False,
+               record_path: str = None):
+    """Runs the game. The main loop's phases are timed, with every frame's timings written to profile_path (CSV for a
+    .csv path, JSON lines otherwise) if given. show_hud starts the game with the timing HUD shown, F3 toggles it. Runs
+    are recorded to the leaderboard under player_name, if given. autopilot starts the game in attract mode, A toggles
+    it. Every simulation step is recorded to a dataset in the record_path directory, if given."""
 
     # Initialise PyGame
     pg.init()
@@ -38,31 +51,41 @@ def run_pygame():
     fps = 120.0
     fpsClock = pg.time.Clock()
 
-    # Set up the window.
+    # Set up the window. Drawing goes through a renderer that only pushes the parts of each frame that changed.
     screen_width, screen_height = 480, 720
-    screen = pg.display.set_mode((screen_width, screen_height))
+    screen = Renderer(pg.display.set_mode((screen_width, screen_height)))
     pg.display.set_caption('Flappy Bird')
 
-    # Create stats and settings
+    # Load the splash sequence's assets. The rest load on a worker thread while the splash plays.
     settings = Settings(screen)
+    if player_name:
+        settings.player_name = player_name
     pg.display.set_icon(settings.icon)
-    stats = Stats(screen, settings)
     splash = Splash(screen, settings.splash_img, settings.splash_loc)
 
-    # Create bird
-    bird = Bird(screen, settings)
-
-    # Create pipes
-    pipes = pg.sprite.Group()
+    # Create the simulated world and the bird that draws it
+    world = Simulation(settings)
+    bird = Bird(screen, settings, world.bird)
 
     # Create background and ground elements
     background = ScrollElem(settings.bg_imgs, 0, settings.bg_velocity, screen)
     ground = ScrollElem([settings.ground_img], settings.ground_elev, settings.world_velocity, screen)
 
+    # Play the splash sequence, returning once it's done and all the assets are ready
+    gf.play_splash(bird, background, ground, screen, settings, splash, fpsClock, fps)
+
+    # Create stats
+    stats = Stats(screen, settings)
+
+    # Create pipes. Pipe sprites are pooled one per simulated pipe pair and added to the group when spawned.
+    pipes = pg.sprite.Group()
+    pipe_pool = [Pipe(pair, screen, settings) for pair in world.pool]
+
     # Create game buttons
     buttons = pg.sprite.Group()
 
-    # ~~~ Uncomment for leaderboard button. Leaderboard functionality not implemented currently.
+    # ~~~ Uncomment for leaderboard button. Runs are recorded to the leaderboard by stats, but there is no screen to
+    # show it on yet, so the button does nothing.
     # x = stats.plaque_rect.right - settings.leader_button_img.get_width() // 2
     # y = stats.plaque_rect.bottom + 27 + settings.leader_button_img.get_height() // 2
     # button = Button('leaderboard', screen, settings.leader_button_img, (x, y), settings.sfx_pop)
@@ -74,26 +97,92 @@ def run_pygame():
     button = Button('new_game', screen, settings.play_button_img, (x, y), settings.sfx_pop)
     buttons.add(button)
 
-    # Main game loop
-    dt = 1 / fps
-    while True:
-        gf.check_events(bird, pipes, background, buttons, screen, stats, settings)
-        gf.update_world(pipes, background, ground, dt, screen, settings)
-        bird.update(dt, settings)
+    # Create the layer the frozen world is cached in once the game is over
+    frozen_layer = StaticLayer(screen)
 
-        if settings.current_state == 'SPLASH':
-            splash.update(dt)
-            if not splash.animating:
-                settings.current_state = 'READY'
+    # Create the autopilot that plays in attract mode
+    settings.autopilot = autopilot
+    pilot = Autopilot(settings)
 
-        # Collisions and score only need to be checked in PLAY state
-        elif settings.current_state == 'PLAY':
-            gf.check_collisions(bird, pipes, stats, settings)
-            gf.check_score(bird, pipes, stats)
+    # Time each phase of the main loop
+    settings.show_hud = show_hud
+    profiler = Profiler(path=profile_path)
 
-        gf.draw(dt, bird, pipes, background, ground, buttons, screen, stats, settings, splash)
-        dt = fpsClock.tick(fps)
+    # Stream gameplay records for training, written out on a worker thread
+    recorder = FrameRecorder(record_path) if record_path else None
+
+    # Main game loop. The world is stepped at a fixed rate, independent of the frame rate, and drawn interpolated
+    # between its last two steps.
+    step_dt = 1000 / settings.physics_rate
+    accumulator = 0
+    dt = 1 / fps
+    try:
+        while True:
+            gf.check_events(world, bird, pipes, pipe_pool, background, buttons, screen, stats, settings)
+            profiler.lap('events')
+
+            # Long frames are capped so a hitch doesn't leave the simulation trying to catch up indefinitely
+            accumulator += min(dt, settings.max_frame_time)
+            steps = 0
+            while accumulator >= step_dt:
+                gf.update_autopilot(pilot, world, bird, pipes, pipe_pool, buttons, screen, stats, settings)
+                profiler.lap('autopilot')
+                gf.update_world(world, pipes, pipe_pool, step_dt, screen, settings)
+                profiler.lap('world')
+                bird.update(step_dt, settings)
+                profiler.lap('bird')
+
+                # Collisions and score only need to be checked in PLAY state
+                if settings.current_state == 'PLAY':
+                    gf.check_collisions(world, bird, buttons, stats, settings)
+                    gf.check_score(world, stats)
+                profiler.lap('collisions')
+                if recorder:
+                    recorder.record(world, settings)
+                profiler.lap('record')
+
+                accumulator -= step_dt
+                steps += 1
+
+            gf.update_scenery(background, ground, dt, settings)
+            gf.interpolate(bird, pipes, accumulator / step_dt)
+            profiler.lap('scenery')
+            gf.draw(dt, bird, pipes, background, ground, buttons, frozen_layer, screen, stats, settings)
+            profiler.lap('draw')
+            if settings.show_hud:
+                profiler.draw_hud(dt, screen)
+            profiler.lap('hud')
+            screen.flip()
+            profiler.lap('flip')
+            dt = fpsClock.tick(fps)
+            profiler.lap('wait')
+            profiler.end_frame(settings.current_state, steps)
+
+    # Quitting exits from inside the loop, the frame records are closed and queued runs, records and replays written on
+    # the way out
+    finally:
+        profiler.close()
+        if recorder:
+            recorder.close()
+        if stats.leaderboard:
+            stats.leaderboard.close()
+        if stats.replay_writer:
+            stats.replay_writer.close()
+
+
+def main():
+    """Parses the command line and runs the game"""
+
+    parser = argparse.ArgumentParser(description='Flappy Bird')
+    parser.add_argument('--profile', metavar='PATH', help='write per frame phase timings to a .csv or .jsonl file')
+    parser.add_argument('--hud', action='store_true', help='start with the frame timing HUD shown (toggle with F3)')
+    parser.add_argument('--player', metavar='NAME', help='name to record runs under on the leaderboard')
+    parser.add_argument('--autopilot', action='store_true', help='start in attract mode (toggle with A)')
+    parser.add_argument('--record', metavar='DIR', help='record every simulation step to a sharded dataset in DIR')
+    args = parser.parse_args()
+
+    run_pygame(args.profile, args.hud, args.player, args.autopilot, args.record)
 
 
 if __name__ == '__main__':
-    run_pygame()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -4,27 +4,31 @@ from typing import TYPE_CHECKING, List
 
 # Import standard modules
 import sys
-import random
+import time
 
 # Import non-standard modules
 import pygame as pg
 
 # Import local classes and methods
 from pipe import Pipe
-import helper_functions as hf
+from replay import record_replay
 
 # Import local class and methods that are only used for type hinting
 if TYPE_CHECKING:
+    from autopilot import Autopilot
     from bird import Bird
     from settings import Settings
     from button import Button
     from stats import Stats
     from splash import Splash
     from scroll_element import ScrollElem
+    from simulation import Simulation, PipePair
+    from renderer import Renderer
+    from static_layer import StaticLayer
 
 
-def check_events(bird: Bird, pipes: pg.sprite.Group, background: ScrollElem, buttons: Button, screen: pg.Surface,
-                 stats: Stats, settings: Settings):
+def check_events(world: Simulation, bird: Bird, pipes: pg.sprite.Group, pipe_pool: List[Pipe],
+                 background: ScrollElem, buttons: Button, screen: Renderer, stats: Stats, settings: Settings):
     """Check for key events"""
 
     # Go through events that are passed to the script by the window.
@@ -35,19 +39,96 @@ def check_events(bird: Bird, pipes: pg.sprite.Group, background: ScrollElem, but
             pg.quit()
             sys.exit()
 
+        # Redraw the whole window if its contents were lost
+        elif event.type == pg.WINDOWEXPOSED:
+            screen.invalidate()
+
         # Check if user clicks
         elif event.type == pg.KEYDOWN:
-            check_keydown_events(bird, pipes, event, screen, settings)
+            check_keydown_events(world, bird, pipes, pipe_pool, event, screen, settings)
 
         elif event.type == pg.KEYUP:
             check_keyup_events(event)
 
         elif event.type == pg.MOUSEBUTTONDOWN:
-            check_click_events(buttons, bird, pipes, background, screen, stats, settings)
+            check_click_events(world, buttons, bird, pipes, pipe_pool, background, screen, stats, settings)
+
+
+def check_splash_events(bird: Bird, background: ScrollElem, screen: Renderer, settings: Settings):
+    """Check for key events while the splash sequence plays. Only quitting and changing the bird color or scene are
+    available until the game's assets have loaded."""
+
+    for event in pg.event.get():
+
+        if event.type == pg.QUIT:
+            pg.quit()
+            sys.exit()
+
+        elif event.type == pg.WINDOWEXPOSED:
+            screen.invalidate()
+
+        elif event.type == pg.KEYDOWN and event.key == pg.K_q:
+            sys.exit()
+
+        elif event.type == pg.MOUSEBUTTONDOWN:
+            left, middle, right = pg.mouse.get_pressed()
+            if right:
+                bird.change_color()
+            elif middle:
+                change_world_scene(background, settings)
+
+
+def play_splash(bird: Bird, background: ScrollElem, ground: ScrollElem, screen: Renderer, settings: Settings,
+                splash: Splash, clock: pg.time.Clock, fps: float):
+    """Plays the splash sequence while the rest of the game's assets load on the loader thread. The bird idles at the
+    fixed simulation rate as in the main loop. Returns in READY state, once the splash is done and the assets are
+    ready."""
+
+    step_dt = 1000 / settings.physics_rate
+    accumulator = 0
+    dt = 1 / fps
+    while settings.current_state == 'SPLASH':
+        check_splash_events(bird, background, screen, settings)
+
+        accumulator += min(dt, settings.max_frame_time)
+        while accumulator >= step_dt:
+            bird.update(step_dt, settings)
+            accumulator -= step_dt
+
+        # Assets are set up as soon as they have loaded, the splash waits on them if it finishes first
+        if settings.loading and not settings.loader.is_alive():
+            settings.finish_loading()
+
+        update_scenery(background, ground, dt, settings)
+        splash.update(dt)
+        settings.tweens.update(dt)
+        if not splash.animating and not settings.loading:
+            settings.current_state = 'READY'
+
+        bird.interpolate(accumulator / step_dt)
+        draw_splash(bird, background, ground, screen, settings, splash)
+        screen.flip()
+        dt = clock.tick(fps)
+
+
+def draw_splash(bird: Bird, background: ScrollElem, ground: ScrollElem, screen: Renderer, settings: Settings,
+                splash: Splash):
+    """Draw a frame of the splash sequence"""
+
+    screen.fill(settings.bg_color)
+    background.blitme()
+    ground.blitme()
+    bird.blitme()
+
+    # Fade in and show splash screen. The dimmer is skipped once it has faded out completely.
+    if settings.dimmer.get_alpha():
+        screen.blit(settings.dimmer, settings.dimmer_rect)
+    splash.blitme()
 
 
-def check_click_events(buttons: pg.sprite.Group, bird: Bird, pipes: pg.sprite.Group, background: ScrollElem,
-                       screen: pg.Surface, stats: Stats, settings: Settings):
+def check_click_events(world: Simulation, buttons: pg.sprite.Group, bird: Bird, pipes: pg.sprite.Group,
+                       pipe_pool: List[Pipe], background: ScrollElem, screen: pg.Surface, stats: Stats,
+                       settings: Settings):
     """Respond to mouse clicks"""
 
     left, middle, right = pg.mouse.get_pressed()
@@ -57,7 +138,7 @@ def check_click_events(buttons: pg.sprite.Group, bird: Bird, pipes: pg.sprite.Gr
 
         # Start the game if in READY mode
         if left and settings.current_state == 'READY':
-            start_game(pipes, screen, settings)
+            start_game(world, pipes, pipe_pool, screen, settings)
 
         # Change bird color
         elif right:
@@ -68,7 +149,7 @@ def check_click_events(buttons: pg.sprite.Group, bird: Bird, pipes: pg.sprite.Gr
             change_world_scene(background, settings)
 
     if settings.current_state == 'PLAY' and left:
-        bird.flap()
+        flap(world, bird)
 
     else:
         # Check for clicked buttons
@@ -78,26 +159,41 @@ def check_click_events(buttons: pg.sprite.Group, bird: Bird, pipes: pg.sprite.Gr
 
                 # New Game button clicked
                 if settings.current_state == 'GAMEOVER' and button.action == 'new_game' and button.active:
-                    reset_game(bird, pipes, buttons, stats, settings)
+                    reset_game(world, bird, pipes, buttons, stats, settings)
 
 
-def check_keydown_events(bird: Bird, pipes: pg.sprite.Group, event: pg.event.Event, screen: pg.Surface,
-                         settings: Settings):
+def check_keydown_events(world: Simulation, bird: Bird, pipes: pg.sprite.Group, pipe_pool: List[Pipe],
+                         event: pg.event.Event, screen: pg.Surface, settings: Settings):
     """Respond to key presses"""
 
     # Quit the game
     if event.key == pg.K_q:
         sys.exit()
 
+    # Show or hide the frame timing HUD
+    elif event.key == pg.K_F3:
+        settings.show_hud = not settings.show_hud
+
+    # Turn attract mode on or off
+    elif event.key == pg.K_a:
+        settings.autopilot = not settings.autopilot
+
     # Flap / start the game
     elif event.key == pg.K_SPACE:
 
         # Start the game if in READY mode
         if settings.current_state == 'READY':
-            start_game(pipes, screen, settings)
+            start_game(world, pipes, pipe_pool, screen, settings)
 
         if settings.current_state == 'PLAY':
-            bird.flap()
+            flap(world, bird)
+
+
+def flap(world: Simulation, bird: Bird):
+    """Flaps the bird, recording the flap in the simulation, and plays the sound effect"""
+
+    world.flap()
+    bird.sfx_flap.play()
 
 
 def check_keyup_events(event: pg.event.Event):
@@ -105,61 +201,103 @@ def check_keyup_events(event: pg.event.Event):
     return
 
 
-def update_world(pipes: Pipe, background: ScrollElem, ground: ScrollElem, dt: int, screen: pg.Surface,
+def update_autopilot(autopilot: Autopilot, world: Simulation, bird: Bird, pipes: pg.sprite.Group,
+                     pipe_pool: List[Pipe], buttons: pg.sprite.Group, screen: pg.Surface, stats: Stats,
+                     settings: Settings):
+    """Plays the game in attract mode: starts it once the Get Ready image is up, flaps when the autopilot says to and
+    starts a new game as soon as the new game button can be pressed. Called once per fixed simulation step, before
+    the world is stepped, as the player's input would be."""
+
+    if not settings.autopilot:
+        return
+
+    if settings.current_state == 'READY' and settings.idle_time >= settings.get_ready_delay:
+        start_game(world, pipes, pipe_pool, screen, settings)
+
+    # Any run the autopilot has a hand in is marked as assisted, even if it is turned off again before the game ends
+    if settings.current_state == 'PLAY':
+        world.assisted = True
+        if autopilot.get_action(world):
+            flap(world, bird)
+
+    elif settings.current_state == 'GAMEOVER':
+        button: Button
+        for button in buttons:
+            if button.action == 'new_game' and button.active:
+                reset_game(world, bird, pipes, buttons, stats, settings)
+
+
+def update_world(world: Simulation, pipes: pg.sprite.Group, pipe_pool: List[Pipe], dt: int, screen: pg.Surface,
                  settings: Settings):
-    """Moves the pipes and background across the screen and adds new pipes as necessary"""
+    """Moves the pipes across the screen and adds new pipes as necessary. Called once per fixed simulation step."""
 
     if settings.current_state != 'GAMEOVER':
 
-        # Update background and ground images
+        # Step the simulated pipe course and add the sprite for a newly spawned pipe pair
+        pair = world.update_world(dt)
+        if pair:
+            create_new_pipes(pair, pipes, pipe_pool, screen, settings)
+        pipes.update(dt)
+
+
+def update_scenery(background: ScrollElem, ground: ScrollElem, dt: int, settings: Settings):
+    """Scrolls the background and ground. These are purely visual, so they move with the frame time rather than the
+    simulation steps."""
+
+    if settings.current_state != 'GAMEOVER':
         background.update(dt)
         ground.update(dt)
 
-        # Update the pipe locations and spawn new pipes as necessary
-        if settings.current_state == 'PLAY':
 
-            if settings.start_delay < settings.max_start_delay:
-                settings.start_delay += dt
+def interpolate(bird: Bird, pipes: pg.sprite.Group, alpha: float):
+    """Places the bird and pipes a fraction alpha of the way from the previous simulation step to the current one"""
 
-            else:
-                pipes.update(dt)
+    bird.interpolate(alpha)
 
-                # Add new pipes if traveled more than pipe spacing limit
-                settings.travel_distance += settings.world_velocity * dt
-                if settings.travel_distance > settings.pipe_spacing:
-                    create_new_pipes(pipes, screen, settings)
-                    settings.travel_distance = 0
+    pipe: Pipe
+    for pipe in pipes:
+        pipe.interpolate(alpha)
 
 
 def draw(dt: int, bird: Bird, pipes: pg.sprite.Group, background: ScrollElem, ground: ScrollElem, buttons: Button,
-         screen: pg.Surface, stats: Stats, settings: Settings, splash: Splash):
-    """Draw to the window"""
+         frozen_layer: StaticLayer, screen: Renderer, stats: Stats, settings: Settings):
+    """Draw the frame. It is pushed to the window by screen.flip(), which only updates the regions that changed since
+    the last frame."""
 
-    screen.fill(settings.bg_color)
-    background.blitme()
-    pipes.draw(screen)
-    ground.blitme()
-    bird.blitme()
+    # Advance the fades
+    settings.tweens.update(dt)
 
-    # Draw the splash screen
-    if settings.current_state == 'SPLASH':
+    # Only the bird can move once the game is over, so the dimmed world is drawn from a snapshot that is retaken only
+    # when the bird or the dimmer's alpha changes
+    frozen_key = (bird.image, tuple(bird.rect), settings.dimmer.get_alpha())
+    if settings.current_state == 'GAMEOVER' and frozen_layer.is_valid(frozen_key):
+        frozen_layer.blitme()
 
-        # Fade in and show splash screen
-        screen.blit(settings.dimmer, settings.dimmer_rect)
-        hf.fade_surface(settings.dimmer, 0, -3)
-        splash.blitme()
+    else:
+        screen.fill(settings.bg_color)
+        background.blitme()
+        pipes.draw(screen)
+        ground.blitme()
+        bird.blitme()
+
+        if settings.current_state == 'GAMEOVER':
+            screen.blit(settings.dimmer, settings.dimmer_rect)
+            frozen_layer.capture(frozen_key)
+        else:
+            frozen_layer.invalidate()
 
     # Display the Get Ready image:
-    elif settings.current_state == 'READY':
+    if settings.current_state == 'READY':
 
         if settings.idle_time < settings.get_ready_delay:
             settings.idle_time += dt
+            if settings.idle_time >= settings.get_ready_delay:
+                settings.tweens.fade(settings.get_ready_img, 255, settings.get_ready_fade_time)
+                settings.tweens.fade(settings.idle_msg_img, 255, settings.get_ready_fade_time)
 
         else:
             screen.blit(settings.get_ready_img, settings.get_ready_rect)
             screen.blit(settings.idle_msg_img, settings.idle_msg_rect)
-            hf.fade_surface(settings.get_ready_img, 255, 20)
-            hf.fade_surface(settings.idle_msg_img, 255, 20)
 
     # Draw the score to the screen
     elif settings.current_state == 'PLAY':
@@ -168,35 +306,23 @@ def draw(dt: int, bird: Bird, pipes: pg.sprite.Group, background: ScrollElem, gr
     # Display the buttons if the game is inactive
     elif settings.current_state == 'GAMEOVER':
 
-        # Dim background content and show score plaque
-        screen.blit(settings.dimmer, settings.dimmer_rect)
-        stats.blit_score_plaque(dt, screen)
-        fade_out_done = hf.fade_surface(settings.dimmer, settings.dimmer_max_opacity, 3)
-
-        # Display buttons after stats and dimmer are done animating
-        if fade_out_done and not stats.animating:
+        # Show score plaque over the dimmed background
+        stats.blit_score_plaque(screen)
 
-            # Fade in 'Game Over' image
+        # Display buttons after stats and dimmer are done animating. They are faded in from check_collisions.
+        if not settings.tweens.is_active(settings.dimmer) and not stats.animating:
             screen.blit(settings.game_over_img, settings.game_over_rect)
-            hf.fade_surface(settings.game_over_img, 255, 5)
-
-            # Fade in buttons and activate button once done fading in
             button: Button
             mouse_pos = pg.mouse.get_pos()
             for button in buttons:
                 button.draw(mouse_pos)
-                button_done = hf.fade_surface(button.image, 255, 5)
-                if button_done:
-                    button.active = True
-
-    pg.display.flip()
 
 
 def change_world_scene(background: ScrollElem, settings: Settings):
     """Updates the background and pipe colors"""
 
     # Update the pipe images
-    settings.pipe_color = (settings.pipe_color + 1) % len(settings.pipe_imgs[0])
+    settings.pipe_color = (settings.pipe_color + 1) % settings.num_pipe_colors
 
     # Update the background images
     background.change_scene()
@@ -206,14 +332,12 @@ def change_world_scene(background: ScrollElem, settings: Settings):
     settings.sfx_swoosh.play()
 
 
-def check_collisions(bird: Bird, pipes: Pipe, stats: Stats, settings: Settings):
+def check_collisions(world: Simulation, bird: Bird, buttons: pg.sprite.Group, stats: Stats, settings: Settings):
     """Checks for collisions with the bird and the world. Updates the game state 
     upon collision with world object."""
 
-    # Check for collisions with pipes/world
-    collision: Pipe = pg.sprite.spritecollideany(bird, pipes, pg.sprite.collide_mask)
-    if collision or bird.rect.bottom > settings.ground_elev \
-        or bird.rect.top < bird.screen_rect.top:
+    # Check for collisions with pipes/world. The simulation tests the same shapes and rects the sprites are drawn with.
+    if world.check_collisions():
 
         settings.sfx_music.stop()
         settings.sfx_music_end.play()
@@ -223,48 +347,70 @@ def check_collisions(bird: Bird, pipes: Pipe, stats: Stats, settings: Settings):
         if not bird.rect.bottom > settings.ground_elev:
             bird.sfx_fall.play()
 
-        bird.x = bird.rect.centerx
-        bird.y = bird.rect.centery
-        bird.velocity = 0
-        stats.prep_score_plaque()
-        settings.current_state = 'GAMEOVER'
-
-
-def check_score(bird: Bird, pipes: pg.sprite.Group, stats: Stats):
+        # The bird is snapped to where it was drawn, from the previous step as well, so it doesn't interpolate across
+        # the snap on the collision frame
+        bird.body.x = bird.body.prev_x = bird.rect.centerx
+        bird.body.y = bird.body.prev_y = bird.rect.centery
+        world.game_over()
+        stats.prep_score_plaque(record=not world.assisted)
+
+        # Dim the world as the score plaque comes in, then fade in the game over image and buttons. The buttons are
+        # activated once they are fully visible.
+        settings.tweens.fade(settings.dimmer, settings.dimmer_max_opacity, settings.dimmer_fade_time)
+        delay = max(settings.dimmer_fade_time, stats.fade_in_time)
+        settings.tweens.fade(settings.game_over_img, 255, settings.game_over_fade_time, delay=delay)
+        button: Button
+        for button in buttons:
+            settings.tweens.fade(button.image, 255, settings.game_over_fade_time, delay=delay,
+                                 on_done=button.activate)
+
+        # Save the player's run so that it can be played back or validated later. Runs the autopilot flew any part of
+        # aren't the player's, so they're not saved, as they're not recorded on the leaderboard. The file is written by
+        # the replay writer's thread. If an earlier replay couldn't be written, the game carries on without saving them.
+        if stats.replay_writer and not world.assisted:
+            file_name = f"{time.strftime('%Y%m%d-%H%M%S')}_{world.seed}.json"
+            try:
+                stats.replay_writer.save(record_replay(world, bird.color, stats.score), file_name)
+            except OSError as error:
+                print(f'Replays disabled, runs will not be saved: {error!r}')
+                stats.replay_writer = None
+
+
+def check_score(world: Simulation, stats: Stats):
     """Checks if the bird has cleared a pair of pipes"""
 
-    pipe: Pipe
-    for pipe in pipes:
-        if bird.rect.left > pipe.rect.right and pipe not in stats.pipes_cleared \
-            and pipe.location == 0:
+    for _ in range(world.check_score()):
+        stats.increase_score()
 
-            stats.pipes_cleared.add(pipe)
-            stats.increase_score()
 
+def create_new_pipes(pair: PipePair, pipes: pg.sprite.Group, pipe_pool: List[Pipe], screen: pg.Surface,
+                     settings: Settings):
+    """Adds the pooled sprite for a newly spawned pipe pair to pipe sprite group. The sprite pool mirrors the
+    simulation's pipe pool and only grows along with it."""
 
-def create_new_pipes(pipes: pg.sprite.Group, screen: pg.Surface, settings: Settings):
-    """Creates a new randomized pair of pipes and adds them to pipe sprite group"""
+    if pair.index == len(pipe_pool):
+        pipe_pool.append(Pipe(pair, screen, settings))
 
-    gap_y = random.randint(settings.gap_y_min, settings.gap_y_max)
-    bot_pipe = Pipe(gap_y, 0, screen, settings)
-    top_pipe = Pipe(gap_y, 1, screen, settings)
-    pipes.add(bot_pipe)
-    pipes.add(top_pipe)
+    pipe = pipe_pool[pair.index]
+    pipe.init_dynamic_variables()
+    pipes.add(pipe)
 
 
-def start_game(pipes: pg.sprite.Group, screen: pg.Surface, settings: Settings):
-    """Starts the game and creates the initial set of pipes"""
+def start_game(world: Simulation, pipes: pg.sprite.Group, pipe_pool: List[Pipe], screen: pg.Surface,
+               settings: Settings, seed: int = None):
+    """Starts the game and creates the initial set of pipes. The pipe course is seeded with seed if one is given."""
 
-    settings.current_state = 'PLAY'
-    create_new_pipes(pipes, screen, settings)
+    create_new_pipes(world.start(seed), pipes, pipe_pool, screen, settings)
 
 
-def reset_game(bird: Bird, pipes: pg.sprite.Group, buttons: pg.sprite.Group, stats: Stats, settings: Settings):
+def reset_game(world: Simulation, bird: Bird, pipes: pg.sprite.Group, buttons: pg.sprite.Group, stats: Stats,
+               settings: Settings):
     """Reset all the game parameters to their initial values"""
 
     settings.sfx_swoosh.play()
     settings.init_dynamic_variables()
     stats.init_dynamic_variables()
+    world.reset()
     bird.init_dynamic_variables()
     pipes.empty()
 
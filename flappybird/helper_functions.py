@@ -1,8 +1,9 @@
 # Allow for type hinting while preventing circular imports
 from __future__ import annotations
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Dict, List, Tuple
 
 # Import standard modules
+import math
 import os
 
 # Import non-standard modules
@@ -21,15 +22,10 @@ def clamp(value, min_val, max_val):
     return max(min_val, min(max_val, value))
 
 
-def fade_surface(surface: pg.Surface, end_alpha: int, alpha_inc: int):
-    """Updates a surface's alpha value by alpha_inc. Returns True if fade is complete."""
+def lerp(start: float, end: float, t: float) -> float:
+    """Linearly interpolates between start and end by a fraction t"""
 
-    alpha = surface.get_alpha()
-    if (alpha_inc > 0 and alpha < end_alpha) or (alpha_inc < 0 and alpha > end_alpha):
-        alpha += alpha_inc
-        surface.set_alpha(alpha)
-        return False
-    return True
+    return start + (end - start) * t
 
 
 def load_frames(sheet: pg.Surface, n_frames: int, color_key: pg.Color) -> List[pg.Surface]:
@@ -46,6 +42,73 @@ def load_frames(sheet: pg.Surface, n_frames: int, color_key: pg.Color) -> List[p
     return images
 
 
+def stack_pipes(top_img: pg.Surface, bot_img: pg.Surface, gap_height: int) -> pg.Surface:
+    """Stacks a top and bottom pipe image, separated by a transparent gap of gap_height, into a single image"""
+
+    width, height = top_img.get_size()
+    size = (width, 2 * height + gap_height)
+
+    image = pg.Surface(size, pg.SRCALPHA)
+    image.blit(top_img, (0, 0))
+    image.blit(bot_img, (0, height + gap_height))
+    return image
+
+
+def tile_strip(image: pg.Surface, min_width: int) -> pg.Surface:
+    """Tiles an image side by side into a strip at least min_width wide. The strip is a whole number of tiles long, so
+    it wraps around seamlessly. It drops its alpha channel if the image is fully opaque, which is faster to blit."""
+
+    width, height = image.get_size()
+    n_tiles = math.ceil(min_width / width)
+    strip = pg.Surface((n_tiles * width, height), pg.SRCALPHA)
+
+    # Tiles don't overlap, so they're copied onto the transparent strip as is rather than blended
+    for i in range(n_tiles):
+        strip.blit(image, (i * width, 0), special_flags=pg.BLEND_RGBA_MAX)
+    strip.set_colorkey(image.get_colorkey())
+
+    opaque = pg.mask.from_surface(image, 254).count() == width * height
+    return strip.convert() if opaque else strip.convert_alpha()
+
+
+def load_rotations(frames: List[List[pg.Surface]], min_angle: int, max_angle: int,
+                   angle_step: int) -> Dict[Tuple[int, int, int], pg.Surface]:
+    """Pre-rotates every frame of every sprite sheet in frames (indexed [color][frame]) from min_angle to max_angle in
+    increments of angle_step. Returns a dictionary of images keyed by (color, frame, angle)."""
+
+    rotations = {}
+    for color, sheet in enumerate(frames):
+        for frame, image in enumerate(sheet):
+            for angle in range(min_angle, max_angle + 1, angle_step):
+                rotations[(color, frame, angle)] = pg.transform.rotate(image, angle)
+    return rotations
+
+
+def merge_rects(rects: List[pg.Rect]) -> List[pg.Rect]:
+    """Merges overlapping rects into their union wherever the union is no larger than the two rects it replaces.
+    Returns the merged list, which covers at least the same area."""
+
+    merged: List[pg.Rect] = []
+    for rect in rects:
+        i = 0
+        while i < len(merged):
+            union = rect.union(merged[i])
+            if union.width * union.height <= rect.width * rect.height + merged[i].width * merged[i].height:
+                rect = union
+                merged.pop(i)
+                i = 0
+            else:
+                i += 1
+        merged.append(rect)
+    return merged
+
+
+def quantize(value: float, step: int, min_val: int, max_val: int) -> int:
+    """Rounds a value to the nearest multiple of step, clamped to the range [min_val, max_val]"""
+
+    return int(clamp(round(value / step) * step, min_val, max_val))
+
+
 def load_image(file_name: str, scale: float, path: str, color_key: pg.Color = None):
     """Loads an image (file_name) saved at path, scales by a given scale factor, and returns the resulting image.
     An RGB color key may be included."""
@@ -0,0 +1,175 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+# Import standard modules
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# Import non-standard modules
+
+# Import local classes and methods
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    pass
+
+# Every finished run, plus each player's best run, which is kept up to date as runs are written so that per player
+# queries never have to scan the run history. Scores are indexed in descending order, ties going to the earlier run.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_score ON runs (score DESC);
+
+CREATE TABLE IF NOT EXISTS bests (
+    player TEXT PRIMARY KEY,
+    score INTEGER NOT NULL,
+    time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bests_score ON bests (score DESC, time);
+"""
+
+INSERT_RUN = 'INSERT INTO runs (player, score, time) VALUES (?, ?, ?)'
+UPDATE_BEST = """
+INSERT INTO bests (player, score, time) VALUES (?, ?, ?)
+ON CONFLICT (player) DO UPDATE SET score = excluded.score, time = excluded.time WHERE excluded.score > bests.score
+"""
+
+
+class Leaderboard():
+    """A persistent store of finished runs in a local sqlite database. Runs are recorded from the game thread but
+    written by a worker thread, in batches, so a game over never waits on the disk. Queries run on the game thread and
+    read from indexes, so they stay fast however long the run history grows."""
+
+    def __init__(self, path: str, batch_size: int = 1000, max_queued: int = 10000):
+        """Open, or create, the database at path and start the writer thread. At most max_queued runs wait to be
+        written, after which recording waits for the writer to catch up."""
+
+        self.path = path
+        self.batch_size = batch_size  # most runs written in one transaction
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # The schema is set up before the writer starts, so queries can be made straight away
+        self.conn = self.connect()
+        self.conn.executescript(SCHEMA)
+
+        # Runs waiting to be written. None tells the writer to stop.
+        self.queue: queue.Queue = queue.Queue(max_queued)
+        self.writer_error = None
+        self.writer = threading.Thread(target=self.write_runs, name='leaderboard_writer', daemon=True)
+        self.writer.start()
+
+    def connect(self) -> sqlite3.Connection:
+        """Opens a connection to the database. Each thread uses its own."""
+
+        conn = sqlite3.connect(self.path, timeout=30)
+
+        # With write-ahead logging, queries read the last committed state instead of waiting on the writer
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+        return conn
+
+    def record(self, player: str, score: int):
+        """Queues a finished run to be written. Returns immediately unless the queue is full. Raises the writer's error
+        if it has stopped, so runs aren't queued only to be lost."""
+
+        if self.writer_error:
+            raise self.writer_error
+        self.queue.put((player, score, time.time()))
+
+    def write_runs(self):
+        """Writer thread. Waits for runs and writes whatever has queued up since the last write in one transaction,
+        until told to stop."""
+
+        conn = None
+        running = True
+        taken = 0  # runs taken off the queue and not yet marked done
+        try:
+            conn = self.connect()
+            while running:
+                runs = [self.queue.get()]
+                while len(runs) < self.batch_size and not self.queue.empty():
+                    runs.append(self.queue.get())
+                taken = len(runs)
+
+                if None in runs:
+                    running = False
+                    runs = [run for run in runs if run is not None]
+                with conn:
+                    conn.executemany(INSERT_RUN, runs)
+                    conn.executemany(UPDATE_BEST, runs)
+
+                for _ in range(taken):
+                    self.queue.task_done()
+                taken = 0
+
+        # Raised on the game thread by record, flush or close, rather than lost with the thread. Runs still queued are
+        # marked done so that flush doesn't wait on them forever.
+        except Exception as error:
+            self.writer_error = error
+            for _ in range(taken):
+                self.queue.task_done()
+            drain(self.queue)
+        finally:
+            if conn:
+                conn.close()
+
+    def flush(self):
+        """Waits until every recorded run has been written"""
+
+        if self.writer.is_alive():
+            self.queue.join()
+        if self.writer_error:
+            raise self.writer_error
+
+    def close(self):
+        """Writes any runs still queued, then stops the writer and closes the database"""
+
+        if self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join()
+        self.conn.close()
+        if self.writer_error:
+            raise self.writer_error
+
+    def get_high_score(self) -> int:
+        """Returns the best score of all written runs, or 0 if there are none"""
+
+        return self.conn.execute('SELECT MAX(score) FROM runs').fetchone()[0] or 0
+
+    def get_top_scores(self, k: int = 10) -> List[Tuple[str, int, float]]:
+        """Returns the k best runs as (player, score, time), best first"""
+
+        return self.conn.execute('SELECT player, score, time FROM runs ORDER BY score DESC, id LIMIT ?',
+                                 (k,)).fetchall()
+
+    def get_top_players(self, k: int = 10) -> List[Tuple[str, int, float]]:
+        """Returns the k players with the best personal bests as (player, score, time), best first"""
+
+        return self.conn.execute('SELECT player, score, time FROM bests ORDER BY score DESC, time LIMIT ?',
+                                 (k,)).fetchall()
+
+    def get_player_best(self, player: str) -> Optional[int]:
+        """Returns a player's best score, or None if they have no written runs"""
+
+        row = self.conn.execute('SELECT score FROM bests WHERE player = ?', (player,)).fetchone()
+        return row[0] if row else None
+
+
+def drain(items: queue.Queue):
+    """Empties a queue, marking everything taken off it as done"""
+
+    while True:
+        try:
+            items.get_nowait()
+        except queue.Empty:
+            return
+        items.task_done()
@@ -1,6 +1,6 @@
 # Allow for type hinting while preventing circular imports
 from __future__ import annotations
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING
 
 # Import standard modules
 
@@ -9,51 +9,52 @@ import pygame as pg
 from pygame.sprite import Sprite
 
 # Import local classes and methods
+import helper_functions as hf
 
 # Import local class and methods that are only used for type hinting
 if TYPE_CHECKING:
     from settings import Settings
+    from simulation import PipePair
 
 
 class Pipe(Sprite):
-    """A class for the pipes"""
+    """A class for a pair of pipes. Draws a PipePair from the simulation as a single sprite covering both pipes and
+    the gap between them. Like the pipe pairs, pipe sprites are pooled and re-added to the sprite group on respawn."""
 
-    def __init__(self, gap_y: int, location: int, screen: pg.Surface, settings: Settings):
-        """Initialize the pipe's settings"""
+    def __init__(self, pair: PipePair, screen: pg.Surface, settings: Settings):
+        """Initialize the pipe pair's settings"""
 
         super(Pipe, self).__init__()
         self.screen = screen
         self.screen_rect = self.screen.get_rect()
 
-        # Positioning, x = center of pipe, y = center of gap
-        self.width = settings.pipe_width
-        self.x = self.screen_rect.right + self.width / 2
-        self.y = gap_y
-        self.velocity = settings.world_velocity
-        self.gap_height = settings.gap_height
-        self.location = location  # 0 = Bottom, 1 = Top
-
-        # Image
-        self.color = settings.pipe_color
-        self.images: List[List[pg.Surface]] = settings.pipe_imgs
-        self.image: pg.Surface = self.images[self.location][self.color]
-        self.rect: pg.Rect = self.image.get_rect()
-        self.mask = pg.mask.from_surface(self.image)
-
-        if location == 1:
-            self.rect.centerx = self.x
-            self.rect.bottom = self.y - self.gap_height / 2
-        else:
-            self.rect.centerx = self.x
-            self.rect.top = self.y + self.gap_height / 2
+        # Positioning is owned by the pipe pair, x = center of pipe, y = center of gap
+        self.pair = pair
+
+        # Image is shared by all pipe pairs of the same color
+        self.images = settings.pipe_pair_imgs
+        self.rect: pg.Rect = self.images[0].get_rect()
+
+        self.init_dynamic_variables()
+
+    def init_dynamic_variables(self):
+        """Picks up the pipe pair's color and position after it has been (re)spawned"""
+
+        self.color = self.pair.color
+        self.image: pg.Surface = self.images[self.color]
+        self.rect.center = self.pair.x, self.pair.gap_y
 
     def update(self, dt: int):
-        """Update the pipe's location"""
+        """Update the pipe pair's location"""
+
+        # Follow the pipe pair's position
+        self.rect.centerx = self.pair.x
+
+        # Check if pipe pair is still visible, kill if not
+        if not self.pair.is_visible():
+            self.kill()
 
-        # Update the pipe's position
-        self.x -= self.velocity * dt
-        self.rect.centerx = self.x
+    def interpolate(self, alpha: float):
+        """Places the pipe pair between its previous and current simulation steps for drawing"""
 
-        # Check if pipe is still visible, kill if not
-        if self.rect.right < self.screen_rect.left:
-            self.kill()
\ No newline at end of file
+        self.rect.centerx = hf.lerp(self.pair.prev_x, self.pair.x, alpha)
@@ -0,0 +1,76 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, Tuple
+
+# Import standard modules
+
+# Import non-standard modules
+import numpy as np
+import pygame as pg
+
+# Import local classes and methods
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    pass
+
+
+class PixelObserver():
+    """Turns the frames drawn to a surface into downsampled grayscale or RGB arrays for pixel based agents. Each frame
+    is scaled into a preallocated surface and read through a surfarray view of it, so the only copy made is the write
+    into the preallocated output. With stack above 1, the output holds the latest stack frames, oldest first. The
+    output array is reused, copy it to keep an observation past the next one."""
+
+    def __init__(self, surface: pg.Surface, size: Tuple[int, int] = (80, 120), gray: bool = True, stack: int = 1,
+                 smooth: bool = False):
+        """Initialize the observer for frames drawn to surface, downsampled to size (width, height). smooth averages
+        the pixels each output pixel covers rather than sampling the nearest one."""
+
+        self.surface = surface
+        self.size = size
+        self.gray = gray
+        self.stack = stack
+        self.scale = pg.transform.smoothscale if smooth else pg.transform.scale
+
+        # Downsampled frame, in the same pixel format as the source. The (width, height, 3) view of it is kept for the
+        # observer's life, as only the scaling writes to the surface.
+        self.small = pg.Surface(size, 0, surface)
+        self.pixels = pg.surfarray.pixels3d(self.small)
+
+        # Output frames, row major, and the luma weights and scratch space for grayscale conversion
+        width, height = size
+        self.frames = np.zeros((stack, height, width) if gray else (stack, height, width, 3), dtype=np.uint8)
+        self.gray_weights = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        self.luma = np.empty((height, width), dtype=np.float32)
+
+        # Whether the stack holds real frames yet, the first frame after a reset fills all of it
+        self.stacked = False
+
+    def reset(self):
+        """Starts a new episode, so the next frame fills the whole stack"""
+
+        self.stacked = False
+
+    def observe(self) -> np.ndarray:
+        """Downsamples the surface's current frame into the output and returns it, as a (height, width) grayscale or
+        (height, width, 3) RGB array with a leading stack axis if stacking"""
+
+        self.scale(self.surface, self.size, self.small)
+
+        if self.stack > 1:
+            self.frames[:-1] = self.frames[1:]
+        frame = self.frames[-1]
+
+        # The surfarray view is indexed (x, y), transposing it gives a row major view without a copy
+        rgb = self.pixels.transpose(1, 0, 2)
+        if self.gray:
+            np.einsum('yxc,c->yx', rgb, self.gray_weights, out=self.luma)
+            np.copyto(frame, self.luma, casting='unsafe')
+        else:
+            np.copyto(frame, rgb)
+
+        if not self.stacked:
+            self.frames[:-1] = frame
+            self.stacked = True
+
+        return self.frames if self.stack > 1 else frame
@@ -0,0 +1,229 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+# Import standard modules
+import argparse
+import json
+import math
+from multiprocessing import Pool
+
+# Import non-standard modules
+import pygame as pg
+
+# Import local classes and methods
+from environment import FlappyEnv
+from replay import REPLAY_VERSION, Replay, get_expected_physics, load_replay
+from settings import WorldSettings
+from simulation import BirdBody, Simulation
+import game_functions as gf
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    pass
+
+# Worlds and environments are reused across replays with the same physics settings, one set per process
+worlds: Dict[str, Simulation] = {}
+envs: Dict[str, FlappyEnv] = {}
+
+
+def get_world(physics: dict) -> Simulation:
+    """Returns a bare simulation for the given physics settings, creating it on first use"""
+
+    key = json.dumps(physics, sort_keys=True)
+    if key not in worlds:
+        worlds[key] = Simulation(WorldSettings(physics=physics))
+    return worlds[key]
+
+
+def get_env(physics: dict, headless: bool = True) -> FlappyEnv:
+    """Returns an environment for the given physics settings, creating it on first use"""
+
+    key = json.dumps(physics, sort_keys=True)
+    if key not in envs:
+        envs[key] = FlappyEnv(headless=headless, physics=physics)
+    return envs[key]
+
+
+def set_start(world: Simulation, replay: Replay):
+    """Puts the bird and world back in the state the run started from"""
+
+    body = world.bird
+    body.y = body.prev_y = replay.start['y']
+    body.current_frame = replay.start['frame']
+    body.animation_time = replay.start['animation_time']
+    world.settings.start_delay = replay.start['start_delay']
+
+
+def simulate(replay: Replay) -> Tuple[int, int]:
+    """Re-simulates a replay on a bare simulation, as fast as possible, without sprites or a display. Returns the
+    score and the number of simulation steps the run lasted."""
+
+    world = get_world(replay.physics)
+    world.reset()
+    world.start(replay.seed)
+    set_start(world, replay)
+
+    flap_steps = set(replay.flap_steps)
+    step_dt = 1000 / world.settings.physics_rate
+    while not world.step(step_dt, world.steps in flap_steps):
+
+        # Stop if the bird outlives the recording, as a cheat could otherwise stall playback forever
+        if world.steps > replay.steps:
+            break
+
+    return world.score, world.steps
+
+
+def play(replay: Replay, realtime: bool = False) -> Tuple[int, int]:
+    """Re-simulates a replay. Headless playback runs as fast as possible on a bare simulation; realtime playback runs
+    through the full game and draws every frame at the game's frame rate. Returns the score and the number of
+    simulation steps the run lasted."""
+
+    if not realtime:
+        return simulate(replay)
+
+    env = get_env(replay.physics, headless=False)
+    env.reset(seed=replay.seed)
+    set_start(env.world, replay)
+    env.bird.color = replay.start['color']
+
+    flap_steps = set(replay.flap_steps)
+    fps = 120.0
+    fps_clock = pg.time.Clock()
+    accumulator = 0
+    done = False
+    while not done:
+        accumulator += min(fps_clock.tick(fps), env.settings.max_frame_time)
+        while accumulator >= env.dt and not done:
+            done = env.step(env.world.steps in flap_steps)[2]
+            accumulator -= env.dt
+
+            # Stop if the bird outlives the recording, as a cheat could otherwise stall playback forever
+            if env.world.steps > replay.steps:
+                done = True
+
+        gf.interpolate(env.bird, env.pipes, accumulator / env.dt)
+        env.render()
+
+    return env.stats.score, env.world.steps
+
+
+def is_number(value, low: float, high: float, integer: bool = False) -> bool:
+    """Returns whether a value read from a replay is a number (an integer if integer is set) in [low, high]"""
+
+    types = int if integer else (int, float)
+    return isinstance(value, types) and not isinstance(value, bool) and low <= value <= high
+
+
+def check_replay(replay: Replay) -> Optional[str]:
+    """Returns why a replay could not have been recorded by the game, or None if it could. Its physics settings must
+    be those of its version, its starting state one the game can start a run from, and its seed, flaps, score and
+    length values the game could have recorded."""
+
+    expected = get_expected_physics(replay.version) if is_number(replay.version, 1, REPLAY_VERSION, True) else None
+    if expected is None:
+        return f'unknown version {replay.version}'
+    if not isinstance(replay.physics, dict):
+        return 'physics are not a set of settings'
+    if replay.physics != expected:
+        changed = sorted(name for name in set(expected) | set(replay.physics)
+                         if expected.get(name) != replay.physics.get(name))
+        return f"physics differ from version {replay.version}'s: {', '.join(changed)}"
+
+    # Runs start from the bird's idle bob, with the start delay either not yet begun (the first run since launch, or
+    # cut short by a game over) or already run out, which is up to a step over max_start_delay
+    settings = WorldSettings(physics=replay.physics)
+    body = BirdBody(settings)
+    step_dt = 1000 / settings.physics_rate
+    bounds = {
+        'y': (body.y_0 - body.idle_amp, body.y_0 + body.idle_amp, False),
+        'frame': (0, body.num_frames - 1, True),
+        'animation_time': (0, body.animation_speed, False),
+        'color': (0, settings.bird_num_colors - 1, True),
+        'start_delay': (0, settings.max_start_delay + step_dt, False),
+    }
+    if not isinstance(replay.start, dict) or set(replay.start) != set(bounds):
+        return 'start state has the wrong fields'
+    for name, (low, high, integer) in bounds.items():
+        if not is_number(replay.start[name], low, high, integer):
+            return f'start {name} out of range'
+
+    # Seeds are drawn as Simulation.start draws them. Flaps are recorded in order by the step they happen on, before
+    # it is counted, and several can land on the same step.
+    if not is_number(replay.seed, 0, 2**32 - 1, True):
+        return 'seed out of range'
+    if not is_number(replay.score, 0, math.inf, True):
+        return 'score out of range'
+    if not is_number(replay.steps, 0, math.inf, True):
+        return 'steps out of range'
+    if not isinstance(replay.flap_steps, list) or \
+            not all(is_number(step, 0, replay.steps, True) for step in replay.flap_steps):
+        return 'flap steps out of range'
+    if any(step > next_step for step, next_step in zip(replay.flap_steps, replay.flap_steps[1:])):
+        return 'flap steps out of order'
+
+    return None
+
+
+def validate(path: str) -> dict:
+    """Checks a saved run could have been recorded by the game, then replays it headless and checks the recorded
+    score and length against the re-simulated ones. A file that can't be read as a replay is rejected rather than
+    raising, so that one bad file doesn't stop the rest of a batch."""
+
+    result = {'path': path, 'claimed': None, 'claimed_steps': None, 'score': None, 'steps': None, 'valid': False}
+    try:
+        replay = load_replay(path)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as error:
+        result['error'] = f'unreadable replay: {error!r}'
+        return result
+
+    result.update(claimed=replay.score, claimed_steps=replay.steps, error=check_replay(replay))
+    if result['error'] is None:
+        result['score'], result['steps'] = play(replay)
+    result['valid'] = result['error'] is None and (result['score'], result['steps']) == (replay.score, replay.steps)
+    return result
+
+
+def validate_all(paths: List[str], processes: int = None) -> List[dict]:
+    """Validates saved runs in parallel across a process pool (one process per core by default)"""
+
+    # Workers are closed rather than terminated, as SDL replaces their SIGTERM handler once initialized
+    pool = Pool(processes)
+    results = pool.map(validate, paths, chunksize=16)
+    pool.close()
+    pool.join()
+    return results
+
+
+def main():
+    """Plays back a saved run or validates a batch of them"""
+
+    parser = argparse.ArgumentParser(description='Play back or validate recorded Flappy Bird runs')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    play_parser = subparsers.add_parser('play', help='re-simulate a run, drawn in real time unless --headless')
+    play_parser.add_argument('path')
+    play_parser.add_argument('--headless', action='store_true')
+    validate_parser = subparsers.add_parser('validate', help='check the scores of recorded runs headless')
+    validate_parser.add_argument('paths', nargs='+')
+    validate_parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == 'play':
+        score, steps = play(load_replay(args.path), realtime=not args.headless)
+        print(f'Score: {score} ({steps} steps)')
+
+    elif args.command == 'validate':
+        results = validate_all(args.paths, args.processes)
+        for result in results:
+            if result['error']:
+                print(f"REJECTED {result['path']} {result['error']}")
+                continue
+            status = 'OK' if result['valid'] else 'MISMATCH'
+            print(f"{status} {result['path']} claimed {result['claimed']} in {result['claimed_steps']} steps, "
+                  f"simulated {result['score']} in {result['steps']} steps")
+        print(f"{sum(result['valid'] for result in results)}/{len(results)} valid")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, Tuple
+
+# Import standard modules
+import csv
+import json
+import os
+import time
+from collections import deque
+
+# Import non-standard modules
+import pygame as pg
+
+# Import local classes and methods
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    from renderer import Renderer
+
+# Phases of the main loop, in the order they run
+PHASES = ('events', 'autopilot', 'world', 'bird', 'collisions', 'record', 'scenery', 'draw', 'hud', 'flip', 'wait')
+
+
+class Profiler():
+    """Times each phase of the main loop. Keeps rolling statistics over the last window frames for the on-screen HUD
+    and, if given a path, writes every frame's timings to a CSV (for a .csv path) or JSON lines file."""
+
+    def __init__(self, phases: Tuple[str, ...] = PHASES, window: int = 600, path: str = None):
+        """Initialize the profiler"""
+
+        self.phases = phases
+        self.window = window
+        self.hud_refresh = 500  # ms between HUD redraws, so the HUD doesn't show up in its own timings
+        self.hud_color = (255, 255, 255)
+        self.hud_bg_color = (0, 0, 0, 160)
+
+        # Rolling frame times per phase, in ms, plus the whole frame
+        self.history: Dict[str, deque] = {phase: deque(maxlen=window) for phase in phases + ('frame',)}
+
+        # Per frame records are streamed to the file rather than kept in memory
+        self.path = path
+        self.file = None
+        self.writer = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.file = open(path, 'w', newline='')
+            if path.endswith('.csv'):
+                self.writer = csv.writer(self.file)
+                self.writer.writerow(('frame', 'time', 'state', 'steps') + phases + ('frame_time',))
+
+        self.font = None
+        self.hud_image = None
+        self.hud_time = 0
+
+        self.frame_count = 0
+        self.start_time = self.lap_time = self.frame_time = time.perf_counter()
+        self.timings = dict.fromkeys(phases, 0.0)
+
+    def lap(self, phase: str):
+        """Adds the time since the previous lap to phase. A phase may be lapped several times in a frame."""
+
+        now = time.perf_counter()
+        self.timings[phase] += (now - self.lap_time) * 1000
+        self.lap_time = now
+
+    def end_frame(self, state: str, steps: int):
+        """Records the frame's timings, along with the game state and the number of simulation steps run, and starts
+        the next frame"""
+
+        now = time.perf_counter()
+        frame_time = (now - self.frame_time) * 1000
+        for phase, timing in self.timings.items():
+            self.history[phase].append(timing)
+        self.history['frame'].append(frame_time)
+
+        if self.file:
+            timings = [round(self.timings[phase], 4) for phase in self.phases]
+            record = [self.frame_count, round((self.frame_time - self.start_time) * 1000, 3), state, steps]
+            if self.writer:
+                self.writer.writerow(record + timings + [round(frame_time, 4)])
+            else:
+                record = dict(zip(('frame', 'time', 'state', 'steps'), record))
+                record.update(zip(self.phases, timings), frame_time=round(frame_time, 4))
+                self.file.write(json.dumps(record) + '\n')
+
+        self.frame_count += 1
+        self.frame_time = self.lap_time = now
+        self.timings = dict.fromkeys(self.phases, 0.0)
+
+    def get_stats(self, phase: str) -> Dict[str, float]:
+        """Returns the p50, p95, p99 and max of a phase's frame times over the rolling window, in ms"""
+
+        values = sorted(self.history[phase])
+        if not values:
+            return dict.fromkeys(('p50', 'p95', 'p99', 'max'), 0.0)
+
+        def percentile(q):
+            return values[min(len(values) - 1, int(q * len(values)))]
+
+        return {'p50': percentile(0.50), 'p95': percentile(0.95), 'p99': percentile(0.99), 'max': values[-1]}
+
+    def draw_hud(self, dt: int, screen: Renderer):
+        """Draws a table of the rolling statistics in the top left corner of the screen. The table is only re-rendered
+        every hud_refresh ms."""
+
+        self.hud_time -= dt
+        if self.hud_image is None or self.hud_time <= 0:
+            self.hud_time = self.hud_refresh
+            self.hud_image = self.render_hud()
+        screen.blit(self.hud_image, (0, 0))
+
+    def render_hud(self) -> pg.Surface:
+        """Renders the rolling statistics table to a surface. Cells are placed in fixed columns, as the default font
+        isn't monospaced."""
+
+        if not self.font:
+            self.font = pg.font.Font(None, 18)
+
+        keys = ('p50', 'p95', 'p99', 'max')
+        rows = [('ms',) + keys]
+        for phase in self.phases + ('frame',):
+            stats = self.get_stats(phase)
+            rows.append((phase,) + tuple(f'{stats[key]:.2f}' for key in keys))
+
+        name_width, column_width, line_height, margin = 70, 45, self.font.get_linesize(), 4
+        image = pg.Surface((name_width + column_width * len(keys) + 2 * margin, line_height * len(rows) + 2 * margin),
+                           pg.SRCALPHA)
+        image.fill(self.hud_bg_color)
+        for i, row in enumerate(rows):
+            y = margin + i * line_height
+            image.blit(self.font.render(row[0], True, self.hud_color), (margin, y))
+            for j, cell in enumerate(row[1:]):
+                text = self.font.render(cell, True, self.hud_color)
+                image.blit(text, text.get_rect(topright=(margin + name_width + (j + 1) * column_width, y)))
+        return image
+
+    def close(self):
+        """Closes the per frame records file"""
+
+        if self.file:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,111 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, Iterable, List, Set
+
+# Import standard modules
+
+# Import non-standard modules
+import pygame as pg
+
+# Import local classes and methods
+import helper_functions as hf
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    pass
+
+
+class Renderer():
+    """Stands in for the display surface. Drawing goes straight through to the screen as usual, but every blit and fill
+    is recorded so that at the end of the frame only the regions that differ from the previous frame are pushed to the
+    display with pg.display.update, rather than flipping the whole screen. Anything other than drawing is passed
+    through to the display surface.
+
+    The background covers the whole screen, so while the scenery scrolls (every state but GAMEOVER) each frame where
+    the background moves on to a new whole pixel is still a full flip. Only the frames in between, where the ground,
+    pipes, bird and score are the only changes, are partial updates. Once the game over screen has faded in, every
+    frame is partial."""
+
+    def __init__(self, screen: pg.Surface, dirty_rects: bool = True):
+        """Initialize the renderer. With dirty_rects off, every frame is flipped in full."""
+
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.dirty_rects = dirty_rects
+
+        # Above this fraction of the screen, a full flip is cheaper than updating the changed regions one by one
+        self.max_dirty_area = 0.5
+
+        # What was drawn this frame and the last, as (source, alpha, area, special_flags, rect) keys. Holding on to the
+        # sources keeps them alive, so a surface freed and replaced between frames can't be mistaken for the old one.
+        self.drawn: Set[tuple] = set()
+        self.prev_drawn: Set[tuple] = set()
+
+        # Regions to push regardless of what was drawn. The first frame is always pushed in full.
+        self.invalid_rects: List[pg.Rect] = []
+        self.full_update = True
+
+    def __getattr__(self, name: str):
+        """Passes anything that isn't drawing through to the display surface"""
+
+        return getattr(self.screen, name)
+
+    def blit(self, source: pg.Surface, dest, area=None, special_flags: int = 0) -> pg.Rect:
+        """Draws source onto the screen, as pg.Surface.blit, and records it"""
+
+        rect = self.screen.blit(source, dest, area, special_flags)
+
+        # Recorded unclipped, as a surface moving partly off screen can blit to the same clipped rect
+        area = tuple(pg.Rect(area)) if area else None
+        size = area[2:] if area else source.get_size()
+        self.drawn.add((source, source.get_alpha(), area, special_flags, tuple(dest[:2]) + size))
+        return rect
+
+    def blits(self, blit_sequence: Iterable[tuple], doreturn: bool = True) -> List[pg.Rect]:
+        """Draws a sequence of (source, dest[, area[, special_flags]]) onto the screen, as pg.Surface.blits, and
+        records them"""
+
+        rects = [self.blit(*item) for item in blit_sequence]
+        return rects if doreturn else None
+
+    def fill(self, color: pg.Color, rect=None, special_flags: int = 0) -> pg.Rect:
+        """Fills the screen, or part of it, as pg.Surface.fill and records it"""
+
+        rect = self.screen.fill(color, rect, special_flags)
+        self.drawn.add(('fill', tuple(pg.Color(color)), None, special_flags, tuple(rect)))
+        return rect
+
+    def invalidate(self, rect: pg.Rect = None):
+        """Forces a region, or with no rect the whole screen, to be pushed at the end of the frame. Needed when a
+        surface that is already on screen is drawn over in place, or the window contents are lost."""
+
+        if rect:
+            self.invalid_rects.append(pg.Rect(rect))
+        else:
+            self.full_update = True
+
+    def get_dirty_rects(self) -> List[pg.Rect]:
+        """Returns the merged regions of the screen that differ from the previous frame. Anything drawn in only one of
+        the two frames, or drawn differently, is dirty at both its old and new locations."""
+
+        rects = [pg.Rect(key[4]) for key in self.drawn ^ self.prev_drawn] + self.invalid_rects
+        rects = [rect.clip(self.screen_rect) for rect in rects]
+        return hf.merge_rects([rect for rect in rects if rect.width and rect.height])
+
+    def flip(self):
+        """Pushes the frame to the display. Only the dirty regions are updated unless they cover most of the screen or
+        dirty rects are off."""
+
+        if not self.dirty_rects or self.full_update:
+            pg.display.flip()
+        else:
+            rects = self.get_dirty_rects()
+            screen_area = self.screen_rect.width * self.screen_rect.height
+            if sum(rect.width * rect.height for rect in rects) > self.max_dirty_area * screen_area:
+                pg.display.flip()
+            elif rects:
+                pg.display.update(rects)
+
+        self.prev_drawn, self.drawn = self.drawn, set()
+        self.invalid_rects = []
+        self.full_update = False
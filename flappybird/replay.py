@@ -0,0 +1,170 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, List
+
+# Import standard modules
+import json
+import os
+import queue
+import threading
+
+# Import non-standard modules
+
+# Import local classes and methods
+from settings import WorldSettings
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    from simulation import Simulation
+
+# Version of the game that replays are recorded by. Each version's physics settings differ from the current defaults
+# by the overrides listed, which a genuine replay of that version was recorded with.
+REPLAY_VERSION = 2
+REPLAY_PHYSICS = {
+    1: {'reachable_gaps': False},  # gaps drawn from the full range
+    2: {},
+}
+
+
+class Replay():
+    """A recorded run. Stores everything needed to re-simulate it: the pipe course seed, the physics settings, the
+    bird's starting state and the simulation steps on which the bird flapped."""
+
+    def __init__(self, seed: int, physics: dict, start: dict, flap_steps: List[int], score: int, steps: int,
+                 version: int = REPLAY_VERSION):
+        """Initialize the replay"""
+
+        self.version = version
+        self.seed = seed
+        self.physics = physics
+        self.start = start  # bird y, animation frame and time, color and the remaining start delay
+        self.flap_steps = flap_steps
+        self.score = score
+        self.steps = steps
+
+    def to_dict(self) -> dict:
+        """Returns the replay as a JSON serializable dictionary"""
+
+        return {
+            'version': self.version,
+            'seed': self.seed,
+            'physics': self.physics,
+            'start': self.start,
+            'flap_steps': self.flap_steps,
+            'score': self.score,
+            'steps': self.steps
+        }
+
+    def save(self, path: str):
+        """Saves the replay to a JSON file at path, creating its directory if necessary"""
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file)
+
+
+class ReplayWriter():
+    """Saves replays to a directory from a worker thread, so a game over never waits on the disk. At most max_queued
+    replays wait to be written, after which saving waits for the writer to catch up."""
+
+    def __init__(self, path: str, max_queued: int = 100):
+        """Start the writer thread, saving replays to the directory at path"""
+
+        self.path = path
+
+        # Replays waiting to be written, with their file names. None tells the writer to stop.
+        self.queue: queue.Queue = queue.Queue(max_queued)
+        self.writer_error = None
+        self.writer = threading.Thread(target=self.write_replays, name='replay_writer', daemon=True)
+        self.writer.start()
+
+    def save(self, replay: Replay, file_name: str):
+        """Queues a replay to be saved as file_name in the writer's directory. Returns immediately unless the queue
+        is full. Raises the writer's error if it has stopped."""
+
+        if self.writer_error:
+            raise self.writer_error
+        self.queue.put((replay, file_name))
+
+    def write_replays(self):
+        """Writer thread. Saves replays as they are queued, until told to stop."""
+
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    self.queue.task_done()
+                    break
+                replay, file_name = item
+                replay.save(os.path.join(self.path, file_name))
+                self.queue.task_done()
+
+        # Raised on the game thread by save, flush or close, rather than lost with the thread. The replay that failed
+        # and those still queued are marked done so that flush doesn't wait on them forever.
+        except Exception as error:
+            self.writer_error = error
+            self.queue.task_done()
+            while True:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                self.queue.task_done()
+
+    def flush(self):
+        """Waits until every queued replay has been saved"""
+
+        if self.writer.is_alive():
+            self.queue.join()
+        if self.writer_error:
+            raise self.writer_error
+
+    def close(self):
+        """Saves any replays still queued, then stops the writer"""
+
+        if self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join()
+        if self.writer_error:
+            raise self.writer_error
+
+
+def record_replay(world: Simulation, color: int, score: int) -> Replay:
+    """Creates a replay of the simulation's current run"""
+
+    start = {
+        'y': world.start_y,
+        'frame': world.start_frame,
+        'animation_time': world.start_animation_time,
+        'color': color,
+        'start_delay': world.start_delay
+    }
+    return Replay(world.seed, world.settings.get_physics(), start, list(world.flap_steps), score, world.steps)
+
+
+def load_replay(path: str) -> Replay:
+    """Loads a replay saved at path"""
+
+    with open(path) as file:
+        data = json.load(file)
+
+    # Replays recorded before they were versioned are version 1 if they predate reachable gaps, which drew every gap
+    # from the full range
+    version = data.get('version', 2 if 'reachable_gaps' in data['physics'] else 1)
+    if version == 1:
+        data['physics'].setdefault('reachable_gaps', False)
+
+    return Replay(data['seed'], data['physics'], data['start'], data['flap_steps'], data['score'], data['steps'],
+                  version)
+
+
+def get_expected_physics(version: int) -> dict:
+    """Returns the physics settings a replay of the given version was recorded with, in the form they are saved in,
+    or None for an unknown version"""
+
+    if version not in REPLAY_PHYSICS:
+        return None
+    return json.loads(json.dumps(WorldSettings(physics=REPLAY_PHYSICS[version]).get_physics()))
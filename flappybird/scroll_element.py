@@ -9,6 +9,7 @@ import pygame as pg
 from pygame.sprite import Sprite
 
 # Import local classes and methods
+import helper_functions as hf
 
 # Import local class and methods that are only used for type hinting
 if TYPE_CHECKING:
@@ -16,7 +17,9 @@ if TYPE_CHECKING:
 
 
 class ScrollElem(Sprite):
-    """A class for continuously scrolling images (e.g. background, ground)"""
+    """A class for continuously scrolling images (e.g. background, ground). Each scene's image is tiled into a strip
+    once, up front, and the strip is drawn wrapped around from a scroll offset with at most two blits, however many
+    tiles it takes to cover the screen. Further parallax layers are further ScrollElems at the same fixed cost."""
 
     def __init__(self, images: List[pg.Surface], y: float, velocity: float, screen: pg.Surface):
         """Initialize the element's settings"""
@@ -25,44 +28,35 @@ class ScrollElem(Sprite):
         self.screen = screen
         self.screen_rect = self.screen.get_rect()
 
-        # Image
+        # Image strips, one per scene
         self.scene = 0
-        self.images: List[pg.Surface] = images
+        self.images: List[pg.Surface] = [hf.tile_strip(image, self.screen_rect.width) for image in images]
         self.image: pg.Surface = self.images[self.scene]
-        self.num_tiles = self.screen_rect.width // self.image.get_width() + 2
-        self.rects: List[pg.Rect] = []
-        self.x = []
         self.y = y
         self.velocity = velocity
 
-        for i in range(self.num_tiles):
-            x = self.image.get_width() * i
-            rect = self.image.get_rect(x=x, y=y)
-            self.x.append(x)
-            self.rects.append(rect)
+        # Distance the strip has scrolled, wrapped to its width
+        self.offset = 0
 
     def change_scene(self):
         """Changes the scene by updating the index within the images list"""
-        
+
         self.scene = (self.scene + 1) % len(self.images)
         self.image = self.images[self.scene]
+        self.offset %= self.image.get_width()
 
     def update(self, dt: int):
         """Update the element's location"""
 
-        # Update all x coordinates and rects
-        for i in range(self.num_tiles):
-            self.x[i] -= self.velocity * dt
-            self.rects[i].x = int(self.x[i])
-
-        # Check if any rects have scrolled off screen and move to end of the line
-        for i in range(self.num_tiles):
-            if self.rects[i].right < 0:
-                self.rects[i].left = self.x[i] = self.rects[i - 1].right
-                break
+        self.offset = (self.offset + self.velocity * dt) % self.image.get_width()
 
     def blitme(self):
-        """Draws the scrolling images to the screen"""
-        
-        for i in range(self.num_tiles):
-            self.screen.blit(self.image, self.rects[i])
\ No newline at end of file
+        """Draws the scrolling images to the screen, wrapping around to the start of the strip if its end is on
+        screen"""
+
+        width, height = self.image.get_size()
+        offset = int(self.offset)
+        visible = min(width - offset, self.screen_rect.width)
+        self.screen.blit(self.image, (0, self.y), (offset, 0, visible, height))
+        if visible < self.screen_rect.width:
+            self.screen.blit(self.image, (visible, self.y), (0, 0, self.screen_rect.width - visible, height))
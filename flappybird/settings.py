@@ -1,14 +1,17 @@
 # Allow for type hinting while preventing circular imports
 from __future__ import annotations
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, List, Tuple
 
 # Import standard modules
 import os
+import threading
 
 # Import non-standard modules
 import pygame as pg
 
 # Import local classes and methods
+from asset_cache import AssetCache
+from tween import Tweener
 import helper_functions as hf
 
 # Import local class and methods that are only used for type hinting
@@ -20,36 +23,109 @@ BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 PINK = (255, 105, 180)
 
+# Settings that determine how the world plays out. Recorded with replays and overridable through WorldSettings.
+PHYSICS_SETTINGS = ('gravity', 'world_velocity', 'max_start_delay', 'physics_rate', 'ground_elev', 'max_velocity',
+                    'jump_velocity', 'bird_hitbox', 'gap_height', 'pipe_spacing', 'gap_y_min', 'gap_y_max',
+                    'reachable_gaps')
 
-class Settings():
-    """A class to store game settings"""
 
-    def __init__(self, screen: pg.Surface):
-        """Initialize the game's static settings"""
+class WorldSettings():
+    """A class to store the game's simulation settings. Holds no display or audio assets so that the game world can be
+    stepped headless."""
+
+    def __init__(self, screen_size: Tuple[int, int] = (480, 720), img_scale: float = 3, physics: dict = None):
+        """Initialize the world's static settings. Any of the PHYSICS_SETTINGS may be overridden with the physics
+        dictionary, values derived from an overridden setting follow it unless overridden themselves."""
+
+        physics = physics if physics else {}
+
+        # World settings
+        self.gravity = physics.get('gravity', 0.5 * 3600 / 1000000)  # default = 0.5
+        self.world_velocity = physics.get('world_velocity', 3.5 * 60 / 1000)  # default = 3.5
+        self.max_start_delay = physics.get('max_start_delay', 1500)
+        self.physics_rate = physics.get('physics_rate', 240)  # fixed simulation steps per second
+
+        # Screen layout settings
+        self.screen_width, self.screen_height = screen_size
+        self.img_scale = img_scale
+
+        # Ground settings
+        self.ground_elev = physics.get('ground_elev', self.screen_height - 100)
+
+        # Bird settings
+        self.max_velocity = physics.get('max_velocity', 9 * 60 / 1000)  # default = 9
+        self.jump_velocity = physics.get('jump_velocity', 2 * self.max_velocity)
+        self.bird_width, self.bird_height = 17 * img_scale, 12 * img_scale
+        # Box the bird is scored by. It collides with its rotated sprite, see CollisionModel.
+        self.bird_hitbox = tuple(physics.get('bird_hitbox', (self.bird_width - 2 * img_scale,
+                                                             self.bird_height - 2 * img_scale)))
+        self.bird_num_frames = 3
+        self.bird_num_colors = 3
+        self.bird_min_angle, self.bird_max_angle, self.bird_angle_step = -90, 45, 3  # rotated frames drawn and collided
+
+        # Pipe settings
+        self.gap_height = physics.get('gap_height', 180)  # default = 180
+        self.pipe_spacing = physics.get('pipe_spacing', 275)  # default = 275
+        min_pipe_height = 50
+        self.gap_y_min = physics.get('gap_y_min', self.gap_height / 2 + min_pipe_height)
+        self.gap_y_max = physics.get('gap_y_max', self.ground_elev - self.gap_height / 2 - min_pipe_height)
+        self.reachable_gaps = physics.get('reachable_gaps', True)  # only draw gaps the bird can get to from the last
+        self.pipe_color = 0  # 0 = Green, 1 = Red
+        self.num_pipe_colors = 2
+        self.pipe_width = 26 * img_scale
+
+        self.game_states = ('SPLASH', 'READY', 'PLAY', 'GAMEOVER')
+        self.autopilot_budget = 1000  # us the autopilot may plan for per simulation step
+
+        # Initialize dynamic variables
+        self.init_world_variables()
+        self.start_delay = 0
+
+    def init_world_variables(self):
+        """Initializes the world's dynamic variables"""
+
+        self.current_state = 'READY'
+        self.travel_distance = 0
+
+    def get_physics(self) -> dict:
+        """Returns the current values of the PHYSICS_SETTINGS"""
+
+        return {name: getattr(self, name) for name in PHYSICS_SETTINGS}
+
+
+class Settings(WorldSettings):
+    """A class to store game settings. Only the assets used by the splash sequence are loaded up front, the rest are
+    loaded on a worker thread while the splash plays and set up by finish_loading."""
+
+    def __init__(self, screen: pg.Surface, physics: dict = None):
+        """Initialize the game's static settings. Physics settings may be overridden as in WorldSettings."""
 
         # File paths
         self.images_dir = 'assets/images'
         self.sounds_dir = 'assets/sounds'
+        self.cache_dir = 'assets/cache'
 
-        # Load assets
+        # Load the splash sequence's assets, through the on-disk cache of preprocessed images and sounds
         self.img_scale = 3
-        self.load_image_assets()
-        self.load_sound_assets()
+        self.asset_cache = AssetCache(self.cache_dir)
+        self.load_splash_assets()
 
         # Set sound volume
         self.music_vol = 0.5
         self.sfx_vol = 1.0
-        hf.update_volume(self.music_bank, self.music_vol)
         hf.update_volume(self.sfx_bank, self.sfx_vol)
 
-        # World settings
-        self.gravity = 0.5 * 3600 / 1000000  # default = 0.5
-        self.world_velocity = 3.5 * 60 / 1000  # default = 3.5
-        self.max_start_delay = 1500
+        # World, bird and pipe physics settings
+        super(Settings, self).__init__(screen.get_size(), self.img_scale, physics)
         self.get_ready_delay = 1000
+        self.max_frame_time = 250  # longest frame the simulation will catch up on, in ms
+        self.replay_dir = 'replays'  # set to None to stop saving replays
+        self.leaderboard_path = 'leaderboard.db'  # set to None to stop recording runs
+        self.player_name = 'Player'
+        self.show_hud = False  # frame timing overlay, toggled with F3
+        self.autopilot = False  # attract mode, the game plays itself. Toggled with A.
 
         # Screen layout settings
-        self.screen_width, self.screen_height = screen.get_size()
         self.bg_color = GREY
 
         # Background settings
@@ -58,21 +134,57 @@ class Settings():
         self.bg_imgs = [self.bg_img_day, self.bg_img_night]
         self.bg_img = self.bg_imgs[self.scene]
 
-        # Ground settings
-        self.ground_elev = self.screen_height - 100
-
         # Bird settings
-        self.max_velocity = 9 * 60 / 1000  # default = 9
-        self.jump_velocity = 2 * self.max_velocity
         self.bird_frames = [self.bird_frames_yellow, self.bird_frames_red, self.bird_frames_blue]
+        self.bird_width, self.bird_height = self.bird_frames[0][0].get_size()
+        self.bird_num_frames = len(self.bird_frames[0])
+        self.bird_rotations = hf.load_rotations(self.bird_frames, self.bird_min_angle, self.bird_max_angle,
+                                                self.bird_angle_step)
+
+        # UI settings
+        self.splash_loc = (self.screen_width // 2, 200)
+
+        self.dimmer = pg.Surface((self.screen_width, self.screen_height), pg.SRCALPHA)
+        self.dimmer.fill(BLACK)
+        self.dimmer_rect = self.dimmer.get_rect()
+        self.dimmer_max_opacity = 100
+
+        # Fade durations, in ms
+        self.splash_fade_time = 700  # dimmer, at launch
+        self.get_ready_fade_time = 100
+        self.dimmer_fade_time = 280  # at game over
+        self.game_over_fade_time = 425  # game over image and buttons
+
+        # Fades and other animations, advanced by frame time
+        self.tweens = Tweener()
+
+        # Dynamic variable initilization (for game start only)
+        self.init_world_variables()
+        self.idle_time = 0
+        self.current_state = 'SPLASH'
+        self.dimmer.set_alpha(255)
+        self.tweens.fade(self.dimmer, 0, self.splash_fade_time)
+        self.start_delay = 0
+
+        # Load the remaining assets in the background
+        self.loading = True
+        self.loader_error = None
+        self.loader = threading.Thread(target=self.load_game_assets, name='asset_loader', daemon=True)
+        self.loader.start()
+
+    def finish_loading(self):
+        """Waits for the loader thread, then sets up the settings that depend on the game assets and starts the music.
+        Must be called, from the main thread, before the game leaves the SPLASH state."""
+
+        self.loader.join()
+        self.loading = False
+        if self.loader_error:
+            raise self.loader_error
+
+        hf.update_volume(self.music_bank, self.music_vol)
+        hf.update_volume(self.sfx_bank, self.sfx_vol)
 
         # Pipe settings
-        self.gap_height = 180  # default = 180
-        self.pipe_spacing = 275  # default = 275
-        min_pipe_height = 50
-        self.gap_y_min = self.gap_height / 2 + min_pipe_height
-        self.gap_y_max = self.ground_elev - self.gap_height / 2 - min_pipe_height
-        self.pipe_color = 0  # 0 = Green, 1 = Red
         self.pipe_imgs: List[List[pg.Surface]] = [[self.pipe_img_green, self.pipe_img_red],
                                                   [
                                                       pg.transform.flip(self.pipe_img_green, False, True),
@@ -80,9 +192,12 @@ class Settings():
                                                   ]]
         self.pipe_width = self.pipe_imgs[0][0].get_rect().width
 
-        # UI settings
-        self.splash_loc = (self.screen_width // 2, 200)
+        # Each pair of pipes is drawn as a single image, one per pipe color
+        self.pipe_pair_imgs: List[pg.Surface] = [hf.stack_pipes(self.pipe_imgs[1][color], self.pipe_imgs[0][color],
+                                                                int(self.gap_height))
+                                                 for color in range(len(self.pipe_imgs[0]))]
 
+        # UI settings
         self.get_ready_rect = self.get_ready_img.get_rect()
         self.get_ready_rect.center = self.screen_width // 2, 200
 
@@ -92,85 +207,92 @@ class Settings():
         self.game_over_rect = self.game_over_img.get_rect()
         self.game_over_rect.midbottom = self.screen_width // 2, 250
 
-        self.big_nums_imgs = hf.load_frames(self.big_nums_sheet, 10, PINK)
-        self.small_nums_imgs = hf.load_frames(self.small_nums_sheet, 10, PINK)
-        self.medal_imgs = hf.load_frames(self.medal_sheet, 4, PINK)
-        self.game_states = ('SPLASH', 'READY', 'PLAY', 'GAMEOVER')
-
-        self.dimmer = pg.Surface((self.screen_width, self.screen_height), pg.SRCALPHA)
-        self.dimmer.fill(BLACK)
-        self.dimmer_rect = self.dimmer.get_rect()
-        self.dimmer_max_opacity = 100
-
-        # Initialize dynamic variables
-        self.init_dynamic_variables()
-
-        # Dynamic variable initilization (for game start only)
-        self.current_state = 'SPLASH'
-        self.dimmer.set_alpha(255)
-        self.start_delay = 0
+        self.sfx_music.play(loops=-1, fade_ms=2000)
+        self.get_ready_img.set_alpha(0)
+        self.idle_msg_img.set_alpha(0)
+        self.game_over_img.set_alpha(0)
 
     def init_dynamic_variables(self):
         """Initializes the game's dynamic variables"""
 
         self.sfx_music.play(loops=-1, fade_ms=2000)
-        self.current_state = 'READY'
-        self.travel_distance = 0
+        self.init_world_variables()
         self.idle_time = 0
+        self.tweens.clear()
         self.get_ready_img.set_alpha(0)
         self.idle_msg_img.set_alpha(0)
         self.game_over_img.set_alpha(0)
         self.dimmer.set_alpha(0)
 
-    def load_image_assets(self):
-        """Load the game's image assets"""
+    def load_splash_assets(self):
+        """Load the assets used while the splash sequence plays: the scenery and bird behind it, and the sound effects
+        the bird and the color and scene changes play"""
 
-        # Game images
-        self.bg_img_day = hf.load_image('background_day.png', self.img_scale, self.images_dir)
-        self.bg_img_night = hf.load_image('background_night.png', self.img_scale, self.images_dir)
+        cache = self.asset_cache
+        self.sfx_bank = []
+        self.music_bank = []
+
+        # Images
+        self.bg_img_day = cache.load_image('background_day.png', self.img_scale, self.images_dir)
+        self.bg_img_night = cache.load_image('background_night.png', self.img_scale, self.images_dir)
 
-        self.ground_img = hf.load_image('ground.png', self.img_scale, self.images_dir)
+        self.ground_img = cache.load_image('ground.png', self.img_scale, self.images_dir)
 
-        self.bird_sheet_yellow = hf.load_image('bird_sheet_yellow.png', self.img_scale, self.images_dir)
-        self.bird_frames_yellow = hf.load_frames(self.bird_sheet_yellow, 3, BLACK)
-        self.bird_sheet_red = hf.load_image('bird_sheet_red.png', self.img_scale, self.images_dir)
-        self.bird_frames_red = hf.load_frames(self.bird_sheet_red, 3, BLACK)
-        self.bird_sheet_blue = hf.load_image('bird_sheet_blue.png', self.img_scale, self.images_dir)
-        self.bird_frames_blue = hf.load_frames(self.bird_sheet_blue, 3, BLACK)
+        self.bird_frames_yellow = cache.load_frames('bird_sheet_yellow.png', self.img_scale, self.images_dir, 3, BLACK)
+        self.bird_frames_red = cache.load_frames('bird_sheet_red.png', self.img_scale, self.images_dir, 3, BLACK)
+        self.bird_frames_blue = cache.load_frames('bird_sheet_blue.png', self.img_scale, self.images_dir, 3, BLACK)
 
-        self.pipe_img_green = hf.load_image('pipe_green.png', self.img_scale, self.images_dir)
-        self.pipe_img_red = hf.load_image('pipe_red.png', self.img_scale, self.images_dir)
+        self.icon = cache.load_image('bird_icon.png', self.img_scale, self.images_dir)
+        self.splash_img = cache.load_image('splash.png', self.img_scale, self.images_dir)
+
+        # Sounds
+        self.sfx_fall = cache.load_sound('sfx_fall_delayed.wav', self.sounds_dir, self.sfx_bank)
+        self.sfx_hit = cache.load_sound('sfx_hit.wav', self.sounds_dir, self.sfx_bank)
+        self.sfx_swoosh = cache.load_sound('sfx_swoosh.wav', self.sounds_dir, self.sfx_bank)
+        self.sfx_flap = cache.load_sound('sfx_flap.wav', self.sounds_dir, self.sfx_bank)
+        self.sfx_pop = cache.load_sound('sfx_pop.wav', self.sounds_dir, self.sfx_bank)
+
+    def load_game_assets(self):
+        """Load the rest of the game's assets. Runs on the loader thread, any error is re-raised by finish_loading."""
+
+        try:
+            self.load_image_assets()
+            self.load_sound_assets()
+            self.asset_cache.save()
+        except Exception as error:
+            self.loader_error = error
+
+    def load_image_assets(self):
+        """Load the game's image assets"""
+
+        cache = self.asset_cache
+
+        # Game images
+        self.pipe_img_green = cache.load_image('pipe_green.png', self.img_scale, self.images_dir)
+        self.pipe_img_red = cache.load_image('pipe_red.png', self.img_scale, self.images_dir)
 
         # Scoreboard images
-        self.score_plaque_img = hf.load_image('score_plaque.png', self.img_scale, self.images_dir, PINK)
-        self.big_nums_sheet = hf.load_image('numbers_big.png', self.img_scale, self.images_dir)
-        self.small_nums_sheet = hf.load_image('numbers_small.png', self.img_scale, self.images_dir)
-        self.medal_sheet = hf.load_image('medal_sheet.png', self.img_scale, self.images_dir)
-        self.new_high_score_img = hf.load_image('new.png', self.img_scale, self.images_dir)
+        self.score_plaque_img = cache.load_image('score_plaque.png', self.img_scale, self.images_dir, PINK)
+        self.big_nums_imgs = cache.load_frames('numbers_big.png', self.img_scale, self.images_dir, 10, PINK)
+        self.small_nums_imgs = cache.load_frames('numbers_small.png', self.img_scale, self.images_dir, 10, PINK)
+        self.medal_imgs = cache.load_frames('medal_sheet.png', self.img_scale, self.images_dir, 4, PINK)
+        self.new_high_score_img = cache.load_image('new.png', self.img_scale, self.images_dir)
 
         # UI Images
-        self.icon = hf.load_image('bird_icon.png', self.img_scale, self.images_dir)
-        self.splash_img = hf.load_image('splash.png', self.img_scale, self.images_dir)
-        self.get_ready_img = hf.load_image('get_ready.png', self.img_scale, self.images_dir)
-        self.game_over_img = hf.load_image('game_over.png', self.img_scale, self.images_dir)
-        self.idle_msg_img = hf.load_image('click_mouse.png', self.img_scale, self.images_dir, PINK)
+        self.get_ready_img = cache.load_image('get_ready.png', self.img_scale, self.images_dir)
+        self.game_over_img = cache.load_image('game_over.png', self.img_scale, self.images_dir)
+        self.idle_msg_img = cache.load_image('click_mouse.png', self.img_scale, self.images_dir, PINK)
 
         # Buttons
-        self.play_button_img = hf.load_image('play_button.png', self.img_scale, self.images_dir, PINK)
-        self.leader_button_img = hf.load_image('leaderboard_button.png', self.img_scale, self.images_dir, PINK)
+        self.play_button_img = cache.load_image('play_button.png', self.img_scale, self.images_dir, PINK)
+        self.leader_button_img = cache.load_image('leaderboard_button.png', self.img_scale, self.images_dir, PINK)
 
     def load_sound_assets(self):
         """Load the game's sound assets"""
 
-        self.sfx_bank = []
-        self.music_bank = []
+        cache = self.asset_cache
 
-        self.sfx_fall = hf.load_sound('sfx_fall_delayed.wav', self.sounds_dir, self.sfx_bank)
-        self.sfx_hit = hf.load_sound('sfx_hit.wav', self.sounds_dir, self.sfx_bank)
-        self.sfx_point = hf.load_sound('sfx_point.wav', self.sounds_dir, self.sfx_bank)
-        self.sfx_swoosh = hf.load_sound('sfx_swoosh.wav', self.sounds_dir, self.sfx_bank)
-        self.sfx_flap = hf.load_sound('sfx_flap.wav', self.sounds_dir, self.sfx_bank)
-        self.sfx_pop = hf.load_sound('sfx_pop.wav', self.sounds_dir, self.sfx_bank)
+        self.sfx_point = cache.load_sound('sfx_point.wav', self.sounds_dir, self.sfx_bank)
 
-        self.sfx_music = hf.load_sound('sfx_music.wav', self.sounds_dir, self.music_bank)
-        self.sfx_music_end = hf.load_sound('sfx_music_end.wav', self.sounds_dir, self.music_bank)
\ No newline at end of file
+        self.sfx_music = cache.load_sound('sfx_music.wav', self.sounds_dir, self.music_bank)
+        self.sfx_music_end = cache.load_sound('sfx_music_end.wav', self.sounds_dir, self.music_bank)
\ No newline at end of file
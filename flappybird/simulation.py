@@ -0,0 +1,352 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, Deque, Iterator, List, Optional, Tuple
+
+# Import standard modules
+import math
+import random
+from collections import deque
+from math import pi as PI
+
+# Import non-standard modules
+
+# Import local classes and methods
+from collision import CollisionModel
+from course import CourseGenerator
+from settings import WorldSettings
+import helper_functions as hf
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    pass
+
+
+class BirdBody():
+    """The bird's position, velocity and animation state. Contains no surfaces, masks or sounds so it can be stepped
+    without a display."""
+
+    def __init__(self, settings: WorldSettings):
+        """Initialize the bird's physics parameters"""
+
+        # Physics parameters
+        self.accel = settings.gravity
+        self.max_velocity = settings.max_velocity
+        self.jump_velocity = settings.jump_velocity
+        self.ground_elev = settings.ground_elev
+
+        # Hitbox, which scoring measures the bird by, and animation
+        self.width, self.height = settings.bird_hitbox
+        self.num_frames = settings.bird_num_frames
+        self.animation_speed = 75
+        self.idle_period = 3000
+        self.idle_amp = 50
+        self.y_0 = settings.screen_height // 2
+
+        self.init_dynamic_variables()
+
+    def init_dynamic_variables(self):
+        """Initializes the birds's dynamic variables"""
+
+        self.x = 150
+        self.y = self.y_0
+        self.velocity = 0
+        self.angle = 0
+        self.prev_x, self.prev_y, self.prev_angle = self.x, self.y, self.angle
+        self.prev_jump_elev = 0
+        self.current_frame = 0
+        self.animation_time = 0
+        self.idle_time = 0
+
+    def flap(self):
+        """Jump the bird"""
+
+        self.velocity = -self.jump_velocity
+        self.prev_jump_elev = self.y
+
+    def update(self, dt: int, state: str):
+        """Update the bird's animation frame, location and angle for the given game state"""
+
+        # Keep the previous step's position for render interpolation
+        self.prev_x, self.prev_y, self.prev_angle = self.x, self.y, self.angle
+
+        # Update the animation
+        if state != 'GAMEOVER':
+            self.animation_time += dt
+            if self.animation_time > self.animation_speed:
+                self.animation_time = 0
+                self.current_frame = (self.current_frame + 1) % self.num_frames
+
+        # At beginning of game, bird animates smoothly up and down
+        if state in ['SPLASH', 'READY']:
+            self.idle_time = (self.idle_time + dt) % self.idle_period
+            theta = self.idle_time / self.idle_period * 2 * PI
+            self.y = self.y_0 + self.idle_amp * math.sin(theta)
+            self.angle = -45 * math.cos(theta)
+
+        # During PLAY state, bird is affected by gravity and rotates based on flaps
+        elif state in ['PLAY', 'GAMEOVER']:
+
+            # Update the bird's velocity and position
+            if self.y < self.ground_elev:
+                new_velocity = self.velocity + self.accel * dt
+                self.velocity = hf.clamp(new_velocity, -self.max_velocity, self.max_velocity)
+                self.y += self.velocity * dt
+
+                # Rotate the bird based on previous jump elevation
+                self.angle = hf.translate(self.y, self.prev_jump_elev, self.prev_jump_elev + 150, 20, -90)
+
+    def get_hitbox(self) -> Tuple[float, float, float, float]:
+        """Returns the bird's axis-aligned hitbox as (left, top, right, bottom)"""
+
+        half_w, half_h = self.width / 2, self.height / 2
+        return self.x - half_w, self.y - half_h, self.x + half_w, self.y + half_h
+
+
+class PipePair():
+    """A top and bottom pipe sharing a gap. Positions are plain floats, x = center of pipe, gap_y = center of gap.
+    Pipe pairs are pooled by the simulation and recycled with spawn() rather than created for every gap."""
+
+    def __init__(self, index: int, settings: WorldSettings):
+        """Initialize an inactive pipe pair. index is the pair's slot in the simulation's pool."""
+
+        self.index = index
+        self.width = settings.pipe_width
+        self.gap_height = settings.gap_height
+        self.velocity = settings.world_velocity
+        self.spawn_x = settings.screen_width + self.width / 2
+        self.x = self.prev_x = -self.width
+        self.gap_y = settings.screen_height // 2
+        self.color = settings.pipe_color
+        self.cleared = True
+
+    def spawn(self, gap_y: float, color: int):
+        """Moves the pipe pair to the right edge of the screen with a new gap and color"""
+
+        self.x = self.prev_x = self.spawn_x
+        self.gap_y = gap_y
+        self.color = color
+        self.cleared = False
+
+    @property
+    def left(self) -> float:
+        """Left edge of both pipes"""
+        return self.x - self.width / 2
+
+    @property
+    def right(self) -> float:
+        """Right edge of both pipes"""
+        return self.x + self.width / 2
+
+    @property
+    def gap_top(self) -> float:
+        """Bottom edge of the top pipe"""
+        return self.gap_y - self.gap_height / 2
+
+    @property
+    def gap_bottom(self) -> float:
+        """Top edge of the bottom pipe"""
+        return self.gap_y + self.gap_height / 2
+
+    def update(self, dt: int):
+        """Update the pipe pair's location, keeping the previous one for render interpolation"""
+
+        self.prev_x = self.x
+        self.x -= self.velocity * dt
+
+    def is_visible(self) -> bool:
+        """Returns False once the pipe pair has scrolled off the left of the screen"""
+
+        return self.right >= 0
+
+
+class Simulation():
+    """The game world (bird, pipe course, collisions and score) without any rendering or audio. run_pygame drives one
+    of these for display; it can also be stepped headless using a WorldSettings instance."""
+
+    def __init__(self, settings: WorldSettings = None, seed: int = None):
+        """Initialize the simulation. A seed makes the pipe course reproducible."""
+
+        self.settings = settings if settings else WorldSettings()
+        self.bird = BirdBody(self.settings)
+        self.rng = random.Random(seed)
+        self.course = CourseGenerator(self.settings)
+        self.collision = CollisionModel(self.settings)
+        self.score = 0
+
+        # Each run is seeded from rng so it can be recorded and replayed. Flaps are recorded by simulation step.
+        self.seed = None
+        self.steps = 0
+        self.flap_steps: List[int] = []
+
+        # Set once the autopilot has flown any part of the run, so it isn't taken for the player's
+        self.assisted = False
+
+        # Pipe pairs are recycled from a fixed pool. Active pairs are queued in spawn order, which is also x order.
+        pool_size = math.ceil((self.settings.screen_width + self.settings.pipe_width) / self.settings.pipe_spacing) + 1
+        self.pool = [PipePair(i, self.settings) for i in range(pool_size)]
+        self.free = list(reversed(self.pool))
+        self.pipes: Deque[PipePair] = deque()
+
+        # Index into pipes of the next pair the bird has not yet cleared
+        self.next_pipe = 0
+
+    def reset(self, seed: int = None):
+        """Resets the bird, pipes and score for a new game. The rng is only reseeded if a seed is given."""
+
+        if seed is not None:
+            self.rng.seed(seed)
+        self.settings.init_world_variables()
+        self.bird.init_dynamic_variables()
+        while self.pipes:
+            self.free.append(self.pipes.pop())
+        self.next_pipe = 0
+        self.score = 0
+        self.steps = 0
+        self.flap_steps = []
+        self.assisted = False
+
+    def start(self, seed: int = None) -> PipePair:
+        """Starts the game and returns the initial pipe pair. The run's pipe course is seeded with seed, or with a
+        seed drawn from rng if none is given."""
+
+        self.seed = seed if seed is not None else self.rng.randrange(2**32)
+        self.rng.seed(self.seed)
+
+        # Record the state the run starts from so it can be replayed
+        self.start_y = self.bird.y
+        self.start_frame = self.bird.current_frame
+        self.start_animation_time = self.bird.animation_time
+        self.start_delay = self.settings.start_delay
+        self.assisted = False
+
+        self.settings.current_state = 'PLAY'
+        return self.create_new_pipes()
+
+    def flap(self):
+        """Flaps the bird if the game is in PLAY state and records the step it happened on"""
+
+        if self.settings.current_state == 'PLAY':
+            self.bird.flap()
+            self.flap_steps.append(self.steps)
+
+    def update_world(self, dt: int) -> Optional[PipePair]:
+        """Moves the pipes, recycles those off screen and spawns new ones as necessary. Returns the newly spawned pipe
+        pair, if any."""
+
+        settings = self.settings
+        new_pipe = None
+        if settings.current_state == 'PLAY':
+            self.steps += 1
+
+            if settings.start_delay < settings.max_start_delay:
+                settings.start_delay += dt
+
+            else:
+                for pipe in self.pipes:
+                    pipe.update(dt)
+                while self.pipes and not self.pipes[0].is_visible():
+                    self.free.append(self.pipes.popleft())
+                    self.next_pipe = max(self.next_pipe - 1, 0)
+
+                # Add new pipes if traveled more than pipe spacing limit
+                settings.travel_distance += settings.world_velocity * dt
+                if settings.travel_distance > settings.pipe_spacing:
+                    new_pipe = self.create_new_pipes()
+                    settings.travel_distance = 0
+
+        return new_pipe
+
+    def create_new_pipes(self) -> PipePair:
+        """Spawns a randomized pipe pair from the pool, adds it to the course and returns it. The gap is drawn from
+        those reachable from the previous pair's. The pool only grows if the pipe settings were changed after it was
+        sized."""
+
+        if not self.free:
+            self.pool.append(PipePair(len(self.pool), self.settings))
+            self.free.append(self.pool[-1])
+
+        gap_y = self.course.next_gap(self.rng, self.pipes[-1].gap_y if self.pipes else None)
+        pipe = self.free.pop()
+        pipe.spawn(gap_y, self.settings.pipe_color)
+        self.pipes.append(pipe)
+        return pipe
+
+    def check_collisions(self) -> bool:
+        """Returns True if the bird's rotated sprite overlaps a pipe, or its rect the ground or the top of the screen,
+        as tested by the collision model"""
+
+        bird, collision = self.bird, self.collision
+        angle_index = collision.get_angle_index(bird.angle)
+        left, top, width, height = collision.get_bird_rect(bird.x, bird.y, bird.current_frame, angle_index)
+        if collision.hits_bounds(top, height):
+            return True
+
+        for pipe in self.get_overlapping_pipes(left, left + width):
+            pipe_left, pipe_top = collision.get_pipe_rect(pipe.x, pipe.gap_y)
+            if collision.hits_pipe(bird.current_frame, angle_index, left, top, height, pipe_left, pipe_top):
+                return True
+
+        return False
+
+    def get_overlapping_pipes(self, left: float, right: float) -> Iterator[PipePair]:
+        """Yields the pipe pairs that overlap the horizontal span [left, right]. Only the pairs around the next
+        uncleared pair are visited, as the queue is in x order."""
+
+        i = max(self.next_pipe - 1, 0)
+        while i < len(self.pipes) and self.pipes[i].left < right:
+            if self.pipes[i].right > left:
+                yield self.pipes[i]
+            i += 1
+
+    def check_score(self) -> int:
+        """Marks pipe pairs the bird has passed as cleared by advancing the next pipe index. Returns the number of
+        newly cleared pairs."""
+
+        left = self.bird.get_hitbox()[0]
+        cleared = 0
+        while self.next_pipe < len(self.pipes) and left > self.pipes[self.next_pipe].right:
+            self.pipes[self.next_pipe].cleared = True
+            self.next_pipe += 1
+            cleared += 1
+
+        self.score += cleared
+        return cleared
+
+    def observe(self) -> Tuple[float, float, float, float]:
+        """Returns the bird's y and velocity, the horizontal distance to the next uncleared pipe pair and that pair's
+        gap y. Before any pipe is on screen the distance to the spawn point and the screen center are used."""
+
+        if self.next_pipe < len(self.pipes):
+            pipe = self.pipes[self.next_pipe]
+            return self.bird.y, self.bird.velocity, pipe.x - self.bird.x, pipe.gap_y
+
+        spawn_x = self.settings.screen_width + self.settings.pipe_width / 2
+        return self.bird.y, self.bird.velocity, spawn_x - self.bird.x, self.settings.screen_height // 2
+
+    def game_over(self):
+        """Stops the bird and ends the game"""
+
+        # The pipes freeze in place, so they no longer interpolate from their previous positions
+        for pipe in self.pipes:
+            pipe.prev_x = pipe.x
+
+        self.bird.velocity = 0
+        self.settings.current_state = 'GAMEOVER'
+
+    def step(self, dt: int, flap: bool = False) -> bool:
+        """Advances the whole world by dt milliseconds, optionally flapping first. Returns True once the game is
+        over."""
+
+        if flap:
+            self.flap()
+
+        self.update_world(dt)
+        self.bird.update(dt, self.settings.current_state)
+
+        if self.settings.current_state == 'PLAY':
+            if self.check_collisions():
+                self.game_over()
+            else:
+                self.check_score()
+
+        return self.settings.current_state == 'GAMEOVER'
@@ -9,7 +9,7 @@ import pygame as pg
 from pygame.sprite import Sprite
 
 # Import local classes and methods
-import helper_functions as hf
+from tween import Tweener
 
 # Import local class and methods that are only used for type hinting
 if TYPE_CHECKING:
@@ -29,41 +29,32 @@ class Splash(Sprite):
         self.image = image
         self.rect = self.image.get_rect()
         self.rect.center = center_loc
-        self.fade_speed = 10
+        self.fade_time = 210
         self.delay = [2000, 2000, 0]  # before fade-in, after fade-in, after fade-out
+        self.duration = sum(self.delay) + 2 * self.fade_time
+        self.tweens = Tweener()
 
         self.init_dynamic_variables()
 
     def init_dynamic_variables(self):
         """Initializes the splash screen's dynamic variables"""
 
-        self.fade_in = False
-        self.fade_out = False
-        self.animation_time = [0, 0, 0]
+        self.animation_time = 0
         self.animating = True
         self.image.set_alpha(0)
+        self.tweens.fade(self.image, 255, self.fade_time, delay=self.delay[0], on_done=self.fade_out)
+
+    def fade_out(self):
+        """Starts fading the splash screen back out once it has been displayed"""
+
+        self.tweens.fade(self.image, 0, self.fade_time, delay=self.delay[1])
 
     def update(self, dt: int):
         """Update the splash screen animation"""
 
-        # Delay before fade-in
-        if self.animation_time[0] < self.delay[0]:
-            self.animation_time[0] += dt
-        # Fade-in
-        elif not self.fade_in:
-            self.fade_in = hf.fade_surface(self.image, 255, self.fade_speed)
-        # Display splash / delay before fade out
-        elif self.animation_time[1] < self.delay[1]:
-            self.animation_time[1] += dt
-        # Fade-out
-        elif not self.fade_out:
-            self.fade_out = hf.fade_surface(self.image, 0, -self.fade_speed)
-        # Delay after fade out
-        elif self.animation_time[2] < self.delay[2]:
-            self.animation_time[2] += dt
-        # Done
-        else:
-            self.animating = False
+        self.tweens.update(dt)
+        self.animation_time += dt
+        self.animating = self.animation_time < self.duration or self.tweens.is_active(self.image)
 
     def blitme(self):
         """Draw the splash screen to the screen"""
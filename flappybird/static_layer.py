@@ -0,0 +1,48 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, Hashable
+
+# Import standard modules
+
+# Import non-standard modules
+import pygame as pg
+
+# Import local classes and methods
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    from renderer import Renderer
+
+
+class StaticLayer():
+    """A snapshot of the screen, used to draw content that isn't moving with a single opaque blit. The snapshot is
+    tagged with a key describing what it shows and is only valid while the key stays the same."""
+
+    def __init__(self, screen: Renderer):
+        """Initialize an empty layer the size of the screen"""
+
+        self.screen = screen
+        self.image = pg.Surface(screen.get_size()).convert()
+        self.rect = self.image.get_rect()
+        self.key = None
+
+    def is_valid(self, key: Hashable) -> bool:
+        """Returns True if the layer holds a snapshot taken with the given key"""
+
+        return self.key is not None and self.key == key
+
+    def capture(self, key: Hashable):
+        """Snapshots what has been drawn to the screen so far this frame"""
+
+        self.image.blit(pg.display.get_surface(), (0, 0))
+        self.key = key
+
+    def invalidate(self):
+        """Discards the snapshot"""
+
+        self.key = None
+
+    def blitme(self):
+        """Draws the snapshot to the screen"""
+
+        self.screen.blit(self.image, self.rect)
@@ -1,15 +1,18 @@
 # Allow for type hinting while preventing circular imports
 from __future__ import annotations
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING
 
 # Import standard modules
+import sqlite3
 
 # Import non-standard modules
 import pygame as pg
 from pygame.sprite import Sprite
 
 # Import local classes and methods
-import helper_functions as hf
+from digit_renderer import DigitRenderer
+from leaderboard import Leaderboard
+from replay import ReplayWriter
 
 # Import local class and methods that are only used for type hinting
 if TYPE_CHECKING:
@@ -24,11 +27,18 @@ class Stats(Sprite):
         
         super(Stats, self).__init__()
         self.screen = screen
-        self.pipes_cleared = pg.sprite.Group()
 
-        # Images
-        self.big_nums_imgs = settings.big_nums_imgs
-        self.high_score = 0
+        # Images. Scores are drawn from pre-composed surfaces, one per value.
+        self.big_digits = DigitRenderer(settings.big_nums_imgs)
+        self.small_digits = DigitRenderer(settings.small_nums_imgs)
+
+        # Every finished run is recorded to the leaderboard, which the high score carries over from
+        self.player_name = settings.player_name
+        self.leaderboard = Leaderboard(settings.leaderboard_path) if settings.leaderboard_path else None
+        self.high_score = self.leaderboard.get_high_score() if self.leaderboard else 0
+
+        # The player's runs are saved as replays, written out on a worker thread
+        self.replay_writer = ReplayWriter(settings.replay_dir) if settings.replay_dir else None
         self.x_current_score = self.screen.get_width() // 2
         self.y_current_score = 100
 
@@ -40,17 +50,16 @@ class Stats(Sprite):
         self.medal_rect = self.medal_imgs[0].get_rect()
         self.medal_rect.topleft = 39, 63
 
-        self.small_nums_imgs = settings.small_nums_imgs
-        self.final_score_rect = self.small_nums_imgs[0].get_rect()
-        self.final_score_rect.topright = 309, 51
-        self.high_score_rect = self.small_nums_imgs[0].get_rect()
-        self.high_score_rect.topright = 309, 114
+        self.final_score_loc = 309, 51  # top right
+        self.high_score_loc = 309, 114
 
         self.new_hs_img = settings.new_high_score_img
         self.new_hs_img_rect = self.new_hs_img.get_rect()
         self.new_hs_img_rect.topleft = 201, 87
 
         self.fade_in_time = 500
+        self.slide_distance = 20  # the plaque drops into place as it fades in
+        self.tweens = settings.tweens
 
         # Sound effects
         self.sfx_point = settings.sfx_point
@@ -62,22 +71,27 @@ class Stats(Sprite):
         
         self.score = 0
         self.new_high_score = False
-        self.plaque = self.plaque_orig.copy()
-        self.blit_sequence = self.create_blit_sequence(self.score, self.x_current_score, self.y_current_score,
-                                                       self.big_nums_imgs, 'center')
+        self.prep_current_score()
         self.medal = None
-        self.current_time = 0
         self.animating = False
 
+    def prep_current_score(self):
+        """Fetches the current score's image and places it at the top of the screen"""
+
+        self.score_img = self.big_digits.render(self.score)
+        self.score_rect = self.big_digits.get_rect(self.score_img, self.x_current_score, self.y_current_score, 'center')
+
     def blit_current_score(self):
         """Draws the current score at the top of the screen"""
         
-        self.screen.blits(self.blit_sequence)
+        self.screen.blit(self.score_img, self.score_rect)
 
-    def prep_score_plaque(self):
-        """Preps the score plaque for display at the end of the game"""
+    def prep_score_plaque(self, record: bool = True):
+        """Preps the score plaque for display at the end of the game. Runs that aren't recorded (those the autopilot
+        played) don't count towards the high score or the leaderboard."""
 
         self.animating = True
+        self.plaque = self.plaque_orig.copy()
 
         # Award the medal
         self.award_medal()
@@ -85,81 +99,50 @@ class Stats(Sprite):
             self.plaque.blit(self.medal, self.medal_rect)
 
         # Check high score
-        self.check_high_score()
+        if record:
+            self.check_high_score()
         if self.new_high_score:
             self.plaque.blit(self.new_hs_img, self.new_hs_img_rect)
+        if self.leaderboard and record:
+            self.record_run()
 
         # Blit the scores to the plaque
-        final_score = self.create_blit_sequence(self.score, 309, 51, self.small_nums_imgs, 'right')
-        high_score = self.create_blit_sequence(self.high_score, 309, 114, self.small_nums_imgs, 'right')
-        self.plaque.blits(final_score)
-        self.plaque.blits(high_score)
-
-    def create_blit_sequence(self, value: int, x: int, y: int, imgs: List[pg.Surface], justify: str = 'left'):
-        """Creates and returns a blit sequence for score digits for the input score 'value' using the 
-        digit sprites stored in an 'imgs' list. By default, the top-left of the sequence will be located at x, y. Justify may optionally be set to 'center' or 'right'."""
-
-        blit_sequence = []
-        num_digits = len(str(value))
-        digit_width = imgs[0].get_width()
-        sequence_width = num_digits * digit_width
-
-        # Offset text by justification
-        if justify == 'left':
-            x_off = 0
-        elif justify == 'center':
-            x_off = sequence_width // 2
-        elif justify == 'right':
-            x_off = sequence_width
-        else:
-            print("Invalid justification input (left, center, or right).")
-            return False
-
-        # Populate the blit sequence
-        prev_rect = pg.Rect(0, 0, 0, 0)
-        for digit in str(value):
-            img: pg.Surface = imgs[int(digit)]
-            img_rect = img.get_rect()
-
-            if len(blit_sequence) == 0:
-                img_rect.topleft = x - x_off, y
-            else:
-                img_rect.topleft = prev_rect.topright
-
-            blit_sequence.append([img, img_rect])
-            prev_rect = img_rect
-
-        return blit_sequence
-
-    def blit_score_plaque(self, dt: int, surface: pg.Surface):
-        """Draws the end game score plaque"""
+        self.small_digits.blit(self.plaque, self.score, *self.final_score_loc, 'right')
+        self.small_digits.blit(self.plaque, self.high_score, *self.high_score_loc, 'right')
+
+        # Drop the plaque into place while fading it in
+        self.plaque.set_alpha(0)
+        self.plaque_rect.centery = self.screen.get_height() // 2 - self.slide_distance
+        self.tweens.fade(self.plaque, 255, self.fade_in_time)
+        self.tweens.animate(self.plaque_rect, 'centery', self.screen.get_height() // 2, self.fade_in_time,
+                            on_done=self.stop_animating)
 
-        if self.current_time < self.fade_in_time:
-            self.current_time += dt
-            y_off = ((self.fade_in_time - self.current_time) / self.fade_in_time) * 20
-            self.plaque_rect.centery = self.screen.get_height() // 2 - y_off
-            alpha = hf.translate(self.current_time, 0, self.fade_in_time, 0, 255)
-            self.plaque.set_alpha(alpha)
-        else:
-            self.animating = False
+    def stop_animating(self):
+        """Marks the score plaque as done animating"""
+
+        self.animating = False
+
+    def record_run(self):
+        """Records the run to the leaderboard. If the leaderboard can't be written to (e.g. the database is locked or
+        read only, or the disk is full), the game carries on without it and the high score is only kept in memory."""
+
+        try:
+            self.leaderboard.record(self.player_name, self.score)
+        except (sqlite3.Error, OSError) as error:
+            print(f'Leaderboard disabled, runs will not be saved: {error!r}')
+            self.leaderboard = None
+
+    def blit_score_plaque(self, surface: pg.Surface):
+        """Draws the end game score plaque"""
 
         surface.blit(self.plaque, self.plaque_rect)
 
     def increase_score(self):
-        """Increases the current score and updates the blit sequence"""
+        """Increases the current score and updates its image"""
 
         self.score += 1
         self.sfx_point.play()
-
-        # Check if a new digit needs to be added to the blit sequence
-        if len(str(self.score)) > len(self.blit_sequence):
-            self.blit_sequence = self.create_blit_sequence(self.score, self.x_current_score, self.y_current_score,
-                                                           self.big_nums_imgs, 'center')
-        # Update the blit sequence
-        else:
-            score = str(self.score)
-            for i in range(len(score)):
-                self.blit_sequence[i][0] = self.big_nums_imgs[int(score[i])]
+        self.prep_current_score()
 
     def check_high_score(self):
         """Checks if the current score is the high score. Updates and returns
@@ -0,0 +1,231 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+# Import standard modules
+import argparse
+import csv
+import itertools
+import time
+from multiprocessing import Pool, cpu_count
+
+# Import non-standard modules
+import numpy as np
+
+# Import local classes and methods
+from settings import WorldSettings
+from batch import BatchSimulation
+from trainer import act, load_checkpoint
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    pass
+
+# Physics settings the sweep can vary. Those left out keep their defaults, or follow the ones that are swept.
+SWEEP_SETTINGS = ('gravity', 'world_velocity', 'gap_height', 'pipe_spacing', 'jump_velocity')
+
+# Pipes cleared at which the survival curve is reported
+MILESTONES = (1, 5, 10, 25, 50, 100)
+
+# Player of the current process, set by init_worker in each pool worker
+worker: dict = {}
+
+
+class HumanModel():
+    """A noisy stand-in for a human player, deciding for a whole batch of games at once. Each player sees the game
+    reaction_time late and judges where the bird has fallen to since. They tap once it looks to have dropped below
+    their aim point, and don't tap again within tap_interval or before they've seen their last tap land. The aim
+    point is the height that makes the bird peak as far above the gap's center, thrown off by aim_sigma pixels of
+    noise per tap. miss_rate of taps are missed. With the default arguments and physics it clears a median of 7
+    pipes, and one game in ten gets past 23."""
+
+    def __init__(self, n_games: int, settings: WorldSettings, rng: np.random.Generator, reaction_time: float = 180,
+                 aim_sigma: float = 12, tap_interval: float = 100, miss_rate: float = 0.01):
+        """Initialize the players of n_games games"""
+
+        steps_per_ms = settings.physics_rate / 1000
+        self.delay = max(1, round(reaction_time * steps_per_ms))
+        self.reaction_time = reaction_time
+        self.tap_steps = round(max(tap_interval, reaction_time) * steps_per_ms)
+        self.aim_sigma = aim_sigma
+        self.miss_rate = miss_rate
+        self.rng = rng
+        self.gravity = settings.gravity
+        self.max_velocity = settings.max_velocity
+
+        # A flap lifts the bird by velocity^2 / 2g before it falls again
+        velocity = min(settings.jump_velocity, settings.max_velocity)
+        self.aim = velocity ** 2 / (2 * settings.gravity) / 2
+
+        # Observations the players haven't reacted to yet, oldest first from index
+        self.history = None
+        self.index = 0
+        self.cooldown = np.zeros(n_games, dtype=np.int64)
+        self.offset = rng.normal(0, aim_sigma, n_games)
+
+    def __call__(self, observations: np.ndarray) -> np.ndarray:
+        """Returns the flap decisions for an (n_games, 4) array of observations such as BatchSimulation.observe
+        returns"""
+
+        if self.history is None:
+            self.history = np.repeat(observations[None], self.delay, axis=0)
+        y, velocity, _, gap_y = self.history[self.index].T.copy()
+        self.history[self.index] = observations
+        self.index = (self.index + 1) % self.delay
+
+        # Where the bird would be now if it kept falling, as a player judges it
+        velocity_now = np.minimum(velocity + self.gravity * self.reaction_time, self.max_velocity)
+        predicted_y = y + (velocity + velocity_now) / 2 * self.reaction_time
+        flap = (predicted_y > gap_y + self.aim + self.offset) & (self.cooldown <= 0)
+        flap &= self.rng.random(len(flap)) >= self.miss_rate
+
+        self.cooldown -= 1
+        self.cooldown[flap] = self.tap_steps
+        self.offset[flap] = self.rng.normal(0, self.aim_sigma, flap.sum())
+        return flap
+
+
+def get_configs(values: Dict[str, List[float]]) -> List[dict]:
+    """Returns the physics overrides of every combination of the swept values, given as lists per setting"""
+
+    names = [name for name in SWEEP_SETTINGS if values.get(name)]
+    return [dict(zip(names, combination)) for combination in itertools.product(*(values[name] for name in names))]
+
+
+def init_worker(player: dict):
+    """Pool initializer, sets up the player once per worker process. player holds the HumanModel's keyword
+    arguments, or the params and hidden units of a trained bot."""
+
+    worker['player'] = player
+
+
+def play_chunk(args: Tuple[dict, int, int, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Plays a chunk of games with the given physics overrides, number of games, seed and step limit in a worker
+    process. Returns each game's score and whether it was still going when the step limit was reached."""
+
+    physics, n_games, seed, max_steps = args
+    settings = WorldSettings(physics=physics)
+    rng = np.random.default_rng(seed)
+    batch = BatchSimulation(n_games, settings, seed=seed, auto_reset=False)
+
+    player = worker['player']
+    if 'params' in player:
+        def decide(observations: np.ndarray) -> np.ndarray:
+            return act(player['params'][None], player['hidden'], observations[None], settings)[0]
+    else:
+        decide = HumanModel(n_games, settings, rng, **player)
+
+    step_dt = 1000 / settings.physics_rate
+    for _ in range(max_steps):
+        batch.step(decide(batch.observe()), step_dt)
+        if not batch.alive.any():
+            break
+
+    return np.where(batch.alive, batch.score, batch.final_score), batch.alive.copy()
+
+
+def summarize(physics: dict, scores: np.ndarray, censored: np.ndarray, milestones: Tuple[int, ...]) -> dict:
+    """Returns the score distribution and survival curve of one configuration's games. survival_k is the fraction of
+    games that cleared at least k pipes."""
+
+    result = dict(physics)
+    result.update({'games': len(scores), 'mean': scores.mean(), 'p10': np.percentile(scores, 10),
+                   'p50': np.percentile(scores, 50), 'p90': np.percentile(scores, 90), 'max': scores.max(),
+                   'censored': censored.mean()})
+    for milestone in milestones:
+        result[f'survival_{milestone}'] = (scores >= milestone).mean()
+    return result
+
+
+def sweep(values: Dict[str, List[float]], n_games: int = 2000, max_steps: int = 28800, chunk_size: int = 500,
+          processes: int = None, player: dict = None, seed: int = 0,
+          milestones: Tuple[int, ...] = MILESTONES) -> List[dict]:
+    """Plays n_games games of every combination of the swept values across a process pool (one process per core by
+    default), in chunks of up to chunk_size games. Games last at most max_steps simulation steps. Every
+    configuration plays the same chunk seeds, so differences between them come from the settings rather than luck.
+    Returns one summary per configuration."""
+
+    configs = get_configs(values)
+    player = player if player else {}
+    chunk_sizes = [len(chunk) for chunk in np.array_split(np.arange(n_games), -(-n_games // chunk_size))]
+    tasks = [(physics, size, seed + i, max_steps) for physics in configs for i, size in enumerate(chunk_sizes)]
+
+    # Workers are closed rather than terminated, as SDL replaces their SIGTERM handler once initialized
+    pool = Pool(processes if processes else cpu_count(), initializer=init_worker, initargs=(player,))
+    try:
+        chunks = pool.map(play_chunk, tasks, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+    results = []
+    for i, physics in enumerate(configs):
+        config_chunks = chunks[i * len(chunk_sizes):(i + 1) * len(chunk_sizes)]
+        scores = np.concatenate([scores for scores, _ in config_chunks])
+        censored = np.concatenate([censored for _, censored in config_chunks])
+        results.append(summarize(physics, scores, censored, milestones))
+    return results
+
+
+def print_table(results: List[dict]):
+    """Prints the summaries as a table, one configuration per row"""
+
+    if not results:
+        return
+
+    columns = list(results[0])
+    rows = [[f'{value:.4g}' if isinstance(value, float) else str(value) for value in result.values()]
+            for result in results]
+    widths = [max(len(column), *(len(row[i]) for row in rows)) for i, column in enumerate(columns)]
+    print('  '.join(column.rjust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print('  '.join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+def save_csv(path: str, results: List[dict]):
+    """Saves the summaries to a CSV file, one configuration per row"""
+
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(results[0]))
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main():
+    """Sweeps the physics settings and prints how each configuration plays"""
+
+    parser = argparse.ArgumentParser(description='Sweep Flappy Bird physics settings over many headless games')
+    for name in SWEEP_SETTINGS:
+        parser.add_argument('--' + name.replace('_', '-'), type=float, nargs='+', default=None, metavar='VALUE',
+                            help='values to sweep, the default setting if not given')
+    parser.add_argument('--games', type=int, default=2000, help='games played per configuration')
+    parser.add_argument('--max-steps', type=int, default=28800, help='simulation steps a game may last')
+    parser.add_argument('--chunk-size', type=int, default=500, help='games a worker plays at once')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--bot', default=None, metavar='CHECKPOINT',
+                        help="play a trained bot's best policy instead of the human model")
+    parser.add_argument('--reaction-time', type=float, default=180, help="the human model's reaction time in ms")
+    parser.add_argument('--aim-sigma', type=float, default=12, help="the human model's aim noise in pixels")
+    parser.add_argument('--miss-rate', type=float, default=0.01, help='fraction of taps the human model misses')
+    parser.add_argument('--csv', default=None, metavar='PATH', help='also save the table to a CSV file')
+    args = parser.parse_args()
+
+    if args.bot:
+        checkpoint = load_checkpoint(args.bot)
+        player = {'params': checkpoint['best_params'], 'hidden': checkpoint['hidden']}
+    else:
+        player = {'reaction_time': args.reaction_time, 'aim_sigma': args.aim_sigma, 'miss_rate': args.miss_rate}
+
+    values = {name: getattr(args, name) for name in SWEEP_SETTINGS}
+    start_time = time.perf_counter()
+    results = sweep(values, args.games, args.max_steps, args.chunk_size, args.processes, player, args.seed)
+    elapsed = time.perf_counter() - start_time
+    print_table(results)
+    print(f'{len(results)} configurations, {len(results) * args.games} games in {elapsed:.1f}s')
+    if args.csv:
+        save_csv(args.csv, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, List, Tuple
+
+# Import standard modules
+import argparse
+import json
+import math
+import os
+import time
+from multiprocessing import Pool, cpu_count
+
+# Import non-standard modules
+import numpy as np
+import pygame as pg
+
+# Import local classes and methods
+from settings import WorldSettings
+from batch import BatchSimulation, make_courses
+from environment import FlappyEnv
+import game_functions as gf
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    pass
+
+# Policy inputs: the gap's height above the bird, the bird's velocity, the distance to the next pipe pair and the
+# bird's height, all scaled to around -1..1, plus a bias
+N_FEATURES = 5
+
+# Training setup of the current process, set by init_worker in each pool worker
+worker: dict = {}
+
+
+def get_n_params(hidden: int) -> int:
+    """Returns the number of weights in a policy with the given number of hidden units (0 for a linear policy)"""
+
+    return N_FEATURES * hidden + hidden if hidden else N_FEATURES
+
+
+def get_features(observations: np.ndarray, settings: WorldSettings) -> np.ndarray:
+    """Turns observations of bird y, velocity, distance to the next pipe pair and its gap y (the last axis) into
+    scaled policy inputs"""
+
+    y, velocity, dx, gap_y = np.moveaxis(observations, -1, 0)
+    return np.stack([(gap_y - y) / settings.screen_height, velocity / settings.max_velocity,
+                     dx / settings.screen_width, y / settings.screen_height, np.ones_like(y)], axis=-1)
+
+
+def act(params: np.ndarray, hidden: int, observations: np.ndarray, settings: WorldSettings) -> np.ndarray:
+    """Returns the flap decisions of k policies, given as a (k, n_params) array, for a (k, n, 4) array of observations
+    (n games each). A policy flaps when its output is positive. With hidden units, the output is a tanh hidden layer
+    followed by a linear output unit, otherwise it's linear in the inputs."""
+
+    features = get_features(observations, settings)
+    if hidden:
+        weights_in = params[:, :N_FEATURES * hidden].reshape(-1, N_FEATURES, hidden)
+        weights_out = params[:, N_FEATURES * hidden:, None]
+        output = np.tanh(features @ weights_in) @ weights_out
+    else:
+        output = features @ params[:, :, None]
+    return output[..., 0] > 0
+
+
+class Bot():
+    """A trained policy that plays a single game, e.g. through FlappyEnv"""
+
+    def __init__(self, params: np.ndarray, hidden: int, settings: WorldSettings):
+        """Initialize the bot with a policy's weights"""
+
+        self.params = params[None]
+        self.hidden = hidden
+        self.settings = settings
+
+    def __call__(self, observation) -> bool:
+        """Returns True if the bot flaps, given the observation of a single game"""
+
+        observations = np.asarray(observation, dtype=float)[None, None]
+        return bool(act(self.params, self.hidden, observations, self.settings)[0, 0])
+
+
+def evaluate(population: np.ndarray, hidden: int, seeds: List[int], max_steps: int,
+             settings: WorldSettings) -> np.ndarray:
+    """Plays every policy of a (k, n_params) population on the course of every seed, all in one batch, for up to
+    max_steps simulation steps. Returns each policy's fitness: pipes cleared plus the fraction of max_steps survived,
+    averaged over the courses."""
+
+    k, n = len(population), len(seeds)
+
+    # Enough pipes for a bird that survives every step, so no course repeats
+    step_dt = 1000 / settings.physics_rate
+    n_pipes = math.ceil(settings.world_velocity * step_dt * max_steps / settings.pipe_spacing) + 2
+    courses = np.tile(make_courses(seeds, n_pipes, settings), (k, 1))
+
+    batch = BatchSimulation(k * n, settings, auto_reset=False, courses=courses)
+    for _ in range(max_steps):
+        flap = act(population, hidden, batch.observe().reshape(k, n, 4), settings)
+        batch.step(flap.ravel(), step_dt)
+        if not batch.alive.any():
+            break
+
+    score = np.where(batch.alive, batch.score, batch.final_score)
+    return (score + batch.steps / max_steps).reshape(k, n).mean(axis=1)
+
+
+def init_worker(physics: dict, hidden: int, max_steps: int):
+    """Pool initializer, sets up the world settings and training setup once per worker process"""
+
+    worker['settings'] = WorldSettings(physics=physics)
+    worker['hidden'] = hidden
+    worker['max_steps'] = max_steps
+
+
+def evaluate_chunk(args: Tuple[np.ndarray, List[int]]) -> np.ndarray:
+    """Evaluates a chunk of the population on the given course seeds in a worker process"""
+
+    population, seeds = args
+    return evaluate(population, worker['hidden'], seeds, worker['max_steps'], worker['settings'])
+
+
+def next_generation(population: np.ndarray, fitness: np.ndarray, rng: np.random.Generator, elite_frac: float,
+                    sigma: float) -> np.ndarray:
+    """Breeds the next generation. The fittest elite_frac of the population carry over unchanged and the rest are
+    replaced by mutated copies of them, with gaussian noise of standard deviation sigma added to every weight."""
+
+    n_elite = max(1, int(len(population) * elite_frac))
+    elites = population[np.argsort(fitness)[::-1][:n_elite]]
+    parents = elites[rng.integers(n_elite, size=len(population) - n_elite)]
+    children = parents + rng.normal(0, sigma, parents.shape)
+    return np.concatenate([elites, children])
+
+
+def save_checkpoint(path: str, generation: int, population: np.ndarray, best_params: np.ndarray, best_fitness: float,
+                    hidden: int, physics: dict, rng: np.random.Generator):
+    """Saves the training state to an .npz file, written to a temporary file first so a crash can't corrupt it"""
+
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + '.tmp.npz'
+    np.savez(temp_path, generation=generation, population=population, best_params=best_params,
+             best_fitness=best_fitness, hidden=hidden, physics=json.dumps(physics),
+             rng_state=json.dumps(rng.bit_generator.state))
+    os.replace(temp_path, path)
+
+
+def load_checkpoint(path: str) -> dict:
+    """Loads a checkpoint saved by save_checkpoint"""
+
+    with np.load(path) as data:
+        checkpoint = {key: data[key] for key in data.files}
+    checkpoint['generation'] = int(checkpoint['generation'])
+    checkpoint['best_fitness'] = float(checkpoint['best_fitness'])
+    checkpoint['hidden'] = int(checkpoint['hidden'])
+    checkpoint['physics'] = json.loads(str(checkpoint['physics']))
+    checkpoint['rng_state'] = json.loads(str(checkpoint['rng_state']))
+    return checkpoint
+
+
+def train(generations: int, population_size: int = 64, hidden: int = 4, n_courses: int = 16, max_steps: int = 14400,
+          sigma: float = 0.3, elite_frac: float = 0.2, processes: int = None, checkpoint_path: str = None,
+          checkpoint_every: int = 10, resume: bool = False, seed: int = None, physics: dict = None) -> np.ndarray:
+    """Evolves a population of policies for a number of generations, evaluating each generation on fresh course
+    seeds across a process pool (one process per core by default). The population is checkpointed every
+    checkpoint_every generations and at the end, and training picks up from the checkpoint if resume is set.
+    Returns the weights of the best policy found."""
+
+    settings = WorldSettings(physics=physics)
+    rng = np.random.default_rng(seed)
+    generation = 0
+    best_params, best_fitness = None, -np.inf
+    population = rng.normal(0, 1, (population_size, get_n_params(hidden)))
+
+    if resume and checkpoint_path and os.path.exists(checkpoint_path):
+        checkpoint = load_checkpoint(checkpoint_path)
+        generation = checkpoint['generation']
+        population = checkpoint['population']
+        best_params, best_fitness = checkpoint['best_params'], checkpoint['best_fitness']
+        hidden = checkpoint['hidden']
+        settings = WorldSettings(physics=checkpoint['physics'])
+        rng.bit_generator.state = checkpoint['rng_state']
+        print(f'Resumed from generation {generation}, best fitness {best_fitness:.2f}')
+
+    # Several chunks per worker even out chunks that finish early, as games end at different times
+    processes = processes if processes else cpu_count()
+    n_chunks = min(len(population), processes * 4)
+
+    # Workers are closed rather than terminated, as SDL replaces their SIGTERM handler once initialized
+    pool = Pool(processes, initializer=init_worker, initargs=(settings.get_physics(), hidden, max_steps))
+    start_time = time.perf_counter()
+    start_generation = generation
+    try:
+        while generation < generations:
+            seeds = rng.integers(2**32, size=n_courses).tolist()
+            chunks = np.array_split(population, n_chunks)
+            fitness = np.concatenate(pool.map(evaluate_chunk, [(chunk, seeds) for chunk in chunks]))
+            generation += 1
+
+            best = fitness.argmax()
+            if fitness[best] > best_fitness:
+                best_params, best_fitness = population[best].copy(), float(fitness[best])
+
+            elapsed = time.perf_counter() - start_time
+            rate = (generation - start_generation) / elapsed
+            print(f'Generation {generation}: best {fitness[best]:.2f}, mean {fitness.mean():.2f}, '
+                  f'{rate:.2f} generations/s, {rate * len(population) * n_courses:.0f} games/s')
+
+            population = next_generation(population, fitness, rng, elite_frac, sigma)
+            if checkpoint_path and (generation % checkpoint_every == 0 or generation == generations):
+                save_checkpoint(checkpoint_path, generation, population, best_params, best_fitness, hidden,
+                                settings.get_physics(), rng)
+    finally:
+        pool.close()
+        pool.join()
+
+    return best_params
+
+
+def play(checkpoint_path: str, seeds: List[int], realtime: bool = False) -> List[int]:
+    """Plays the best policy of a checkpoint through the full game on the course of each seed, drawn in real time
+    unless headless. Returns the scores."""
+
+    checkpoint = load_checkpoint(checkpoint_path)
+    env = FlappyEnv(headless=not realtime, physics=checkpoint['physics'])
+    bot = Bot(checkpoint['best_params'], checkpoint['hidden'], env.settings)
+
+    fps = 120.0
+    fps_clock = pg.time.Clock()
+    scores = []
+    for seed in seeds:
+        observation = env.reset(seed)
+        accumulator = 0
+        done = False
+        while not done:
+            if realtime:
+                accumulator += min(fps_clock.tick(fps), env.settings.max_frame_time)
+                while accumulator >= env.dt and not done:
+                    observation, _, done, _ = env.step(bot(observation))
+                    accumulator -= env.dt
+
+                gf.interpolate(env.bird, env.pipes, accumulator / env.dt)
+                env.render()
+
+            else:
+                observation, _, done, _ = env.step(bot(observation))
+
+        scores.append(env.stats.score)
+    env.close()
+    return scores
+
+
+def main():
+    """Trains a bot, or plays a trained one"""
+
+    parser = argparse.ArgumentParser(description='Evolve Flappy Bird playing bots on the headless simulation')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    train_parser = subparsers.add_parser('train', help='evolve a population of policies across a process pool')
+    train_parser.add_argument('--generations', type=int, default=100)
+    train_parser.add_argument('--population', type=int, default=64)
+    train_parser.add_argument('--hidden', type=int, default=4, help='hidden units, 0 for a linear policy')
+    train_parser.add_argument('--courses', type=int, default=16, help='seeded courses each policy plays per generation')
+    train_parser.add_argument('--max-steps', type=int, default=14400, help='simulation steps a game may last')
+    train_parser.add_argument('--sigma', type=float, default=0.3, help='standard deviation of mutations')
+    train_parser.add_argument('--elite', type=float, default=0.2, help='fraction of the population kept each generation')
+    train_parser.add_argument('--processes', type=int, default=None)
+    train_parser.add_argument('--checkpoint', default='checkpoints/bot.npz', metavar='PATH')
+    train_parser.add_argument('--checkpoint-every', type=int, default=10, metavar='N')
+    train_parser.add_argument('--resume', action='store_true', help='continue from the checkpoint if there is one')
+    train_parser.add_argument('--seed', type=int, default=None)
+    play_parser = subparsers.add_parser('play', help="play a checkpoint's best policy, drawn unless --headless")
+    play_parser.add_argument('checkpoint')
+    play_parser.add_argument('--seeds', type=int, nargs='+', default=[0])
+    play_parser.add_argument('--headless', action='store_true')
+    args = parser.parse_args()
+
+    if args.command == 'train':
+        train(args.generations, args.population, args.hidden, args.courses, args.max_steps, args.sigma, args.elite,
+              args.processes, args.checkpoint, args.checkpoint_every, args.resume, args.seed)
+
+    elif args.command == 'play':
+        scores = play(args.checkpoint, args.seeds, realtime=not args.headless)
+        for seed, score in zip(args.seeds, scores):
+            print(f'Seed {seed}: {score}')
+
+
+if __name__ == '__main__':
+    main()
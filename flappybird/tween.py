@@ -0,0 +1,138 @@
+# Allow for type hinting while preventing circular imports
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable, Dict, Hashable
+
+# Import standard modules
+
+# Import non-standard modules
+import pygame as pg
+
+# Import local classes and methods
+import helper_functions as hf
+
+# Import local class and methods that are only used for type hinting
+if TYPE_CHECKING:
+    pass
+
+
+def linear(t: float) -> float:
+    """Constant speed"""
+
+    return t
+
+
+def ease_in(t: float) -> float:
+    """Starts slow and speeds up (quadratic)"""
+
+    return t * t
+
+
+def ease_out(t: float) -> float:
+    """Starts fast and slows down (quadratic)"""
+
+    return t * (2 - t)
+
+
+def ease_in_out(t: float) -> float:
+    """Speeds up to the halfway point and slows down after (quadratic)"""
+
+    return 2 * t * t if t < 0.5 else 1 - 2 * (1 - t) * (1 - t)
+
+
+class Tween():
+    """Moves a value from start to end over duration ms, after an optional delay, along an easing curve. The value is
+    handed to setter on every update, and on_done is called once the end is reached."""
+
+    def __init__(self, setter: Callable[[float], None], start: float, end: float, duration: int,
+                 easing: Callable[[float], float] = linear, delay: int = 0, on_done: Callable[[], None] = None):
+        """Initialize the tween"""
+
+        self.setter = setter
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.easing = easing
+        self.on_done = on_done
+
+        # Time since the tween started, negative while it is still delayed
+        self.time = -delay
+
+    def update(self, dt: int) -> bool:
+        """Advances the tween by dt ms and applies its value. Returns True once it is done."""
+
+        self.time += dt
+        if self.time < 0:
+            return False
+
+        t = min(self.time / self.duration, 1) if self.duration > 0 else 1
+        self.setter(hf.lerp(self.start, self.end, self.easing(t)))
+        if t < 1:
+            return False
+
+        if self.on_done:
+            self.on_done()
+        return True
+
+
+class Tweener():
+    """Runs tweens by elapsed time, so animations take as long at any frame rate. Each tween is filed under a key, the
+    surface for fades, and starting a tween replaces any running under the same key. Finished tweens are dropped, so
+    they cost nothing per frame."""
+
+    def __init__(self):
+        """Initialize an empty scheduler"""
+
+        self.tweens: Dict[Hashable, Tween] = {}
+
+    def add(self, key: Hashable, tween: Tween) -> Tween:
+        """Starts a tween under key, replacing any running under the same key"""
+
+        self.tweens[key] = tween
+        return tween
+
+    def fade(self, surface: pg.Surface, end_alpha: int, duration: int, easing: Callable[[float], float] = linear,
+             delay: int = 0, on_done: Callable[[], None] = None) -> Tween:
+        """Fades a surface from its current alpha to end_alpha. A surface without per-surface alpha is fully opaque, so
+        fades from 255. The tween is filed under the surface."""
+
+        def set_alpha(alpha: float):
+            surface.set_alpha(round(alpha))
+
+        start_alpha = surface.get_alpha()
+        if start_alpha is None:
+            start_alpha = 255
+        return self.add(surface, Tween(set_alpha, start_alpha, end_alpha, duration, easing, delay, on_done))
+
+    def animate(self, obj: object, attr: str, end: float, duration: int, easing: Callable[[float], float] = linear,
+                delay: int = 0, on_done: Callable[[], None] = None) -> Tween:
+        """Animates an attribute of obj from its current value to end, e.g. a rect's position or a sprite's scale. The
+        tween is filed under (id(obj), attr), as objects such as rects can't be hashed. The tween holds on to obj, so
+        the id can't be reused while it runs."""
+
+        def set_attr(value: float):
+            setattr(obj, attr, value)
+
+        return self.add((id(obj), attr), Tween(set_attr, getattr(obj, attr), end, duration, easing, delay, on_done))
+
+    def is_active(self, key: Hashable) -> bool:
+        """Returns True if a tween is running, or waiting on its delay, under key"""
+
+        return key in self.tweens
+
+    def cancel(self, key: Hashable):
+        """Stops the tween under key where it is, without calling its on_done"""
+
+        self.tweens.pop(key, None)
+
+    def clear(self):
+        """Stops all tweens"""
+
+        self.tweens.clear()
+
+    def update(self, dt: int):
+        """Advances all tweens by dt ms and drops the finished ones"""
+
+        for key, tween in list(self.tweens.items()):
+            # A tween's on_done may have started another under the same key, which is kept
+            if tween.update(dt) and self.tweens.get(key) is tween:
+                del self.tweens[key]
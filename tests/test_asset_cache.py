@@ -0,0 +1,108 @@
+import os
+import shutil
+import sys
+
+import pygame as pg
+import pytest
+
+# The game's modules import each other by name from the package directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'flappybird'))
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+import helper_functions as hf  # noqa: E402
+from asset_cache import AssetCache  # noqa: E402
+
+BLACK = (0, 0, 0)
+PINK = (255, 105, 180)
+
+
+@pytest.fixture
+def source(tmp_path):
+    """A copy of some of the game's images and sounds, which the tests are free to change"""
+
+    pg.display.set_mode((1, 1))
+    pg.mixer.init()
+    path = tmp_path / 'assets'
+    path.mkdir()
+    for name in ('ground.png', 'bird_sheet_yellow.png', 'numbers_small.png', 'pipe_green.png'):
+        shutil.copy(os.path.join(ROOT, 'assets', 'images', name), path)
+    shutil.copy(os.path.join(ROOT, 'assets', 'sounds', 'sfx_flap.wav'), path)
+    yield str(path)
+    pg.mixer.quit()
+
+
+def load(cache: AssetCache, path: str, scale: float = 3) -> dict:
+    """Loads the source's assets through the cache, as Settings does, and returns their pixels and samples"""
+
+    assets = {
+        'ground': [cache.load_image('ground.png', scale, path)],
+        'bird': cache.load_frames('bird_sheet_yellow.png', scale, path, 3, BLACK),
+        'numbers': cache.load_frames('numbers_small.png', scale, path, 10, PINK),
+        'pipe': [cache.load_image('pipe_green.png', scale, path, PINK)],
+    }
+    assets = {name: [(image.get_size(), pg.image.tobytes(image, 'RGBA')) for image in images]
+              for name, images in assets.items()}
+    assets['flap'] = cache.load_sound('sfx_flap.wav', path).get_raw()
+    return assets
+
+
+def run_session(cache_dir: str, path: str, scale: float = 3) -> tuple:
+    """Runs one launch of the game's asset loading. Returns the assets and whether any had to be rebuilt."""
+
+    cache = AssetCache(cache_dir)
+    assets = load(cache, path, scale)
+    rebuilt = cache.dirty
+    cache.save()
+    return assets, rebuilt
+
+
+def test_cached_assets_match_source(tmp_path, source):
+    """Assets served from the cache are the same as loading and processing the source files"""
+
+    cache_dir = str(tmp_path / 'cache')
+    built, rebuilt = run_session(cache_dir, source)
+    assert rebuilt
+    assert built['ground'][0][1] == pg.image.tobytes(hf.load_image('ground.png', 3, source), 'RGBA')
+    assert len(built['bird']) == 3 and len(built['numbers']) == 10
+
+    cached, rebuilt = run_session(cache_dir, source)
+    assert not rebuilt
+    assert cached == built
+
+
+def test_changed_asset_is_rebuilt(tmp_path, source):
+    """Changing one source file rebuilds only that asset, and the cache written alongside the ones still mapped from
+    the old file loads on the next launch"""
+
+    cache_dir = str(tmp_path / 'cache')
+    built, _ = run_session(cache_dir, source)
+
+    # Change an asset that is loaded first, so the ones loaded after it are still views into the old mapping
+    image = pg.image.load(os.path.join(source, 'ground.png'))
+    image.fill((0, 0, 255))
+    pg.image.save(image, os.path.join(source, 'ground.png'))
+    changed, rebuilt = run_session(cache_dir, source)
+    assert rebuilt
+    assert changed['ground'] != built['ground']
+    assert {name: assets for name, assets in changed.items() if name != 'ground'} == \
+        {name: assets for name, assets in built.items() if name != 'ground'}
+
+    cached, rebuilt = run_session(cache_dir, source)
+    assert not rebuilt
+    assert cached == changed
+
+
+def test_changed_processing_is_rebuilt(tmp_path, source):
+    """Loading assets with different processing rebuilds them, and entries no longer used are dropped"""
+
+    cache_dir = str(tmp_path / 'cache')
+    built, _ = run_session(cache_dir, source)
+    scaled, rebuilt = run_session(cache_dir, source, scale=2)
+    assert rebuilt
+    assert scaled['ground'][0][0] != built['ground'][0][0]
+
+    cache = AssetCache(cache_dir)
+    assert len(cache.index) == 5
+    assert all('|2|' in key for key in cache.index if key.startswith('image'))
@@ -0,0 +1,73 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The game's modules import each other by name from the package directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'flappybird'))
+
+from autopilot import Autopilot  # noqa: E402
+from settings import WorldSettings  # noqa: E402
+from simulation import Simulation  # noqa: E402
+
+
+def fly(seed: int, budget: int, max_score: int, node_time: float = None):
+    """Lets an autopilot play a game until it crashes or reaches max_score, starting from node_time us per search
+    node if given. Returns the world, the autopilot and the time each plan took, in us."""
+
+    world = Simulation(WorldSettings())
+    world.reset()
+    world.start(seed)
+    pilot = Autopilot(world.settings, budget)
+    if node_time:
+        pilot.node_time = node_time
+    step_dt = 1000 / world.settings.physics_rate
+    plan_times = []
+    done = False
+    while not done and world.score < max_score:
+        flap = pilot.get_action(world)
+        plan_times.append(pilot.plan_time)
+        done = world.step(step_dt, flap)
+    return world, pilot, np.array(plan_times)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_autopilot_survives(seed):
+    """With time to finish its searches, the autopilot's plans don't depend on how fast the machine is"""
+
+    world, _, _ = fly(seed, 10**6, 10)
+    assert world.score == 10 and world.settings.current_state == 'PLAY'
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_autopilot_survives_game_budget(seed):
+    """With the budget the game plays with, searches that run out of time fall back to tracking the gap ahead"""
+
+    world, _, _ = fly(seed, WorldSettings().autopilot_budget, 20)
+    assert world.score == 20 and world.settings.current_state == 'PLAY'
+
+
+def test_slow_search_does_not_stop_planning():
+    """A search slow enough to leave no time for another node, e.g. when the process is preempted, doesn't stop the
+    autopilot from flapping for the rest of the game"""
+
+    budget = WorldSettings().autopilot_budget
+    world, pilot, _ = fly(0, budget, 10, node_time=budget * 0.6)
+    assert world.flap_steps and world.score == 10
+    assert pilot.node_time <= budget / 4
+
+    pilot.node_time = budget
+    pilot.reset()
+    assert pilot.node_time < budget / 4
+
+
+def test_plans_fit_budget():
+    """Planning stops in time for the plan to fit the budget. A few plans may still overrun when the process is
+    preempted, which no deadline can prevent."""
+
+    budget = 1000
+    _, _, plan_times = fly(3, budget, 10)
+    assert np.median(plan_times) < budget / 2
+    assert np.percentile(plan_times, 99) < budget
@@ -0,0 +1,200 @@
+import os
+import random
+import sys
+
+import numpy as np
+import pygame as pg
+import pytest
+
+# The game's modules import each other by name from the package directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'flappybird'))
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+import helper_functions as hf  # noqa: E402
+from batch import BatchSimulation, make_courses  # noqa: E402
+from environment import FlappyEnv  # noqa: E402
+from settings import Settings, WorldSettings  # noqa: E402
+from simulation import Simulation  # noqa: E402
+from trainer import N_FEATURES, Bot, evaluate, get_n_params  # noqa: E402
+
+SEEDS = list(range(40))
+
+
+@pytest.fixture(scope='module')
+def env():
+    """A headless game, loading its assets from the repository root"""
+
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    env = FlappyEnv(headless=True)
+    yield env
+    env.close()
+    os.chdir(cwd)
+
+
+@pytest.fixture(scope='module')
+def settings(env):
+    """The headless game's settings and sprites"""
+
+    return env.settings
+
+
+def play_simulation(seed: int):
+    """Plays a game on a bare Simulation with a noisy scripted player. Returns the score, the number of steps and
+    whether the bird flapped on each of them."""
+
+    world = Simulation(WorldSettings())
+    world.reset()
+    world.settings.start_delay = 0
+    world.start(seed)
+    rng = random.Random(seed)
+    step_dt = 1000 / world.settings.physics_rate
+    flaps = []
+    done = False
+    while not done:
+        y, velocity, _, gap_y = world.observe()
+        flaps.append(y > gap_y + 25 + rng.uniform(-20, 20) and velocity > 0)
+        done = world.step(step_dt, flaps[-1])
+    return world.score, world.steps, flaps
+
+
+def get_next_gap(world: Simulation) -> float:
+    """Returns the gap y of the next pipe pair the bird has to clear, which a noisy scripted player aims for"""
+
+    return next(pipe.gap_y for pipe in world.pipes if not pipe.cleared)
+
+
+def sprites_collide(settings: Settings, world: Simulation) -> bool:
+    """Tests the world's bird against its pipes, the ground and the top of the screen the way pygame would for the
+    game's sprites, placed as Bird and Pipe place them"""
+
+    bird = world.bird
+    angle = hf.quantize(bird.angle, settings.bird_angle_step, settings.bird_min_angle, settings.bird_max_angle)
+    image = settings.bird_rotations[(0, bird.current_frame, angle)]
+    rect = image.get_rect(center=(bird.x, bird.y))
+    if rect.bottom > settings.ground_elev or rect.top < 0:
+        return True
+
+    mask = pg.mask.from_surface(image)
+    pipe_mask = pg.mask.from_surface(settings.pipe_pair_imgs[0])
+    for pipe in world.pipes:
+        pipe_rect = settings.pipe_pair_imgs[0].get_rect(center=(pipe.x, pipe.gap_y))
+        if mask.overlap(pipe_mask, (pipe_rect.left - rect.left, pipe_rect.top - rect.top)):
+            return True
+    return False
+
+
+def test_model_matches_sprite_masks(settings):
+    """The collision model agrees with pygame's mask test on the game's own sprites, wherever they are placed"""
+
+    model = Simulation(settings).collision
+    pipe_image = settings.pipe_pair_imgs[0]
+    pipe_mask = pg.mask.from_surface(pipe_image)
+
+    rng = random.Random(0)
+    for _ in range(5000):
+        frame, angle = rng.randrange(settings.bird_num_frames), rng.randrange(-90, 46, 3)
+        x, y = 150 + rng.uniform(-1, 1), rng.uniform(0, settings.ground_elev)
+        pipe_x, gap_y = rng.uniform(60, 240), rng.randint(140, 480)
+
+        image = settings.bird_rotations[(0, frame, angle)]
+        rect = image.get_rect(center=(x, y))
+        pipe_rect = pipe_image.get_rect(center=(pipe_x, gap_y))
+        expected = pg.mask.from_surface(image).overlap(pipe_mask, (pipe_rect.left - rect.left,
+                                                                   pipe_rect.top - rect.top)) is not None
+
+        angle_index = model.get_angle_index(angle)
+        left, top, width, height = model.get_bird_rect(x, y, frame, angle_index)
+        pipe_left, pipe_top = model.get_pipe_rect(pipe_x, gap_y)
+        assert (left, top, width, height) == tuple(rect)
+        assert (pipe_left, pipe_top) == pipe_rect.topleft
+        assert model.hits_pipe(frame, angle_index, left, top, height, pipe_left, pipe_top) == expected
+
+
+def test_simulation_matches_env(env):
+    """The same seed and flaps give the same score and step count on a bare Simulation and through the full game"""
+
+    scores = []
+    for seed in SEEDS:
+        score, steps, flaps = play_simulation(seed)
+        scores.append(score)
+
+        env.reset(seed)
+        done = False
+        while not done:
+            done = env.step(flaps[env.world.steps])[2]
+        assert (env.stats.score, env.world.steps) == (score, steps), f'seed {seed}'
+
+    # The runs get through pipes rather than all ending on the first one
+    assert max(scores) >= 5
+
+
+def test_bird_holds_still_on_collision_frame(env):
+    """The bird is snapped to where it was drawn on a collision, and doesn't interpolate back across the snap"""
+
+    env.reset(SEEDS[0])
+    done = False
+    while not done:
+        done = env.step(False)[2]
+    body = env.bird.body
+    assert (body.prev_x, body.prev_y) == (body.x, body.y)
+    center = env.bird.rect.center
+    env.bird.interpolate(0.5)
+    assert env.bird.rect.center == center
+
+
+@pytest.mark.parametrize('seed', SEEDS[:10])
+def test_simulation_ends_when_sprites_collide(settings, seed):
+    """A game on the simulation ends on the first step the game's sprites would collide on, and no other"""
+
+    world = Simulation(settings, seed)
+    world.reset()
+    world.start()
+    rng = random.Random(seed)
+    done = False
+    while not done:
+        flap = world.bird.y > get_next_gap(world) + 25 + rng.uniform(-20, 20) and world.bird.velocity > 0
+        done = world.step(1000 / settings.physics_rate, flap)
+        assert done == sprites_collide(settings, world)
+
+
+def test_batch_matches_simulation():
+    """The same courses and flaps give the same scores and step counts on a BatchSimulation as on Simulations"""
+
+    runs = [play_simulation(seed) for seed in SEEDS]
+    batch = BatchSimulation(len(SEEDS), WorldSettings(), auto_reset=False, courses=make_courses(SEEDS, 200))
+    step_dt = 1000 / batch.settings.physics_rate
+    step = 0
+    while batch.alive.any():
+        batch.step(np.array([step < len(flaps) and flaps[step] for _, _, flaps in runs]), step_dt)
+        step += 1
+
+    assert batch.final_score.tolist() == [score for score, _, _ in runs]
+    assert batch.steps.tolist() == [steps for _, steps, _ in runs]
+
+
+def test_training_fitness_matches_env(env):
+    """A policy's training fitness is what the same policy scores when played through the full game"""
+
+    settings, hidden, max_steps = env.settings, 4, 2000
+    rng = np.random.default_rng(0)
+    population = rng.normal(0, 1, (8, get_n_params(hidden)))
+
+    # A policy that flaps whenever it's below the gap survives every step, so fitness up to max_steps is covered.
+    # Its first hidden unit weighs the inputs and the output follows only that unit.
+    population[0] = 0
+    population[0, :N_FEATURES * hidden:hidden] = [-1, 0, 0, 0, -0.05]
+    population[0, N_FEATURES * hidden] = 1
+
+    for params in population:
+        expected = []
+        bot = Bot(params, hidden, settings)
+        for seed in SEEDS[:8]:
+            observation = env.reset(seed)
+            done = False
+            while not done and env.world.steps < max_steps:
+                observation, _, done, _ = env.step(bot(observation))
+            expected.append(env.stats.score + env.world.steps / max_steps)
+        assert evaluate(params[None], hidden, SEEDS[:8], max_steps, settings)[0] == pytest.approx(np.mean(expected))
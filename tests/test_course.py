@@ -0,0 +1,73 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The game's modules import each other by name from the package directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'flappybird'))
+
+from course import CourseGenerator, load_courses, save_courses  # noqa: E402
+from settings import WorldSettings  # noqa: E402
+from simulation import Simulation  # noqa: E402
+
+
+# Pipe pairs close together, which leaves too little room between them to reach every gap height from every other
+TIGHT = {'pipe_spacing': 150, 'gap_height': 150}
+
+
+@pytest.fixture(scope='module')
+def generator():
+    """A generator for the default physics"""
+
+    return CourseGenerator(WorldSettings())
+
+
+@pytest.mark.parametrize('physics', [None, TIGHT])
+@pytest.mark.parametrize('seed', range(10))
+def test_gaps_are_reachable(physics, seed):
+    generator = CourseGenerator(WorldSettings(physics=physics))
+    course = generator.generate(seed, 500).astype(np.int64)
+    assert ((course >= generator.gap_y_min) & (course <= generator.gap_y_max)).all()
+    changes = np.diff(course)
+    assert (changes >= -generator.max_climb).all() and (changes <= generator.max_drop).all()
+
+
+def test_tight_physics_limit_gaps():
+    """The tight physics' envelope is narrower than the range of gaps, which unreachable gaps are drawn from"""
+
+    generator = CourseGenerator(WorldSettings(physics=TIGHT))
+    assert generator.max_climb < generator.gap_y_max - generator.gap_y_min
+    unreachable = CourseGenerator(WorldSettings(physics=dict(TIGHT, reachable_gaps=False)))
+    changes = np.diff(unreachable.generate(0, 2000).astype(np.int64))
+    assert (changes < -generator.max_climb).any() and (changes > generator.max_drop).any()
+
+
+def test_same_seed_same_course(generator):
+    assert (generator.generate(5, 200) == generator.generate(5, 200)).all()
+    assert (generator.generate(5, 200) != generator.generate(6, 200)).any()
+
+
+def test_course_matches_simulation(generator):
+    """generate gives the gaps a Simulation started on the same seed plays"""
+
+    world = Simulation(WorldSettings())
+    world.reset()
+    world.start(3)
+    gaps = [world.pipes[-1].gap_y]
+    while len(gaps) < 10:
+        world.create_new_pipes()
+        gaps.append(world.pipes[-1].gap_y)
+    assert generator.generate(3, 10).tolist() == gaps
+
+
+def test_courses_round_trip_through_mmap(tmp_path, generator):
+    courses = generator.generate_courses([1, 2, 3], 100)
+    path = str(tmp_path / 'courses.npy')
+    save_courses(path, courses)
+
+    loaded = load_courses(path)
+    assert isinstance(loaded, np.memmap) and not loaded.flags.writeable
+    assert loaded.dtype == courses.dtype and (loaded == courses).all()
+    assert (loaded[1] == generator.generate(2, 100)).all()
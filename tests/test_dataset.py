@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+# The game's modules import each other by name from the package directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'flappybird'))
+
+from dataset import FrameDataset, FrameRecorder, get_shard_paths  # noqa: E402
+from settings import WorldSettings  # noqa: E402
+from simulation import Simulation  # noqa: E402
+
+
+@pytest.fixture
+def world():
+    """A game started on seed 0"""
+
+    world = Simulation(WorldSettings())
+    world.reset()
+    world.start(0)
+    return world
+
+
+def record_steps(recorder: FrameRecorder, world: Simulation, n: int):
+    """Steps the world n times, recording it after each step"""
+
+    step_dt = 1000 / world.settings.physics_rate
+    for _ in range(n):
+        world.step(step_dt)
+        recorder.record(world, world.settings)
+
+
+def wait_for_writer(recorder: FrameRecorder):
+    """Waits until the writer has taken every waiting record out of the ring buffer"""
+
+    deadline = time.time() + 10
+    while recorder.tail < recorder.head and time.time() < deadline:
+        time.sleep(0.01)
+    assert recorder.tail == recorder.head
+
+
+def test_ring_buffer_wraps_around(tmp_path, world):
+    recorder = FrameRecorder(str(tmp_path), capacity=8, flush_interval=0.01)
+    record_steps(recorder, world, 5)
+    wait_for_writer(recorder)
+    record_steps(recorder, world, 6)
+    recorder.close()
+
+    assert recorder.dropped == 0
+    assert FrameDataset(str(tmp_path))[np.arange(11)]['step'].tolist() == list(range(1, 12))
+
+
+def test_records_are_dropped_when_writer_falls_behind(tmp_path, world):
+    """The writer sleeps through the whole test, so only a buffer's worth of records is kept"""
+
+    recorder = FrameRecorder(str(tmp_path), capacity=4, flush_interval=60)
+    record_steps(recorder, world, 10)
+    assert recorder.dropped == 6
+    recorder.close()
+
+    dataset = FrameDataset(str(tmp_path))
+    assert dataset[np.arange(len(dataset))]['step'].tolist() == [1, 2, 3, 4]
+
+
+def test_shards_roll_at_shard_size(tmp_path, world):
+    recorder = FrameRecorder(str(tmp_path), capacity=64, shard_size=4)
+    record_steps(recorder, world, 10)
+    recorder.close()
+
+    assert [len(np.load(path)) for path in get_shard_paths(str(tmp_path))] == [4, 4, 2]
+    assert len(FrameDataset(str(tmp_path))) == 10
+
+
+def test_mixed_shards_random_access(tmp_path, world):
+    """Compressed and memory mapped shards read as one sequence, including reads spanning shards"""
+
+    recorder = FrameRecorder(str(tmp_path), shard_size=4)
+    record_steps(recorder, world, 6)
+    recorder.close()
+    recorder = FrameRecorder(str(tmp_path), shard_size=4, compress=True)
+    record_steps(recorder, world, 5)
+    recorder.close()
+
+    paths = get_shard_paths(str(tmp_path))
+    assert [os.path.splitext(path)[1] for path in paths] == ['.npy', '.npy', '.npz', '.npz']
+    dataset = FrameDataset(str(tmp_path))
+    assert len(dataset) == 11
+
+    indices = np.array([10, 3, 4, 0, 6, 5, 9, 3])
+    assert dataset[indices]['step'].tolist() == (indices + 1).tolist()
+    assert int(dataset[7]['step']) == 8
+    with pytest.raises(IndexError):
+        dataset[11]
+
+
+def test_repeated_flaps_and_seeds_are_recorded(tmp_path, world):
+    recorder = FrameRecorder(str(tmp_path))
+    unstarted = Simulation(WorldSettings())
+    unstarted.reset()
+    recorder.record(unstarted, unstarted.settings)
+
+    world.flap()
+    world.flap()
+    record_steps(recorder, world, 1)
+    world.flap()
+    record_steps(recorder, world, 2)
+
+    # The game over frame still belongs to the run, the READY frames before the next run don't
+    world.game_over()
+    recorder.record(world, world.settings)
+    world.reset()
+    recorder.record(world, world.settings)
+    world.start(7)
+    record_steps(recorder, world, 1)
+    recorder.close()
+
+    records = FrameDataset(str(tmp_path))[np.arange(7)]
+    assert records['seed'].tolist() == [-1, 0, 0, 0, 0, -1, 7]
+    assert records['flaps'].tolist() == [0, 2, 1, 0, 0, 0, 0]
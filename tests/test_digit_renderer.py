@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pygame as pg
+import pytest
+
+# The game's modules import each other by name from the package directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'flappybird'))
+
+from digit_renderer import DigitRenderer  # noqa: E402
+
+PINK = (255, 105, 180)
+
+
+@pytest.fixture
+def imgs():
+    """Digit sprites keyed with pink as the game's are, each with its own shape and color"""
+
+    imgs = []
+    for digit in range(10):
+        img = pg.Surface((7, 10))
+        img.fill(PINK)
+        img.fill((25 * digit, 255 - 20 * digit, 100), (digit % 4, digit % 3, 3 + digit % 4, 4 + digit % 5))
+        img.set_colorkey(PINK, pg.RLEACCEL)
+        imgs.append(img)
+    return imgs
+
+
+def blit_digits(surface: pg.Surface, imgs, value: int, x: int, y: int, justify: str):
+    """Draws value digit by digit, as Stats did before scores were pre-composed"""
+
+    width = len(str(value)) * imgs[0].get_width()
+    x_off = {'left': 0, 'center': width // 2, 'right': width}[justify]
+    for i, digit in enumerate(str(value)):
+        surface.blit(imgs[int(digit)], (x - x_off + i * imgs[0].get_width(), y))
+
+
+@pytest.mark.parametrize('justify', ['left', 'center', 'right'])
+@pytest.mark.parametrize('value', [0, 7, 10, 99, 1234, 90817])
+def test_composed_matches_digit_blits(imgs, value, justify):
+    expected, actual = pg.Surface((120, 30)), pg.Surface((120, 30))
+    expected.fill((40, 50, 60))
+    actual.fill((40, 50, 60))
+    blit_digits(expected, imgs, value, 60, 10, justify)
+    DigitRenderer(imgs).blit(actual, value, 60, 10, justify)
+    assert pg.image.tobytes(actual, 'RGB') == pg.image.tobytes(expected, 'RGB')
+
+
+def test_cache_keeps_recent_values(imgs):
+    digits = DigitRenderer(imgs)
+    for value in range(300):
+        digits.render(value)
+    assert digits.render.cache_info().currsize == 256
+
+    # The most recent values are served from the cache, the oldest were evicted and are composed again
+    assert digits.render(299) is digits.render(299)
+    hits = digits.render.cache_info().hits
+    digits.render(0)
+    assert digits.render.cache_info().hits == hits
+    assert digits.render.cache_info().currsize == 256
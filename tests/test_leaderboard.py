@@ -0,0 +1,115 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# The game's modules import each other by name from the package directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'flappybird'))
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+from environment import FlappyEnv  # noqa: E402
+from leaderboard import Leaderboard  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path of a new leaderboard database"""
+
+    return str(tmp_path / 'scores' / 'leaderboard.db')
+
+
+@pytest.fixture
+def leaderboard(db_path):
+    """An empty leaderboard, closed after the test"""
+
+    leaderboard = Leaderboard(db_path)
+    yield leaderboard
+    if leaderboard.writer.is_alive():
+        leaderboard.close()
+
+
+def test_recorded_runs_are_written_by_flush(leaderboard):
+    assert leaderboard.get_high_score() == 0
+    for score in [3, 12, 7]:
+        leaderboard.record('ann', score)
+    leaderboard.flush()
+    assert leaderboard.get_high_score() == 12
+    assert len(leaderboard.get_top_scores(100)) == 3
+
+
+def test_top_scores_are_ordered_and_limited(leaderboard):
+    runs = [('ann', 5), ('bob', 9), ('cat', 9), ('ann', 2), ('dan', 14)]
+    for player, score in runs:
+        leaderboard.record(player, score)
+    leaderboard.flush()
+
+    # Ties go to the earlier run
+    top = leaderboard.get_top_scores(3)
+    assert [(player, score) for player, score, _ in top] == [('dan', 14), ('bob', 9), ('cat', 9)]
+    assert len(leaderboard.get_top_scores(10)) == len(runs)
+
+
+def test_player_best_only_improves(leaderboard):
+    assert leaderboard.get_player_best('ann') is None
+    for score in [5, 11, 8]:
+        leaderboard.record('ann', score)
+    leaderboard.record('bob', 3)
+    leaderboard.flush()
+    assert leaderboard.get_player_best('ann') == 11
+    assert leaderboard.get_player_best('bob') == 3
+    assert [(player, score) for player, score, _ in leaderboard.get_top_players()] == [('ann', 11), ('bob', 3)]
+
+
+def test_runs_persist_across_reopen(db_path):
+    leaderboard = Leaderboard(db_path)
+    leaderboard.record('ann', 4)
+    leaderboard.record('bob', 17)
+    leaderboard.close()
+
+    leaderboard = Leaderboard(db_path)
+    assert leaderboard.get_high_score() == 17
+    assert leaderboard.get_player_best('ann') == 4
+    leaderboard.record('ann', 20)
+    leaderboard.close()
+
+    leaderboard = Leaderboard(db_path)
+    assert (leaderboard.get_high_score(), leaderboard.get_player_best('ann')) == (20, 20)
+    leaderboard.close()
+
+
+def test_writer_error_surfaces_on_record(leaderboard):
+    """Once the writer has stopped, recording raises instead of queueing runs that would never be written"""
+
+    leaderboard.record('ann', None)
+    with pytest.raises(sqlite3.IntegrityError):
+        leaderboard.flush()
+    with pytest.raises(sqlite3.IntegrityError):
+        leaderboard.record('ann', 1)
+
+
+def test_failed_writer_does_not_end_game(monkeypatch, leaderboard):
+    """A leaderboard that can't be written to is dropped at the game over, and the game keeps its high score in
+    memory"""
+
+    leaderboard.record('ann', None)
+    leaderboard.writer.join(10)
+    assert leaderboard.writer_error
+
+    monkeypatch.chdir(ROOT)
+    env = FlappyEnv(headless=True)
+    try:
+        stats = env.stats
+        stats.leaderboard = leaderboard
+        stats.score = 3
+        stats.prep_score_plaque(record=True)
+        assert stats.leaderboard is None and stats.high_score == 3
+
+        stats.init_dynamic_variables()
+        stats.score = 5
+        stats.prep_score_plaque(record=True)
+        assert stats.high_score == 5
+    finally:
+        env.close()
@@ -0,0 +1,183 @@
+import json
+import os
+import sys
+
+import pytest
+
+# The game's modules import each other by name from the package directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'flappybird'))
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+from playback import get_env, set_start, simulate, validate, validate_all  # noqa: E402
+from replay import ReplayWriter, load_replay, record_replay  # noqa: E402
+from settings import WorldSettings  # noqa: E402
+from simulation import Simulation  # noqa: E402
+
+
+@pytest.fixture
+def replay_path(tmp_path, monkeypatch):
+    """Path of a genuine replay, of a run that clears a few pipes"""
+
+    monkeypatch.chdir(ROOT)
+    world = Simulation(WorldSettings())
+    world.reset()
+    world.start(7)
+    step_dt = 1000 / world.settings.physics_rate
+    done = False
+    while not done:
+        y, velocity, _, gap_y = world.observe()
+        done = world.step(step_dt, y > gap_y + 30 and velocity > 0)
+    assert world.score > 0
+
+    path = str(tmp_path / 'replay.json')
+    record_replay(world, 0, world.score).save(path)
+    return path
+
+
+def test_simulation_matches_full_game(replay_path):
+    """Headless validation steps a bare simulation, which must play a run out as the full game does"""
+
+    replay = load_replay(replay_path)
+    env = get_env(replay.physics)
+    env.reset(seed=replay.seed)
+    set_start(env.world, replay)
+    flap_steps = set(replay.flap_steps)
+    while not env.step(env.world.steps in flap_steps)[2]:
+        pass
+    assert simulate(replay) == (env.stats.score, env.world.steps) == (replay.score, replay.steps)
+
+
+def tamper(path: str, change) -> str:
+    """Applies change to a replay file's data and saves it back"""
+
+    with open(path) as file:
+        data = json.load(file)
+    change(data)
+    with open(path, 'w') as file:
+        json.dump(data, file)
+    return path
+
+
+def test_genuine_replay_is_valid(replay_path):
+    result = validate(replay_path)
+    assert result['valid'] and result['error'] is None
+    assert (result['score'], result['steps']) == (result['claimed'], result['claimed_steps'])
+
+
+def test_unversioned_replay_is_valid(replay_path):
+    tamper(replay_path, lambda data: data.pop('version'))
+    assert validate(replay_path)['valid']
+
+
+@pytest.mark.parametrize('change', [
+    lambda data: data['physics'].update(gravity=data['physics']['gravity'] / 2),
+    lambda data: data['physics'].update(gap_height=400),
+    lambda data: data['physics'].update(pipe_spacing=500),
+    lambda data: data['physics'].pop('gap_y_max'),
+    lambda data: data['physics'].update(reachable_gaps=False),
+    lambda data: data['physics'].pop('reachable_gaps'),
+    lambda data: data.update(version=99),
+])
+def test_tampered_physics_are_rejected(replay_path, change):
+    result = validate(tamper(replay_path, change))
+    assert not result['valid'] and result['error']
+
+
+@pytest.mark.parametrize('name, value', [
+    ('y', 100), ('y', 'high'), ('frame', 3), ('frame', 1.5), ('animation_time', -1), ('color', 3),
+    ('start_delay', -1000), ('start_delay', 10 ** 9),
+])
+def test_impossible_start_is_rejected(replay_path, name, value):
+    result = validate(tamper(replay_path, lambda data: data['start'].update({name: value})))
+    assert not result['valid'] and result['error']
+
+
+def test_wrong_step_count_is_rejected(replay_path):
+    result = validate(tamper(replay_path, lambda data: data.update(steps=data['steps'] + 100)))
+    assert not result['valid'] and result['error'] is None
+    assert result['score'] == result['claimed']
+
+
+@pytest.mark.parametrize('change', [
+    lambda data: data.update(seed=[1, 2]), lambda data: data.update(seed=-1), lambda data: data.update(seed=2**40),
+    lambda data: data.update(flap_steps=[[1]]), lambda data: data.update(flap_steps=[-1]),
+    lambda data: data.update(flap_steps=data['flap_steps'][::-1]),
+    lambda data: data.update(flap_steps=data['flap_steps'] + [data['steps'] + 1]),
+    lambda data: data.update(score=-1), lambda data: data.update(score='12'), lambda data: data.update(steps=1.5),
+    lambda data: data.update(version=[2]), lambda data: data.update(physics=[]), lambda data: data.update(start=[]),
+])
+def test_impossible_run_is_rejected(replay_path, change):
+    result = validate(tamper(replay_path, change))
+    assert not result['valid'] and result['error']
+
+
+def test_repeated_flap_step_is_valid(replay_path):
+    """Several flaps can land between two simulation steps, and are recorded on the same step"""
+
+    tamper(replay_path, lambda data: data.update(flap_steps=[data['flap_steps'][0]] + data['flap_steps']))
+    assert validate(replay_path)['valid']
+
+
+@pytest.mark.parametrize('contents', ['{"seed": 1', '[]', '{}', '{"version": 2, "physics": {}}'])
+def test_unreadable_replay_is_rejected(replay_path, contents):
+    with open(replay_path, 'w') as file:
+        file.write(contents)
+    result = validate(replay_path)
+    assert not result['valid'] and result['error'].startswith('unreadable')
+
+
+def test_bad_replay_does_not_stop_batch(tmp_path, replay_path):
+    """One bad file among several is reported on its own, and the rest are still validated"""
+
+    bad_path = str(tmp_path / 'bad.json')
+    with open(bad_path, 'w') as file:
+        file.write('not json')
+    results = validate_all([replay_path, bad_path, str(tmp_path / 'missing.json'), replay_path], processes=2)
+    assert [result['valid'] for result in results] == [True, False, False, True]
+    assert results[1]['error'] and results[2]['error']
+
+
+def test_replay_writer_saves_queued_replays(tmp_path, replay_path):
+    writer = ReplayWriter(str(tmp_path / 'saved'))
+    replay = load_replay(replay_path)
+    for i in range(3):
+        writer.save(replay, f'{i}.json')
+    writer.flush()
+    assert validate(str(tmp_path / 'saved' / '2.json'))['valid']
+    writer.save(replay, 'last.json')
+    writer.close()
+    assert sorted(os.listdir(tmp_path / 'saved')) == ['0.json', '1.json', '2.json', 'last.json']
+
+
+def test_replay_writer_error_surfaces(tmp_path, replay_path):
+    """A replay that can't be written stops the writer, and saving raises instead of queueing replays to lose"""
+
+    (tmp_path / 'file').write_text('')
+    writer = ReplayWriter(str(tmp_path / 'file'))
+    writer.save(load_replay(replay_path), 'replay.json')
+    with pytest.raises(OSError):
+        writer.flush()
+    with pytest.raises(OSError):
+        writer.save(load_replay(replay_path), 'replay.json')
+
+
+def test_failed_replay_writer_does_not_end_game(tmp_path, replay_path):
+    """Replays that can't be written are dropped at the next game over, and the game carries on"""
+
+    (tmp_path / 'file').write_text('')
+    writer = ReplayWriter(str(tmp_path / 'file'))
+    writer.save(load_replay(replay_path), 'replay.json')
+    writer.writer.join(10)
+    assert writer.writer_error
+
+    env = get_env(load_replay(replay_path).physics)
+    env.stats.replay_writer = writer
+    try:
+        env.reset(seed=1)
+        while not env.step(False)[2]:
+            pass
+        assert env.stats.replay_writer is None
+    finally:
+        env.stats.replay_writer = None
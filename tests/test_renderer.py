@@ -0,0 +1,87 @@
+import os
+import sys
+
+import pygame as pg
+import pytest
+
+# The game's modules import each other by name from the package directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'flappybird'))
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+from environment import FlappyEnv  # noqa: E402
+import game_functions as gf  # noqa: E402
+
+# Frame time of the game's main loop
+FRAME_TIME = 1000 / 120
+
+
+@pytest.fixture
+def env(monkeypatch):
+    """A headless game whose display pushes are logged as 'flip' or the area updated"""
+
+    monkeypatch.chdir(ROOT)
+    env = FlappyEnv(headless=True)
+    pushes = []
+    monkeypatch.setattr(pg.display, 'flip', lambda: pushes.append('flip'))
+    monkeypatch.setattr(pg.display, 'update', lambda rects: pushes.append(sum(rect.w * rect.h for rect in rects)))
+    env.pushes = pushes
+    yield env
+    env.close()
+
+
+def render_frames(env: FlappyEnv, n: int, step: bool = False) -> list:
+    """Draws n frames at the main loop's frame rate, stepping the world in between if step is set. Returns, for each
+    frame, whether the background scrolled by a whole pixel and how the frame was pushed."""
+
+    frames = []
+    for _ in range(n):
+        if step and env.settings.current_state == 'PLAY':
+            env.step(env.world.observe()[0] > env.world.observe()[3] + 30)
+        offset = int(env.background.offset)
+        env.scenery_time = FRAME_TIME
+        del env.pushes[:]
+        env.render()
+        frames.append((int(env.background.offset) != offset, env.pushes[0] if env.pushes else None))
+    return frames
+
+
+def check_scrolling_frames(frames: list, screen_area: int):
+    """The full screen background makes a frame a full flip when it scrolls to a new pixel, the rest are partial
+    updates of the ground, pipes, bird and score"""
+
+    assert any(scrolled for scrolled, _ in frames) and not all(scrolled for scrolled, _ in frames)
+    for scrolled, push in frames:
+        if scrolled:
+            assert push == 'flip'
+        else:
+            assert push != 'flip' and 0 < push < screen_area / 2
+
+
+def test_play_frames_update_partially_between_background_scrolls(env):
+    env.reset(1)
+    render_frames(env, 2, step=True)
+    check_scrolling_frames(render_frames(env, 40, step=True), env.screen.get_width() * env.screen.get_height())
+
+
+def test_ready_frames_update_partially_between_background_scrolls(env):
+    env.reset(1)
+    gf.reset_game(env.world, env.bird, env.pipes, env.buttons, env.stats, env.settings)
+    env.settings.idle_time = env.settings.get_ready_delay
+    render_frames(env, 2)
+    check_scrolling_frames(render_frames(env, 40), env.screen.get_width() * env.screen.get_height())
+
+
+def test_game_over_frames_update_partially(env):
+    """Once the world has frozen and the game over screen has faded in, only the bird and buttons can change"""
+
+    env.reset(1)
+    while not env.step(False)[2]:
+        pass
+    env.settings.tweens.update(5000)
+    env.stats.tweens.update(5000)
+    render_frames(env, 2)
+    frames = render_frames(env, 20)
+    assert not any(scrolled for scrolled, _ in frames)
+    assert all(push != 'flip' for _, push in frames)
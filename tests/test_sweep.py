@@ -0,0 +1,51 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The game's modules import each other by name from the package directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'flappybird'))
+
+from sweep import MILESTONES, get_configs, summarize, sweep  # noqa: E402
+
+
+def test_configs_are_product_of_given_settings():
+    configs = get_configs({'gap_height': [150, 180], 'gravity': [0.001, 0.002, 0.003], 'pipe_spacing': None,
+                           'jump_velocity': []})
+    assert len(configs) == 6
+    assert all(set(config) == {'gravity', 'gap_height'} for config in configs)
+    assert {(config['gravity'], config['gap_height']) for config in configs} == \
+        {(gravity, gap_height) for gravity in [0.001, 0.002, 0.003] for gap_height in [150, 180]}
+
+
+def test_no_settings_is_one_default_config():
+    assert get_configs({}) == [{}]
+
+
+@pytest.fixture(scope='module')
+def results():
+    """A tiny sweep, with the default gap height swept twice so its two configurations play the same games"""
+
+    return sweep({'gap_height': [180, 180, 220]}, n_games=24, max_steps=2400, chunk_size=10, processes=1)
+
+
+def test_configs_play_same_seeds(results):
+    assert len(results) == 3 and all(result['games'] == 24 for result in results)
+    assert results[0] == results[1]
+    assert results[2]['gap_height'] == 220 and results[2] != results[0]
+
+
+def test_survival_never_increases(results):
+    for result in results:
+        survival = [result[f'survival_{milestone}'] for milestone in MILESTONES]
+        assert all(0 <= later <= earlier <= 1 for earlier, later in zip(survival, survival[1:]))
+
+
+def test_summarize_survival_curve():
+    scores = np.array([0, 1, 4, 5, 12, 30, 120])
+    result = summarize({'gravity': 0.001}, scores, np.zeros(len(scores), dtype=bool), MILESTONES)
+    assert result['gravity'] == 0.001 and result['max'] == 120
+    assert [result[f'survival_{milestone}'] for milestone in MILESTONES] == \
+        pytest.approx([6 / 7, 4 / 7, 3 / 7, 2 / 7, 1 / 7, 1 / 7])
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pygame as pg
+import pytest
+
+# The game's modules import each other by name from the package directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'flappybird'))
+
+from tween import Tweener, ease_in_out  # noqa: E402
+
+
+def run_fade(fps: int, duration: int = 500) -> int:
+    """Fades a surface in at a fixed frame rate. Returns the number of ms it took to finish."""
+
+    tweens = Tweener()
+    surface = pg.Surface((4, 4), pg.SRCALPHA)
+    surface.set_alpha(0)
+    tweens.fade(surface, 255, duration, ease_in_out)
+    dt = 1000 / fps
+    elapsed = 0
+    while tweens.is_active(surface):
+        tweens.update(dt)
+        elapsed += dt
+    assert surface.get_alpha() == 255
+    return elapsed
+
+
+def test_fade_takes_as_long_at_any_frame_rate():
+    slow, fast = run_fade(30), run_fade(240)
+    assert slow == pytest.approx(500, abs=1000 / 30)
+    assert fast == pytest.approx(500, abs=1000 / 240)
+
+
+def test_fade_without_surface_alpha_starts_opaque():
+    surface = pg.Surface((4, 4))
+    assert surface.get_alpha() is None
+    tweens = Tweener()
+    tweens.fade(surface, 155, 100)
+    tweens.update(50)
+    assert surface.get_alpha() == 205
+
+
+def test_finished_tweens_are_dropped():
+    tweens = Tweener()
+    surfaces = [pg.Surface((4, 4), pg.SRCALPHA) for _ in range(3)]
+    done = []
+    for i, surface in enumerate(surfaces):
+        surface.set_alpha(0)
+        tweens.fade(surface, 255, 100 * (i + 1), on_done=lambda i=i: done.append(i))
+
+    tweens.update(150)
+    assert done == [0] and not tweens.is_active(surfaces[0]) and len(tweens.tweens) == 2
+    tweens.update(1000)
+    assert done == [0, 1, 2] and not tweens.tweens